@@ -15,8 +15,9 @@ router = fastapi.APIRouter(prefix="/movies")
 )
 async def review_movies(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
+    limit: int = fastapi.Query(default=100, ge=1, le=500),
 ) -> list[AdminMovieInResponse]:
-    db_movies = await movie_repo.read_all()
+    db_movies = await movie_repo.read_movies_pending_review(limit=limit)
     db_movie_list: list = list()
 
     for db_movie in db_movies:
@@ -3,8 +3,10 @@ import fastapi
 
 
 from src.api.dependencies.repository import get_repository
-from src.models.schemas.task import TaskInResponse, TaskInAssign, TaskCategoryInResponse, TaskCategoryInCreate
+from src.models.schemas.task import TaskInResponse, TaskInAssign, TaskInBulkAssign, TaskCategoryInResponse, TaskCategoryInCreate, \
+    TaskProgressDistributionInResponse
 from src.repository.crud.task import TaskCrudRepository
+from src.utilities.formatters.tasks import calculate_weighted_progress_batch, summarize_progress
 
 router = fastapi.APIRouter(prefix="/task")
 
@@ -21,6 +23,65 @@ async def assign_task(
     new_task = await task_repo.assign_task(account_id=task.account_id, task_level=task.task_level)
     return fastapi.Response(status_code=fastapi.status.HTTP_200_OK, content=f"Task assigned to account {task.account_id}")
 
+@router.post(
+    path="/bulk-assign-task",
+    name="task:bulk-assign-task",
+    status_code=fastapi.status.HTTP_200_OK,
+    description="批量分配任务,按等级或任务种类分配给多个账号,已拥有的任务会跳过",
+)
+async def bulk_assign_task(
+    assignment: TaskInBulkAssign,
+    task_repo: TaskCrudRepository = fastapi.Depends(get_repository(repo_type=TaskCrudRepository)),
+) -> dict[str, int]:
+    assigned = await task_repo.bulk_assign_tasks(
+        account_ids=assignment.account_ids,
+        task_level=assignment.task_level,
+        task_category_id=assignment.task_category_id,
+    )
+    return {"assigned": assigned}
+
+@router.post(
+    path="/re-evaluate-completion",
+    name="task:re-evaluate-completion",
+    status_code=fastapi.status.HTTP_200_OK,
+    description="重新计算所有任务的完成状态,用于管理员修改任务种类要求之后",
+)
+async def re_evaluate_task_completion(
+    task_repo: TaskCrudRepository = fastapi.Depends(get_repository(repo_type=TaskCrudRepository)),
+    batch_size: int = fastapi.Query(default=10_000, ge=100, le=100_000),
+) -> dict[str, int]:
+    completed = await task_repo.re_evaluate_all_task_completion(batch_size=batch_size)
+    return {"completed": completed}
+
+@router.get(
+    path="/progress-distribution/{task_category_id}",
+    name="task:progress-distribution",
+    response_model=TaskProgressDistributionInResponse,
+    status_code=fastapi.status.HTTP_200_OK,
+    description="统计某个任务种类下所有用户的任务进度分布",
+)
+async def get_task_progress_distribution(
+    task_category_id: int,
+    task_repo: TaskCrudRepository = fastapi.Depends(get_repository(repo_type=TaskCrudRepository)),
+    buckets: int = fastapi.Query(default=10, ge=1, le=100),
+) -> TaskProgressDistributionInResponse:
+    task_category = await task_repo.read_task_category_by_id(id=task_category_id)
+    if task_category is None:
+        raise fastapi.HTTPException(status_code=404, detail="Task category not found.")
+    columns = await task_repo.read_task_progress_columns(task_category_id=task_category_id)
+    progress = calculate_weighted_progress_batch(
+        columns[:, 0],
+        columns[:, 1],
+        [task_category.movies_uploaded_count] * len(columns),
+        [task_category.reviews_posted_count] * len(columns),
+    )
+    return TaskProgressDistributionInResponse(
+        task_category_id=task_category_id,
+        completed_count=int(columns[:, 2].sum()),
+        claimed_count=int(columns[:, 3].sum()),
+        **summarize_progress(progress, buckets=buckets),
+    )
+
 @router.get(
     path="/get-tasks",
     name="task:get-tasks",
@@ -1,22 +1,21 @@
-import contextlib
 import typing
 
-import fastapi
-from sqlalchemy.ext.asyncio import (
-    async_sessionmaker as sqlalchemy_async_sessionmaker,
-    AsyncSession as SQLAlchemyAsyncSession,
-    AsyncSessionTransaction as SQLAlchemyAsyncSessionTransaction,
-)
+from sqlalchemy.ext.asyncio import AsyncSession as SQLAlchemyAsyncSession
 
 from src.repository.database import async_db
 
 
 async def get_async_session() -> typing.AsyncGenerator[SQLAlchemyAsyncSession, None]:
-    try:
-        yield async_db.async_session
-    except Exception as e:
-        print(e)
-        await async_db.async_session.rollback()
-        raise
-    finally:
-        await async_db.async_session.close()
+    """
+    Hand every request its own session. All repositories resolved within the same request share it
+    (FastAPI caches the dependency per request), the pending transaction is committed when the
+    request succeeds, rolled back when it fails, and the connection goes back to the pool either way.
+    """
+    async with async_db.new_session() as async_session:
+        try:
+            yield async_session
+            if async_session.in_transaction():
+                await async_session.commit()
+        except Exception:
+            await async_session.rollback()
+            raise
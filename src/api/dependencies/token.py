@@ -7,7 +7,10 @@ from starlette import status
 
 from src.api.dependencies.repository import get_repository
 from src.models.db.account import Account
+from src.models.schemas.jwt import AccountPrincipal
 from src.repository.crud.account import AccountCRUDRepository
+from src.repository.workers.account_activity import account_activity_updater
+from src.repository.workers.token_revocation import token_revocation_list
 from src.securities.authorizations.jwt import jwt_generator
 import jwt
 
@@ -20,9 +23,11 @@ async def get_user_me(
         request: fastapi.Request,
         token: str = Header(...),
         account_repo: AccountCRUDRepository = fastapi.Depends(get_repository(repo_type=AccountCRUDRepository)),
-) -> Account:
+) -> AccountPrincipal:
     try:
-        username = jwt_generator.retrieve_details_from_token(token=token)
+        principal = await jwt_generator.retrieve_principal_from_token(
+            token=token, read_principal_by_username=account_repo.read_principal_by_username
+        )
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,13 +39,17 @@ async def get_user_me(
             detail="Invalid token",
         )
 
+    if principal is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    db_account = await account_repo.read_account_by_username(username=username, request=request)
+    if principal.jti is not None and await token_revocation_list.is_revoked(jti=principal.jti):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
 
-    if db_account is None:
-        raise HTTPException(status_code=404, detail="User not found")
+    account_activity_updater.touch(
+        account_id=principal.id, ip=request.client.host, user_agent=request.headers.get("user-agent")
+    )
 
-    return db_account
+    return principal
 
 async def get_admin_me(
         token: str = Header(...),
@@ -5,6 +5,8 @@ from pydantic import HttpUrl
 
 from src.api.dependencies.repository import get_repository
 from src.api.dependencies.token import get_user_me
+from src.api.routes.wallet import transactions_in_response
+from src.config.manager import settings
 from src.models.schemas.account import AccountInResponse, AccountInUpdate, AccountWithToken
 from src.models.schemas.wallet import WalletInResponse, TransactionInResponse
 from src.repository.crud.account import AccountCRUDRepository
@@ -33,11 +35,9 @@ async def get_accounts(
     db_account_list: list = list()
 
     for db_account in db_accounts:
-        access_token = jwt_generator.generate_access_token(account=db_account)
         account = AccountInResponse(
             id=db_account.id,
             authorized_account=AccountWithToken(
-                token=access_token,
                 username=db_account.username,
                 email=db_account.email,  # type: ignore
                 profile_picture=db_account.profile_image,
@@ -67,15 +67,16 @@ async def get_account(
 ) -> AccountInResponse:
     try:
         db_account = await account_repo.read_account_by_id(id=id)
-        access_token = jwt_generator.generate_access_token(account=db_account)
 
     except EntityDoesNotExist:
         raise await http_404_exc_id_not_found_request(id=id)
 
+    if db_account is None:
+        raise await http_404_exc_id_not_found_request(id=id)
+
     return AccountInResponse(
         id=db_account.id,
         authorized_account=AccountWithToken(
-            token=access_token,
             username=db_account.username,
             email=db_account.email,  # type: ignore
             profile_picture=db_account.profile_image,
@@ -113,7 +114,7 @@ async def update_account(
         raise HTTPException(status_code=409, detail="Username or email already exists")
 
 
-    access_token = jwt_generator.generate_access_token(account=updated_db_account)
+    access_token = jwt_generator.generate_access_token(account=updated_db_account, wallet_id=user.wallet_id)
 
     return AccountInResponse(
         id=updated_db_account.id,
@@ -157,26 +158,14 @@ async def get_profile(
     wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
 ) -> AccountInResponse:
     db_account = await account_repo.read_account_by_id(id=user.id)
-    access_token = jwt_generator.generate_access_token(account=db_account)
-    wallet = await wallet_repo.read_wallet_by_id(id=db_account.wallet.id)
-    transactions = []
-    for transaction in wallet.transactions:
-        transactions.append(
-            TransactionInResponse(
-                id=transaction.id,
-                wallet_id=transaction.wallet_id,
-                amount=transaction.amount,
-                created_at=transaction.created_at,
-                updated_at=transaction.updated_at,
-                transaction_type=transaction.transaction_type,
-                transaction_status=transaction.transaction_status,
-                transaction_currency=transaction.transaction_currency,
-            )
-        )
+    wallet = await wallet_repo.read_wallet_by_id(id=user.wallet_id)
+    recent_transactions, transactions_next_cursor = await wallet_repo.read_transactions_of_wallet(
+        wallet_id=wallet.id, page_size=settings.RECENT_TRANSACTIONS_COUNT
+    )
+    transactions = transactions_in_response(recent_transactions)
     return AccountInResponse(
         id=db_account.id,
         authorized_account=AccountWithToken(
-            token=access_token,
             username=db_account.username,
             email=db_account.email,  # type: ignore
             profile_picture=db_account.profile_image,
@@ -196,6 +185,7 @@ async def get_profile(
             tron_address=wallet.tron_address,
             balance=wallet.balance,
             transactions=transactions,
+            transactions_next_cursor=transactions_next_cursor,
             )
         )
 
@@ -1,11 +1,19 @@
+import datetime
+
 import fastapi
 
 from src.api.dependencies.repository import get_repository
+from src.api.routes.wallet import transactions_in_response
+from src.config.manager import settings
+from src.api.dependencies.token import get_user_me
 from src.models.schemas.account import AccountInCreate, AccountInLogin, AccountInResponse, AccountWithToken
+from src.models.schemas.jwt import AccountPrincipal, RefreshTokenInRequest, TokenPairInResponse
 from src.models.schemas.wallet import WalletInCreate, WalletInResponse, TransactionInResponse
 from src.repository.crud.account import AccountCRUDRepository
 from src.repository.crud.task import TaskCrudRepository
+from src.repository.crud.token import TokenCrudRepository
 from src.repository.crud.wallet import WalletCrudRepository
+from src.repository.workers.token_revocation import token_revocation_list
 from src.securities.authorizations.jwt import jwt_generator
 from src.utilities.exceptions.database import EntityAlreadyExists
 from src.utilities.exceptions.http.exc_400 import (
@@ -30,6 +38,7 @@ async def signup(
     request: fastapi.Request,
     account_create: AccountInCreate,
     account_repo: AccountCRUDRepository = fastapi.Depends(get_repository(repo_type=AccountCRUDRepository)),
+    token_repo: TokenCrudRepository = fastapi.Depends(get_repository(repo_type=TokenCrudRepository)),
 ) -> AccountInResponse:
     try:
         # await account_repo.verify_recapcha(recaptcha=recaptcha)
@@ -41,12 +50,14 @@ async def signup(
         print(e)
         raise await http_exc_400_credentials_bad_signup_request()
     new_account, wallet = await account_repo.create_account(account_create=account_create,request=request)
-    access_token = jwt_generator.generate_access_token(account=new_account)
+    access_token = jwt_generator.generate_access_token(account=new_account, wallet_id=wallet.id)
+    refresh_token = await token_repo.issue_refresh_token(account_id=new_account.id)
     # tasks= await account_repo.apply_default_tasks(account_id=account.id)
     return AccountInResponse(
         id=new_account.id,
         authorized_account=AccountWithToken(
             token=access_token,
+            refresh_token=refresh_token,
             username=new_account.username,
             email=new_account.email,  # type: ignore
             profile_picture=new_account.profile_image,
@@ -80,29 +91,22 @@ async def signin(
     request: fastapi.Request,
     account_login: AccountInLogin,
     account_repo: AccountCRUDRepository = fastapi.Depends(get_repository(repo_type=AccountCRUDRepository)),
+    token_repo: TokenCrudRepository = fastapi.Depends(get_repository(repo_type=TokenCrudRepository)),
     wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
 ) -> AccountInResponse:
     db_account = await account_repo.read_user_by_password_authentication(account_login=account_login, request=request)
-    access_token = jwt_generator.generate_access_token(account=db_account)
     wallet= await wallet_repo.read_wallet_by_account_id(account_id=db_account.id)
-    transactions = []
-    for transaction in wallet.transactions:
-        transactions.append(
-            TransactionInResponse(
-                id=transaction.id,
-                wallet_id=transaction.wallet_id,
-                amount=transaction.amount,
-                created_at=transaction.created_at,
-                updated_at=transaction.updated_at,
-                transaction_type=transaction.transaction_type,
-                transaction_status=transaction.transaction_status,
-                transaction_currency=transaction.transaction_currency,
-            )
-        )
+    access_token = jwt_generator.generate_access_token(account=db_account, wallet_id=wallet.id)
+    refresh_token = await token_repo.issue_refresh_token(account_id=db_account.id)
+    recent_transactions, transactions_next_cursor = await wallet_repo.read_transactions_of_wallet(
+        wallet_id=wallet.id, page_size=settings.RECENT_TRANSACTIONS_COUNT
+    )
+    transactions = transactions_in_response(recent_transactions)
     return AccountInResponse(
         id=db_account.id,
         authorized_account=AccountWithToken(
             token=access_token,
+            refresh_token=refresh_token,
             username=db_account.username,
             email=db_account.email,  # type: ignore
             profile_picture=db_account.profile_image,
@@ -121,7 +125,8 @@ async def signin(
             ethereum_address=wallet.ethereum_address,
             tron_address=wallet.tron_address,
             balance=wallet.balance,
-            transactions=transactions
+            transactions=transactions,
+            transactions_next_cursor=transactions_next_cursor,
         )
     )
 
@@ -134,6 +139,7 @@ async def create_account_by_admin(
     request: fastapi.Request,
     account_create: AccountInCreate,
     account_repo: AccountCRUDRepository = fastapi.Depends(get_repository(repo_type=AccountCRUDRepository)),
+    token_repo: TokenCrudRepository = fastapi.Depends(get_repository(repo_type=TokenCrudRepository)),
 ):
     try:
         # await account_repo.verify_recapcha(recaptcha=recaptcha)
@@ -145,12 +151,14 @@ async def create_account_by_admin(
         print(e)
         raise await http_exc_400_credentials_bad_signup_request()
     new_account, wallet = await account_repo.create_account_by_admin(account_create=account_create,request=request)
-    access_token = jwt_generator.generate_access_token(account=new_account)
+    access_token = jwt_generator.generate_access_token(account=new_account, wallet_id=wallet.id)
+    refresh_token = await token_repo.issue_refresh_token(account_id=new_account.id)
     # tasks= await account_repo.apply_default_tasks(account_id=account.id)
     return AccountInResponse(
         id=new_account.id,
         authorized_account=AccountWithToken(
             token=access_token,
+            refresh_token=refresh_token,
             username=new_account.username,
             email=new_account.email,  # type: ignore
             profile_picture=new_account.profile_image,
@@ -174,4 +182,44 @@ async def create_account_by_admin(
     )
 
 
+@router.post(
+    path="/refresh",
+    name="auth:refresh",
+    response_model=TokenPairInResponse,
+    status_code=fastapi.status.HTTP_200_OK,
+    description="用refresh token换取新的access token, 旧的refresh token随即失效",
+)
+async def refresh(
+    refresh_request: RefreshTokenInRequest,
+    token_repo: TokenCrudRepository = fastapi.Depends(get_repository(repo_type=TokenCrudRepository)),
+) -> TokenPairInResponse:
+    rotated = await token_repo.rotate_refresh_token(refresh_token=refresh_request.refresh_token)
+    if rotated is None:
+        raise fastapi.HTTPException(status_code=fastapi.status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    db_account, wallet_id, refresh_token = rotated
+    return TokenPairInResponse(
+        token=jwt_generator.generate_access_token(account=db_account, wallet_id=wallet_id),
+        refresh_token=refresh_token,
+        expires_in=settings.JWT_ACCESS_TOKEN_EXPIRATION_MIN * 60,
+    )
+
 
+@router.post(
+    path="/signout",
+    name="auth:signout",
+    status_code=fastapi.status.HTTP_204_NO_CONTENT,
+    description="撤销当前access token及其refresh token",
+)
+async def signout(
+    refresh_request: RefreshTokenInRequest | None = None,
+    user: AccountPrincipal = fastapi.Depends(get_user_me),
+    token_repo: TokenCrudRepository = fastapi.Depends(get_repository(repo_type=TokenCrudRepository)),
+) -> fastapi.Response:
+    if user.jti is not None:
+        await token_repo.revoke_access_token(
+            jti=user.jti, expires_at=datetime.datetime.fromtimestamp(user.expires_at, tz=datetime.timezone.utc)
+        )
+        token_revocation_list.revoke_locally(jti=user.jti)
+    if refresh_request is not None:
+        await token_repo.revoke_refresh_token(refresh_token=refresh_request.refresh_token)
+    return fastapi.Response(status_code=fastapi.status.HTTP_204_NO_CONTENT)
@@ -1,14 +1,36 @@
+import typing
+
 import fastapi
+import sqlalchemy
 from fastapi import HTTPException
 
 from src.api.dependencies.repository import get_repository
 from src.api.dependencies.token import get_user_me
-from src.models.schemas.movie import MovieInCreate, MovieInResponse, ReviewInResponse, ReviewInCreate, MoviesInResponse
+from src.models.schemas.movie import MovieInCreate, MovieInResponse, ReviewInResponse, ReviewInCreate, MoviesInResponse, \
+    GenreFacetInResponse, ReviewsInResponse
 from src.repository.crud.movie import MovieCRUDRepository
-from src.repository.crud.task import TaskCrudRepository
-from src.utilities.exceptions.database import EntityAlreadyExists
+from src.repository.workers.task_progress import MOVIE_UPLOADED, REVIEW_POSTED, task_progress_engine
+from src.utilities.exceptions.database import EntityAlreadyExists, EntityDoesNotExist
 
 router = fastapi.APIRouter(prefix="/movie", tags=["movie"])
+
+
+def reviews_in_response(reviews: typing.Sequence[sqlalchemy.Row]) -> list[ReviewInResponse]:
+    return [
+        ReviewInResponse(
+            id=review.id,
+            movie_id=review.movie_id,
+            account_id=review.account_id,
+            review=review.review,
+            rating=review.rating,
+            created_at=review.created_at,
+            updated_at=review.updated_at,
+            profile_picture=review.profile_image,
+            username=review.username,
+        )
+        for review in reviews
+    ]
+
 @router.post(
     path="/create-movie",
     name="movie:create-movie",
@@ -18,15 +40,14 @@ router = fastapi.APIRouter(prefix="/movie", tags=["movie"])
 async def create_movie(
     movie: MovieInCreate,
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-    task_repo: TaskCrudRepository = fastapi.Depends(get_repository(repo_type=TaskCrudRepository)),
     user=fastapi.Depends(get_user_me),
 ) -> MovieInResponse:
     try:
         new_movie = await movie_repo.create_movie(movie=movie, account_id=user.id)
     except EntityAlreadyExists as e:
         raise HTTPException(status_code=400, detail=str(e))
-    await task_repo.add_movie_uploaded_count(account_id=new_movie.account_id)
-    new_movie= await movie_repo.session_update(movie=new_movie)
+    # 任务进度由后台批量更新
+    task_progress_engine.emit(account_id=new_movie.account_id, event=MOVIE_UPLOADED)
     return MovieInResponse(
         id=new_movie.id,
         title=new_movie.title,
@@ -49,29 +70,13 @@ async def create_movie(
 async def create_review(
     review: ReviewInCreate,
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-    task_repo: TaskCrudRepository = fastapi.Depends(get_repository(repo_type=TaskCrudRepository)),
     user=fastapi.Depends(get_user_me),
 ) -> MovieInResponse:
     user_id = user.id
     new_review = await movie_repo.create_review(review=review, account_id=user_id)
+    task_progress_engine.emit(account_id=user_id, event=REVIEW_POSTED)
     movie = await movie_repo.read_movie_by_id(id=new_review.movie_id)
-    await task_repo.add_review_posted_count(account_id=user_id)
-    movie = await movie_repo.session_update(movie=movie)
-    reviews = []
-    for review in movie.reviews:
-        reviews.append(
-            ReviewInResponse(
-                id=review.id,
-                movie_id=review.movie_id,
-                account_id=review.account_id,
-                review=review.review,
-                rating=review.rating,
-                created_at=review.created_at,
-                updated_at=review.updated_at,
-                profile_picture=review.account.profile_image,
-                username=review.account.username,
-            )
-        )
+    reviews, reviews_next_cursor = await movie_repo.read_reviews_of_movie(movie_id=movie.id)
     return MovieInResponse(
         id=movie.id,
         title=movie.title,
@@ -83,9 +88,28 @@ async def create_review(
         cast=movie.cast,
         duration=movie.duration,
         cover_image_url=movie.cover_image_url,
-        reviews=reviews,
+        reviews=reviews_in_response(reviews),
+        reviews_next_cursor=reviews_next_cursor,
+        review_count=movie.review_count,
+        movie_rating=await movie_repo.calculate_rates_in_percentage(movie=movie),
     )
 
+@router.delete(
+    path="/delete-review/{review_id}",
+    name="movie:delete-review",
+    status_code=fastapi.status.HTTP_200_OK,
+)
+async def delete_review(
+    review_id: int,
+    movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
+    user=fastapi.Depends(get_user_me),
+) -> dict[str, str]:
+    try:
+        await movie_repo.delete_review(review_id=review_id, account_id=user.id)
+    except EntityDoesNotExist:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return {"notification": f"Review with id '{review_id}' is successfully deleted!"}
+
 @router.get(
     path="/get-movies",
     name="movie:get-movies",
@@ -94,9 +118,14 @@ async def create_review(
 )
 async def get_movies(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-    page: int = 1,
+    page: int | None = fastapi.Query(default=None, ge=1),
+    cursor: str | None = None,
+    page_size: int = fastapi.Query(default=10, ge=1, le=50),
 ) -> MoviesInResponse:
-    movies = await movie_repo.read_all(page=page)
+    try:
+        movies, next_cursor = await movie_repo.read_all(page=page, cursor=cursor, page_size=page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     movie_list = []
     for movie in movies:
         movie_list.append(
@@ -113,20 +142,27 @@ async def get_movies(
                 cover_image_url=movie.cover_image_url,
             )
         )
-    return MoviesInResponse(movies=movie_list)
+    return MoviesInResponse(movies=movie_list, next_cursor=next_cursor)
 @router.get(
     path="/get_movies_sorted_by_year",
     name="movie:get_movies_sorted_by_year",
     response_model=MoviesInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="按年份排序的电影",
+    description="按年份排序的电影; 下一页时传入上一页返回的next_cursor, page参数仅为兼容旧客户端保留",
 )
 async def get_movies_sorted_by_year(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-        page: int = 1,
+        page: int | None = fastapi.Query(default=None, ge=1),
         yearSort: str = "asc",
+        cursor: str | None = None,
+        page_size: int = fastapi.Query(default=10, ge=1, le=50),
 ) -> MoviesInResponse:
-    movies = await movie_repo.read_movies_sorted_by_year(page, yearSort)
+    try:
+        movies, next_cursor = await movie_repo.read_movies_sorted_by_year(
+            order=yearSort, page=page, cursor=cursor, page_size=page_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     movie_list = []
     for movie in movies:
         movie_list.append(
@@ -143,21 +179,28 @@ async def get_movies_sorted_by_year(
                 cover_image_url=movie.cover_image_url,
             )
         )
-    return MoviesInResponse(movies=movie_list)
+    return MoviesInResponse(movies=movie_list, next_cursor=next_cursor)
 
 @router.get(
     path="/get_movies_sorted_by_rating",
     name="movie:get_movies_sorted_by_rating",
     response_model=MoviesInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="按评分排序的电影",
+    description="按评分排序的电影; 下一页时传入上一页返回的next_cursor, page参数仅为兼容旧客户端保留",
 )
 async def get_movies_sorted_by_rating(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-    page: int = 1,
+    page: int | None = fastapi.Query(default=None, ge=1),
     ratingSort: str = "asc",
+    cursor: str | None = None,
+    page_size: int = fastapi.Query(default=10, ge=1, le=50),
 ) -> MoviesInResponse:
-    movies = await movie_repo.read_movies_sorted_by_rating(page, ratingSort)
+    try:
+        movies, next_cursor = await movie_repo.read_movies_sorted_by_rating(
+            order=ratingSort, page=page, cursor=cursor, page_size=page_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     movie_list = []
     for movie in movies:
         movie_list.append(
@@ -174,36 +217,25 @@ async def get_movies_sorted_by_rating(
                 cover_image_url=movie.cover_image_url,
             )
         )
-    return MoviesInResponse(movies=movie_list)
+    return MoviesInResponse(movies=movie_list, next_cursor=next_cursor)
 
 @router.get(
     path="/get-movie/{id}",
     name="movie:get-movie",
     response_model=MovieInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="单个电影页面",
+    description="单个电影页面, 只返回第一页评论; 更多评论通过 /get-movie-reviews/{movie_id} 传入reviews_next_cursor获取",
 )
 async def get_movie_by_id(
     id: int,
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
 ) -> MovieInResponse:
-    movie = await movie_repo.read_movie_by_id(id=id)
-    reviews = []
-    for review in movie.reviews:
-        reviews.append(
-            ReviewInResponse(
-                id=review.id,
-                movie_id=review.movie_id,
-                account_id=review.account_id,
-                review=review.review,
-                rating=review.rating,
-                created_at=review.created_at,
-                updated_at=review.updated_at,
-                profile_picture=review.account.profile_image,
-                username=review.account.username,
-            )
-        )
-    rating_percentages = await movie_repo.calculate_rates_in_percentage(reviews=reviews)
+    try:
+        movie = await movie_repo.read_movie_by_id(id=id)
+    except EntityDoesNotExist:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    reviews, reviews_next_cursor = await movie_repo.read_reviews_of_movie(movie_id=movie.id)
+    rating_percentages = await movie_repo.calculate_rates_in_percentage(movie=movie)
     return MovieInResponse(
         id=movie.id,
         title=movie.title,
@@ -215,21 +247,49 @@ async def get_movie_by_id(
         cast=movie.cast,
         duration=movie.duration,
         cover_image_url=movie.cover_image_url,
-        reviews=reviews,
+        reviews=reviews_in_response(reviews),
+        reviews_next_cursor=reviews_next_cursor,
+        review_count=movie.review_count,
         movie_rating=rating_percentages,
     )
+
+@router.get(
+    path="/get-movie-reviews/{movie_id}",
+    name="movie:get-movie-reviews",
+    response_model=ReviewsInResponse,
+    status_code=fastapi.status.HTTP_200_OK,
+    description="电影评论按时间倒序分页; 下一页时传入上一页返回的next_cursor",
+)
+async def get_movie_reviews(
+    movie_id: int,
+    movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
+    cursor: str | None = None,
+    page_size: int = fastapi.Query(default=10, ge=1, le=50),
+) -> ReviewsInResponse:
+    try:
+        reviews, next_cursor = await movie_repo.read_reviews_of_movie(movie_id=movie_id, cursor=cursor, page_size=page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ReviewsInResponse(reviews=reviews_in_response(reviews), next_cursor=next_cursor)
+
 @router.get(
     path="/search-movie/{search}",
     name="movie:search-movie",
     response_model=MoviesInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="关键词搜索电影",
+    description="关键词搜索电影, 按标题、简介、导演和演员全文检索并按相关度排序; 下一页时传入上一页返回的next_cursor",
 )
 async def search_movie_by_keywords(
     search: str,
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
+    page: int | None = fastapi.Query(default=None, ge=1),
+    cursor: str | None = None,
+    page_size: int = fastapi.Query(default=10, ge=1, le=50),
 ) -> MoviesInResponse:
-    movies = await movie_repo.search_movie(search)
+    try:
+        movies, next_cursor = await movie_repo.search_movie(search, page_size=page_size, page_num=page, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     movie_list = []
     for movie in movies:
         movie_list.append(
@@ -246,20 +306,25 @@ async def search_movie_by_keywords(
                 cover_image_url=movie.cover_image_url,
             )
         )
-    return MoviesInResponse(movies=movie_list)
+    return MoviesInResponse(movies=movie_list, next_cursor=next_cursor)
 
 @router.get(
     path="/get-movies-by-genre/{genre}",
     name="movie:get-movies-by-genre",
     response_model=MoviesInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="按类型获取电影",
+    description="按类型获取电影, 按上传时间倒序分页; 下一页时传入上一页返回的next_cursor, total_count只在第一页返回",
 )
 async def get_movies_by_genre(
     genre: str,
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
+    cursor: str | None = None,
+    page_size: int = fastapi.Query(default=20, ge=1, le=50),
 ) -> MoviesInResponse:
-    movies = await movie_repo.read_movies_by_genre(genre)
+    try:
+        movies, next_cursor, total_count = await movie_repo.read_movies_by_genre(genre, cursor=cursor, page_size=page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     movie_list = []
     for movie in movies:
         movie_list.append(
@@ -276,7 +341,20 @@ async def get_movies_by_genre(
                 cover_image_url=movie.cover_image_url,
             )
         )
-    return MoviesInResponse(movies=movie_list)
+    return MoviesInResponse(movies=movie_list, next_cursor=next_cursor, total_count=total_count)
+
+@router.get(
+    path="/get-genre-facets",
+    name="movie:get-genre-facets",
+    response_model=list[GenreFacetInResponse],
+    status_code=fastapi.status.HTTP_200_OK,
+    description="搜索页面的类型及每个类型的电影数量",
+)
+async def get_genre_facets(
+    movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
+) -> list[GenreFacetInResponse]:
+    facets = await movie_repo.read_genre_facets()
+    return [GenreFacetInResponse(genre=facet.name, movie_count=facet.movie_count) for facet in facets]
 
 @router.get(
     path="/get_movies_for_searching_page",
@@ -287,26 +365,10 @@ async def get_movies_by_genre(
 )
 async def get_default_movies_for_searching_page(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-) -> MoviesInResponse:
-    movies = await movie_repo.read_movies_of_searching_page()
-    movie_list = []
-    for movie in movies:
-        movie=movie.movie
-        movie_list.append(
-            MovieInResponse(
-                id=movie.id,
-                title=movie.title,
-                description=movie.description,
-                year=movie.year,
-                rating=movie.rating,
-                genre=movie.genre,
-                director=movie.director,
-                cast=movie.cast,
-                duration=movie.duration,
-                cover_image_url=movie.cover_image_url,
-            )
-        )
-    return MoviesInResponse(movies=movie_list)
+) -> fastapi.Response:
+    # 列表由管理员维护, 直接返回缓存中已序列化好的JSON
+    content = await movie_repo.read_movies_of_searching_page_json()
+    return fastapi.Response(content=content, media_type="application/json")
 
 @router.get(
     path="/get-movies-for-home-page",
@@ -317,26 +379,9 @@ async def get_default_movies_for_searching_page(
 )
 async def get_default_movies_for_home_page(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-) -> MoviesInResponse:
-    movies = await movie_repo.read_movies_of_home_page()
-    movie_list = []
-    for movie in movies:
-        movie = movie.movie
-        movie_list.append(
-            MovieInResponse(
-                id=movie.id,
-                title=movie.title,
-                description=movie.description,
-                year=movie.year,
-                rating=movie.rating,
-                genre=movie.genre,
-                director=movie.director,
-                cast=movie.cast,
-                duration=movie.duration,
-                cover_image_url=movie.cover_image_url,
-            )
-        )
-    return MoviesInResponse(movies=movie_list)
+) -> fastapi.Response:
+    content = await movie_repo.read_movies_of_home_page_json()
+    return fastapi.Response(content=content, media_type="application/json")
 
 @router.get(
     path="/get-movies-for-just-reviewed",
@@ -347,23 +392,6 @@ async def get_default_movies_for_home_page(
 )
 async def get_default_movies_for_just_reviewed(
     movie_repo: MovieCRUDRepository = fastapi.Depends(get_repository(repo_type=MovieCRUDRepository)),
-) -> MoviesInResponse:
-    movies = await movie_repo.read_movies_of_just_reviewed()
-    movie_list = []
-    for movie in movies:
-        movie = movie.movie
-        movie_list.append(
-            MovieInResponse(
-                id=movie.id,
-                title=movie.title,
-                description=movie.description,
-                year=movie.year,
-                rating=movie.rating,
-                genre=movie.genre,
-                director=movie.director,
-                cast=movie.cast,
-                duration=movie.duration,
-                cover_image_url=movie.cover_image_url,
-            )
-        )
-    return MoviesInResponse(movies=movie_list)
\ No newline at end of file
+) -> fastapi.Response:
+    content = await movie_repo.read_movies_of_just_reviewed_json()
+    return fastapi.Response(content=content, media_type="application/json")
\ No newline at end of file
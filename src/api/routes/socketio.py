@@ -0,0 +1,75 @@
+import asyncio
+
+import fastapi
+import jwt
+
+from src.models.schemas.jwt import AccountPrincipal
+from src.repository.crud.account import AccountCRUDRepository
+from src.repository.database import async_db
+from src.repository.workers.payment_status import payment_status_hub
+from src.repository.workers.token_revocation import token_revocation_list
+from src.securities.authorizations.jwt import jwt_generator
+
+router = fastapi.APIRouter(prefix="/ws", tags=["socket"])
+
+
+async def read_wallet_id(token: str | None) -> int | None:
+    if not token:
+        return None
+
+    async def read_principal_by_username(username: str) -> AccountPrincipal | None:
+        # 只有旧token需要查库, 且只在握手时使用一次连接
+        async with async_db.new_session() as async_session:
+            account_repo = AccountCRUDRepository(async_session=async_session)
+            return await account_repo.read_principal_by_username(username=username)
+
+    try:
+        principal = await jwt_generator.retrieve_principal_from_token(
+            token=token, read_principal_by_username=read_principal_by_username
+        )
+    except (jwt.PyJWTError, ValueError):
+        return None
+    if principal is None or (principal.jti is not None and await token_revocation_list.is_revoked(jti=principal.jti)):
+        return None
+    return principal.wallet_id
+
+
+@router.websocket("/payment-status")
+async def payment_status(websocket: fastapi.WebSocket, token: str | None = fastapi.Query(default=None)) -> None:
+    """
+    推送当前用户交易状态的变化, 替代轮询/wallet/check_payment_status. 浏览器无法设置请求头, token放在查询参数中.
+    """
+    wallet_id = await read_wallet_id(token=token or websocket.headers.get("token"))
+    if wallet_id is None:
+        await websocket.close(code=fastapi.status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    queue = payment_status_hub.subscribe(wallet_id=wallet_id)
+    # 同时等待客户端消息, 以便空闲连接断开时及时取消订阅
+    receiver = asyncio.create_task(websocket.receive())
+    getter: asyncio.Task | None = None
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.create_task(websocket.receive())
+            if getter in done:
+                transition = getter.result()
+                await websocket.send_json({
+                    "transaction_id": transition.transaction_id,
+                    "payment_id": transition.payment_id,
+                    "payment_status": transition.payment_status,
+                })
+            else:
+                getter.cancel()
+    except fastapi.WebSocketDisconnect:
+        pass
+    finally:
+        payment_status_hub.unsubscribe(wallet_id=wallet_id, queue=queue)
+        receiver.cancel()
+        if getter is not None:
+            getter.cancel()
@@ -4,12 +4,51 @@ import fastapi
 
 from src.api.dependencies.repository import get_repository
 from src.api.dependencies.token import get_user_me
+from src.models.db.task import Task
 from src.models.schemas.task import TaskCategoryInResponse, TaskInResponse
 from src.repository.crud.task import TaskCrudRepository
+from src.utilities.formatters.tasks import calculate_weighted_progress_batch
 
 router = fastapi.APIRouter(prefix="/task", tags=["task"])
 
 
+def tasks_in_response(tasks: typing.Sequence[Task]) -> list[TaskInResponse]:
+    progress = calculate_weighted_progress_batch(
+        [task.movies_uploaded_since_task_start for task in tasks],
+        [task.reviews_posted_since_task_start for task in tasks],
+        [task.task_category.movies_uploaded_count for task in tasks],
+        [task.task_category.reviews_posted_count for task in tasks],
+    )
+    # 同一任务种类只构建一次响应对象
+    categories: dict[int, TaskCategoryInResponse] = {}
+    for task in tasks:
+        if task.task_category_id not in categories:
+            category = task.task_category
+            categories[task.task_category_id] = TaskCategoryInResponse(
+                id=category.id,
+                name=category.name,
+                description=category.description,
+                access_level=category.access_level,
+                movies_uploaded_count=category.movies_uploaded_count,
+                reviews_posted_count=category.reviews_posted_count,
+                total_movies_uploaded=category.total_movies_uploaded,
+                total_reviews_posted=category.total_reviews_posted,
+                task_reward=category.task_reward,
+            )
+    return [
+        TaskInResponse(
+            id=task.id,
+            task_category=categories[task.task_category_id],
+            is_completed=task.is_completed,
+            is_claimed=task.is_claimed,
+            created_at=task.created_at,
+            updated_at=task.updated_at,
+            movies_uploaded_since_task_start=task.movies_uploaded_since_task_start,
+            reviews_posted_since_task_start=task.reviews_posted_since_task_start,
+            progress=float(task_progress),
+        )
+        for task, task_progress in zip(tasks, progress)
+    ]
 
 
 @router.get(
@@ -23,71 +62,20 @@ async def read_tasks(
     user=fastapi.Depends(get_user_me),
 ) -> list[TaskInResponse]:
     db_tasks = await task_repo.read_tasks_by_account_id(account_id=user.id)
-    tasks=[]
-    for task in db_tasks:
-        tasks.append(
-            TaskInResponse(
-                id=task.id,
-                task_category=TaskCategoryInResponse(
-                    id=task.task_category.id,
-                    name=task.task_category.name,
-                    description=task.task_category.description,
-                    access_level=task.task_category.access_level,
-                    movies_uploaded_count=task.task_category.movies_uploaded_count,
-                    reviews_posted_count=task.task_category.reviews_posted_count,
-                    total_movies_uploaded=task.task_category.total_movies_uploaded,
-                    total_reviews_posted=task.task_category.total_reviews_posted,
-                    task_reward=task.task_category.task_reward,
-                ),
-                is_completed=task.is_completed,
-                is_claimed=task.is_claimed,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                movies_uploaded_since_task_start=task.movies_uploaded_since_task_start,
-                reviews_posted_since_task_start=task.reviews_posted_since_task_start,
-                progress=task_repo.calculate_weighted_progress(task.movies_uploaded_since_task_start,
-                                                               task.reviews_posted_since_task_start,
-                                                               task.task_category.movies_uploaded_count,
-                                                               task.task_category.reviews_posted_count)
-            )
-        )
-    return tasks
+    return tasks_in_response(db_tasks)
 
 @router.get(
     path="/claim-reward",
     name="task:claim-reward",
     response_model=TaskInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="领取任务奖励",
+    description="领取任务奖励; 重试时带上相同的Idempotency-Key请求头, 会返回已领取的结果而不是报错",
 )
 async def claim_reward(
     task_id: int,
     task_repo: TaskCrudRepository = fastapi.Depends(get_repository(repo_type=TaskCrudRepository)),
     user=fastapi.Depends(get_user_me),
+    idempotency_key: str | None = fastapi.Header(default=None, alias="Idempotency-Key", max_length=64),
 ) -> TaskInResponse:
-    task = await task_repo.claim_task_reward(task_id=task_id, account_id=user.id)
-    return TaskInResponse(
-        id=task.id,
-        task_category=TaskCategoryInResponse(
-            id=task.task_category.id,
-            name=task.task_category.name,
-            description=task.task_category.description,
-            access_level=task.task_category.access_level,
-            movies_uploaded_count=task.task_category.movies_uploaded_count,
-            reviews_posted_count=task.task_category.reviews_posted_count,
-            total_movies_uploaded=task.task_category.total_movies_uploaded,
-            total_reviews_posted=task.task_category.total_reviews_posted,
-            task_reward=task.task_category.task_reward,
-        ),
-        is_completed=task.is_completed,
-        is_claimed=task.is_claimed,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        movies_uploaded_since_task_start=task.movies_uploaded_since_task_start,
-        reviews_posted_since_task_start=task.reviews_posted_since_task_start,
-        progress=task_repo.calculate_weighted_progress(task.movies_uploaded_since_task_start,
-                                                       task.reviews_posted_since_task_start,
-                                                       task.task_category.movies_uploaded_count,
-                                                       task.task_category.reviews_posted_count)
-
-    )
+    task = await task_repo.claim_task_reward(task_id=task_id, account_id=user.id, idempotency_key=idempotency_key)
+    return tasks_in_response([task])[0]
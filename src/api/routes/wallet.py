@@ -1,4 +1,5 @@
 import json
+import typing
 from typing import List
 
 import fastapi
@@ -8,36 +9,56 @@ from src.api.dependencies.repository import get_repository
 from src.api.dependencies.token import get_user_me
 from src.config.manager import settings
 from src.models.db.account import Account
+from src.models.db.wallet import Transactions
 from src.models.schemas.wallet import WalletInResponse, TopupInCreate, TopupInResponse, TransactionInCreate, \
-    PaymentInCreate, PaymentInfo, PaymentInResponse, PaymentUpdate, TransactionInResponse, ReadTransaction, \
-    WalletInUpdate, WithdrawInCreate
+    PaymentInCreate, PaymentInfo, PaymentInResponse, TransactionInResponse, ReadTransaction, \
+    WalletInUpdate, WithdrawInCreate, TransactionSummaryInResponse
 from src.repository.crud.wallet import WalletCrudRepository
+from src.repository.workers.payment_events import payment_event_consumer
+from src.utilities.exceptions.payment import PaymentGatewayError
 
 router = fastapi.APIRouter(prefix='/wallet', tags=["wallet"])
 
+
+def transactions_in_response(transactions: typing.Sequence[Transactions]) -> list[TransactionInResponse]:
+    return [
+        TransactionInResponse(
+            id=transaction.id,
+            wallet_id=transaction.wallet_id,
+            amount=transaction.amount,
+            created_at=transaction.created_at,
+            updated_at=transaction.updated_at,
+            transaction_type=transaction.transaction_type,
+            transaction_status=transaction.transaction_status,
+            transaction_currency=transaction.transaction_currency,
+        )
+        for transaction in transactions
+    ]
+
 @router.post(
     path="/top-up",
     name="wallet:create-top-up",
     response_model=PaymentInResponse,
     status_code=fastapi.status.HTTP_201_CREATED,
-    description="amount使用精度为2位小数，transaction_currency可以选择usdttrc20, usdterc20, btc, eth, trx",
+    description="amount使用精度为2位小数，transaction_currency可以选择usdttrc20, usdterc20, btc, eth, trx; 重试时带上相同的Idempotency-Key请求头不会重复创建支付",
 )
 async def top_up(
     topup: TopupInCreate,
     wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
     user = fastapi.Depends(get_user_me),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=64),
 ) -> PaymentInResponse:
     try:
         paydetails = await wallet_repo.top_up(
             TransactionInCreate(
-                wallet_id=user.wallet.id,
+                wallet_id=user.wallet_id,
                 amount=topup.amount,
                 transaction_currency=topup.transaction_currency,
-            )
+            ),
+            idempotency_key=idempotency_key,
         )
-    except Exception as e:
-        raise e
-    print(123)
+    except PaymentGatewayError as e:
+        raise fastapi.HTTPException(status_code=e.status_code, detail=str(e))
     return paydetails
 
 @router.get(
@@ -45,29 +66,22 @@ async def top_up(
     name="wallet:transactions",
     response_model=WalletInResponse,
     status_code=fastapi.status.HTTP_200_OK,
+    description="交易记录按时间倒序分页; 下一页时传入上一页返回的transactions_next_cursor",
 )
 async def transactions(
     user = fastapi.Depends(get_user_me),
     wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
+    cursor: str | None = None,
+    page_size: int = fastapi.Query(default=20, ge=1, le=100),
 ) -> WalletInResponse:
+    wallet = await wallet_repo.read_wallet_by_id(id=user.wallet_id)
     try:
-        wallet = await wallet_repo.read_wallet_by_id(id=user.wallet.id)
-        transactions = []
-        for transaction in wallet.transactions:
-            transactions.append(
-                TransactionInResponse(
-                    id=transaction.id,
-                    wallet_id=transaction.wallet_id,
-                    amount=transaction.amount,
-                    created_at=transaction.created_at,
-                    updated_at=transaction.updated_at,
-                    transaction_type=transaction.transaction_type,
-                    transaction_status=transaction.transaction_status,
-                    transaction_currency=transaction.transaction_currency,
-                )
-            )
-    except Exception as e:
-        raise e
+        page, transactions_next_cursor = await wallet_repo.read_transactions_of_wallet(
+            wallet_id=wallet.id, cursor=cursor, page_size=page_size
+        )
+    except ValueError as e:
+        raise fastapi.HTTPException(status_code=400, detail=str(e))
+    transactions = transactions_in_response(page)
     return WalletInResponse(
         id=wallet.id,
         account_id=wallet.account_id,
@@ -77,6 +91,27 @@ async def transactions(
         tron_address=wallet.tron_address,
         balance=wallet.balance,
         transactions=transactions,
+        transactions_next_cursor=transactions_next_cursor,
+    )
+
+@router.get(
+    path="/transactions-summary",
+    name="wallet:transactions-summary",
+    response_model=TransactionSummaryInResponse,
+    status_code=fastapi.status.HTTP_200_OK,
+    description="交易记录汇总: 总笔数以及充值、提现、任务奖励的累计金额",
+)
+async def transactions_summary(
+    user = fastapi.Depends(get_user_me),
+    wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
+) -> TransactionSummaryInResponse:
+    summary = await wallet_repo.read_transaction_summary(wallet_id=user.wallet_id)
+    return TransactionSummaryInResponse(
+        transaction_count=summary.transaction_count,
+        total_topped_up=summary.total_topped_up,
+        total_withdrawn=summary.total_withdrawn,
+        total_rewarded=summary.total_rewarded,
+        last_transaction_at=summary.last_transaction_at,
     )
 
 @router.post(
@@ -88,20 +123,22 @@ async def transactions(
 async def ipn_callback(request: fastapi.Request,
                        wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)
                        )):
-    sig=request.headers.get("x-nowpayments-sig")
-    message = json.dumps(await request.json(), separators=(',', ':'), sort_keys=True)
-    secret_key = settings.IPN_SECRET
-    result = wallet_repo.np_signature_check(secret_key, sig, message)
-    print(sig)
-    if result:
-        payment = await request.json()
-        print(payment)
-        await wallet_repo.update_payment_status(PaymentUpdate(
-            payment_id=payment.get("payment_id"),
-            payment_status=payment.get("payment_status"),
-        ))
-    else:
+    body = await request.body()
+    try:
+        payment = json.loads(body)
+    except ValueError:
+        raise fastapi.HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail="Malformed callback body")
+    message = json.dumps(payment, separators=(',', ':'), sort_keys=True)
+    if not wallet_repo.np_signature_check(settings.IPN_SECRET, request.headers.get("x-nowpayments-sig"), message):
         raise fastapi.HTTPException(status_code=fastapi.status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    if not isinstance(payment, dict) or payment.get("payment_id") is None or not payment.get("payment_status"):
+        raise fastapi.HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail="Missing payment_id or payment_status")
+
+    # 只记录事件并立即返回, 状态变更和入账由后台消费者批量处理
+    await wallet_repo.record_payment_event(
+        payment_id=str(payment["payment_id"]), payment_status=payment["payment_status"], payload=body.decode()
+    )
+    payment_event_consumer.notify()
     return {"message": "success"}
 
 @router.post(
@@ -109,7 +146,7 @@ async def ipn_callback(request: fastapi.Request,
     name="wallet:check_payment_status",
     response_model=TransactionInResponse,
     status_code=fastapi.status.HTTP_200_OK,
-    description="payment_id为支付id,轮询此接口获取支付状态",
+    description="payment_id为支付id,查询一次支付状态; 状态变化请订阅WebSocket /api/ws/payment-status, 不要轮询此接口",
 )
 async def check_payment_status(transaction: ReadTransaction,
                                wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
@@ -140,22 +177,11 @@ async def update_wallet(
     user=fastapi.Depends(get_user_me),
 ) -> WalletInResponse:
     wallet = await wallet_repo.read_wallet_by_account_id(account_id=user.id)
-    transactions = wallet.transactions
     wallet = await wallet_repo.update_wallet(wallet, addresses)
-    new_transactions = []
-    for transaction in transactions:
-        new_transactions.append(
-            TransactionInResponse(
-                id=transaction.id,
-                wallet_id=transaction.wallet_id,
-                amount=transaction.amount,
-                created_at=transaction.created_at,
-                updated_at=transaction.updated_at,
-                transaction_type=transaction.transaction_type,
-                transaction_status=transaction.transaction_status,
-                transaction_currency=transaction.transaction_currency,
-            )
-        )
+    recent_transactions, transactions_next_cursor = await wallet_repo.read_transactions_of_wallet(
+        wallet_id=wallet.id, page_size=settings.RECENT_TRANSACTIONS_COUNT
+    )
+    new_transactions = transactions_in_response(recent_transactions)
     return WalletInResponse(
         id=wallet.id,
         account_id=wallet.account_id,
@@ -165,6 +191,7 @@ async def update_wallet(
         tron_address=wallet.tron_address,
         balance=wallet.balance,
         transactions=new_transactions,
+        transactions_next_cursor=transactions_next_cursor,
     )
 
 @router.post(
@@ -179,21 +206,11 @@ async def withdraw(
     wallet_repo: WalletCrudRepository = fastapi.Depends(get_repository(repo_type=WalletCrudRepository)),
     user=fastapi.Depends(get_user_me),
 ) -> WalletInResponse:
-    wallet = await wallet_repo.withdraw(withdraw, user)
-    transactions = []
-    for transaction in wallet.transactions:
-        transactions.append(
-            TransactionInResponse(
-                id=transaction.id,
-                wallet_id=transaction.wallet_id,
-                amount=transaction.amount,
-                created_at=transaction.created_at,
-                updated_at=transaction.updated_at,
-                transaction_type=transaction.transaction_type,
-                transaction_status=transaction.transaction_status,
-                transaction_currency=transaction.transaction_currency,
-            )
-        )
+    wallet = await wallet_repo.withdraw(withdraw=withdraw, wallet_id=user.wallet_id)
+    recent_transactions, transactions_next_cursor = await wallet_repo.read_transactions_of_wallet(
+        wallet_id=wallet.id, page_size=settings.RECENT_TRANSACTIONS_COUNT
+    )
+    transactions = transactions_in_response(recent_transactions)
     return WalletInResponse(
         id=wallet.id,
         account_id=wallet.account_id,
@@ -203,4 +220,5 @@ async def withdraw(
         tron_address=wallet.tron_address,
         balance=wallet.balance,
         transactions=transactions,
+        transactions_next_cursor=transactions_next_cursor,
         )
\ No newline at end of file
@@ -3,12 +3,37 @@ import typing
 import fastapi
 import loguru
 
+from src.repository.database import async_db
 from src.repository.events import dispose_db_connection, initialize_db_connection
+from src.repository.workers.account_activity import account_activity_updater
+from src.repository.workers.ledger_reconcile import ledger_reconciler
+from src.repository.workers.payment_events import payment_event_consumer
+from src.repository.workers.payment_status import payment_status_hub
+from src.repository.workers.task_progress import task_progress_engine
+from src.repository.workers.token_revocation import token_revocation_list
+from src.config.manager import settings
+from src.securities.hashing.executor import hashing_executor
+from src.securities.hashing.hash import hash_generator
+from src.utilities.caches.task_categories import task_category_catalog
+from src.utilities.http.clients import http_clients
 
 
 def execute_backend_server_event_handler(backend_app: fastapi.FastAPI) -> typing.Any:
     async def launch_backend_server_events() -> None:
         await initialize_db_connection(backend_app=backend_app)
+        await http_clients.startup()
+        hashing_executor.start()
+        await hash_generator.calibrate(
+            target_ms=settings.HASHING_TARGET_MS, max_time_cost=settings.HASHING_ARGON2_MAX_TIME_COST
+        )
+        async with async_db.new_session() as async_session:
+            await task_category_catalog.load(async_session=async_session)
+        task_progress_engine.start()
+        payment_event_consumer.start()
+        payment_status_hub.start()
+        ledger_reconciler.start()
+        await token_revocation_list.rebuild()
+        token_revocation_list.start()
 
     return launch_backend_server_events
 
@@ -16,6 +41,14 @@ def execute_backend_server_event_handler(backend_app: fastapi.FastAPI) -> typing
 def terminate_backend_server_event_handler(backend_app: fastapi.FastAPI) -> typing.Any:
     @loguru.logger.catch
     async def stop_backend_server_events() -> None:
+        await task_progress_engine.stop()
+        await payment_event_consumer.stop()
+        await payment_status_hub.stop()
+        await ledger_reconciler.stop()
+        await token_revocation_list.stop()
+        await account_activity_updater.drain()
+        await http_clients.shutdown()
+        hashing_executor.shutdown()
         await dispose_db_connection(backend_app=backend_app)
 
     return stop_backend_server_events
@@ -47,7 +47,10 @@ class BackendBaseSettings(BaseSettings):
     JWT_MIN: int = decouple.config("JWT_MIN", cast=int)  # type: ignore
     JWT_HOUR: int = decouple.config("JWT_HOUR", cast=int)  # type: ignore
     JWT_DAY: int = decouple.config("JWT_DAY", cast=int)  # type: ignore
-    JWT_ACCESS_TOKEN_EXPIRATION_TIME: int = JWT_MIN * JWT_HOUR * JWT_DAY
+    JWT_ACCESS_TOKEN_EXPIRATION_MIN: int = decouple.config("JWT_ACCESS_TOKEN_EXPIRATION_MIN", default=15, cast=int)  # type: ignore
+    JWT_REFRESH_TOKEN_EXPIRATION_DAY: int = decouple.config("JWT_REFRESH_TOKEN_EXPIRATION_DAY", default=30, cast=int)  # type: ignore
+    TOKEN_REVOCATION_SYNC_INTERVAL_SEC: int = decouple.config("TOKEN_REVOCATION_SYNC_INTERVAL_SEC", default=5, cast=int)  # type: ignore
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = decouple.config("TOKEN_REVOCATION_FILTER_CAPACITY", default=100000, cast=int)  # type: ignore
 
     IS_ALLOWED_CREDENTIALS: bool = decouple.config("IS_ALLOWED_CREDENTIALS", cast=bool)  # type: ignore
     ALLOWED_ORIGINS: list[str] = ["*"]
@@ -57,10 +60,18 @@ class BackendBaseSettings(BaseSettings):
     LOGGING_LEVEL: int = logging.INFO
     LOGGERS: tuple[str, str] = ("uvicorn.asgi", "uvicorn.access")
 
-    HASHING_ALGORITHM_LAYER_1: str = decouple.config("HASHING_ALGORITHM_LAYER_1", cast=str)  # type: ignore
     HASHING_ALGORITHM_LAYER_2: str = decouple.config("HASHING_ALGORITHM_LAYER_2", cast=str)  # type: ignore
-    HASHING_SALT: str = decouple.config("HASHING_SALT", cast=str)  # type: ignore
+    HASHING_POLICY_VERSION: int = decouple.config("HASHING_POLICY_VERSION", default=1, cast=int)  # type: ignore
+    HASHING_ARGON2_TIME_COST: int = decouple.config("HASHING_ARGON2_TIME_COST", default=3, cast=int)  # type: ignore
+    HASHING_ARGON2_MEMORY_KIB: int = decouple.config("HASHING_ARGON2_MEMORY_KIB", default=65536, cast=int)  # type: ignore
+    HASHING_ARGON2_PARALLELISM: int = decouple.config("HASHING_ARGON2_PARALLELISM", default=2, cast=int)  # type: ignore
+    HASHING_ARGON2_MAX_TIME_COST: int = decouple.config("HASHING_ARGON2_MAX_TIME_COST", default=10, cast=int)  # type: ignore
+    HASHING_TARGET_MS: int = decouple.config("HASHING_TARGET_MS", default=100, cast=int)  # type: ignore
+    HASHING_POOL_WORKERS: int = decouple.config("HASHING_POOL_WORKERS", default=2, cast=int)  # type: ignore
+    HASHING_MAX_PENDING: int = decouple.config("HASHING_MAX_PENDING", default=64, cast=int)  # type: ignore
+    HASHING_QUEUE_TIMEOUT_MS: int = decouple.config("HASHING_QUEUE_TIMEOUT_MS", default=2000, cast=int)  # type: ignore
     JWT_ALGORITHM: str = decouple.config("JWT_ALGORITHM", cast=str)  # type: ignore
+    JWT_VERIFIED_CACHE_SIZE: int = decouple.config("JWT_VERIFIED_CACHE_SIZE", default=10000, cast=int)  # type: ignore
 
     MYSQL_SCHEMA: str = decouple.config("MYSQL_SCHEMA", cast=str)  # type: ignore
     MYSQL_DB: str = decouple.config("MYSQL_DB", cast=str)  # type: ignore
@@ -70,6 +81,14 @@ class BackendBaseSettings(BaseSettings):
     MYSQL_HOST: str = decouple.config("MYSQL_HOST", cast=str)  # type: ignore
     NOWPAYMENTS_API_KEY: str = decouple.config("NOWPAYMENTS_API_KEY", cast=str)  # type: ignore
     IPN_SECRET: str = decouple.config("IPN_SECRET", cast=str)  # type: ignore
+    PAYMENT_PROVIDER: str = decouple.config("PAYMENT_PROVIDER", default="nowpayments", cast=str)  # type: ignore
+    RECENT_TRANSACTIONS_COUNT: int = decouple.config("RECENT_TRANSACTIONS_COUNT", default=10, cast=int)  # type: ignore
+    PAYMENT_EVENT_BATCH_SIZE: int = decouple.config("PAYMENT_EVENT_BATCH_SIZE", default=100, cast=int)  # type: ignore
+    PAYMENT_EVENT_POLL_INTERVAL_SEC: int = decouple.config("PAYMENT_EVENT_POLL_INTERVAL_SEC", default=5, cast=int)  # type: ignore
+    PAYMENT_STATUS_POLL_INTERVAL_SEC: int = decouple.config("PAYMENT_STATUS_POLL_INTERVAL_SEC", default=2, cast=int)  # type: ignore
+    LEDGER_RECONCILE_INTERVAL_MIN: int = decouple.config("LEDGER_RECONCILE_INTERVAL_MIN", default=60, cast=int)  # type: ignore
+    LEDGER_RECONCILE_CHUNK_SIZE: int = decouple.config("LEDGER_RECONCILE_CHUNK_SIZE", default=1000, cast=int)  # type: ignore
+    PAYMENT_ORDER_CACHE_TTL_MIN: int = decouple.config("PAYMENT_ORDER_CACHE_TTL_MIN", default=60, cast=int)  # type: ignore
     AWS_ACCESS_KEY_ID: str = decouple.config("AWS_ACCESS_KEY_ID", cast=str)  # type: ignore
     AWS_SECRET_ACCESS_KEY: str = decouple.config("AWS_SECRET_ACCESS_KEY", cast=str)  # type: ignore
     AWS_REGION_NAME: str = decouple.config("AWS_REGION_NAME", cast=str)  # type: ignore
@@ -78,6 +97,15 @@ class BackendBaseSettings(BaseSettings):
     RECAPTCHA_SECRET_KEY: str = decouple.config("RECAPTCHA_SECRET_KEY", cast=str)  # type: ignore
     RECAPTCHA_SITE_KEY: str = decouple.config("RECAPTCHA_SITE_KEY", cast=str)  # type: ignore
     IPREGISTRY_API_KEY: str = decouple.config("IPREGISTRY_API_KEY", cast=str)  # type: ignore
+    GEOIP_BACKEND: str = decouple.config("GEOIP_BACKEND", default="ipregistry", cast=str)  # type: ignore
+    GEOIP_CACHE_SIZE: int = decouple.config("GEOIP_CACHE_SIZE", default=10000, cast=int)  # type: ignore
+    GEOIP_CACHE_TTL_MIN: int = decouple.config("GEOIP_CACHE_TTL_MIN", default=60, cast=int)  # type: ignore
+    GEOIP_STORE_TTL_DAY: int = decouple.config("GEOIP_STORE_TTL_DAY", default=30, cast=int)  # type: ignore
+    CURATED_MOVIES_CACHE_TTL_SEC: int = decouple.config("CURATED_MOVIES_CACHE_TTL_SEC", default=60, cast=int)  # type: ignore
+    TASK_CATEGORY_CATALOG_CHECK_SEC: int = decouple.config("TASK_CATEGORY_CATALOG_CHECK_SEC", default=5, cast=int)  # type: ignore
+    TASK_PROGRESS_BATCH_SIZE: int = decouple.config("TASK_PROGRESS_BATCH_SIZE", default=500, cast=int)  # type: ignore
+    TASK_PROGRESS_BATCH_INTERVAL_MS: int = decouple.config("TASK_PROGRESS_BATCH_INTERVAL_MS", default=500, cast=int)  # type: ignore
+    ACCOUNT_ACTIVITY_DEBOUNCE_MIN: int = decouple.config("ACCOUNT_ACTIVITY_DEBOUNCE_MIN", default=10, cast=int)  # type: ignore
 
 
 
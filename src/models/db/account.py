@@ -64,6 +64,30 @@ class Account(Base):  # type: ignore
         self._hash_salt = hash_salt
 
 
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    # 只保存token的sha256, 轮换时旧token作废, 同一family的token被重复使用时整个family作废
+    id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement="auto")
+    account_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("account.id", ondelete="CASCADE"), nullable=False)
+    token_hash: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False, unique=True)
+    family_id: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=32), nullable=False, index=True)
+    expires_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(sqlalchemy.DateTime(timezone=True), nullable=False)
+    revoked_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(sqlalchemy.DateTime(timezone=True), nullable=True)
+    created_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(
+        sqlalchemy.DateTime(timezone=True), nullable=False, server_default=sqlalchemy_functions.now()
+    )
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # 被撤销的access token的jti, 过期后可以清理
+    id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement="auto")
+    jti: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=32), nullable=False, unique=True)
+    expires_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(sqlalchemy.DateTime(timezone=True), nullable=False, index=True)
+
+
 class Referal(Base):
     __tablename__ = "referal"
 
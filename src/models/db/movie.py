@@ -9,11 +9,13 @@ from sqlalchemy.orm import Mapped as SQLAlchemyMapped, mapped_column as sqlalche
 
 from sqlalchemy.sql import functions as sqlalchemy_functions
 
+RATING_STARS = (1, 2, 3, 4, 5)
+
 class Movie(Base):
     __tablename__ = 'movies'
 
     id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement=True)
-    title: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
+    title: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False, index=True)
     description: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.Text, nullable=False)
     year: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False)
     rating: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=128), nullable=False)
@@ -30,7 +32,23 @@ class Movie(Base):
     homepage: SQLAlchemyMapped["HomePage"] = relationship("HomePage", back_populates="movie", uselist=False)
     searchingpage: SQLAlchemyMapped["SearchingPage"] = relationship("SearchingPage", back_populates="movie", uselist=False)
     justreviewed: SQLAlchemyMapped["JustReviewed"] = relationship("JustReviewed", back_populates="movie", uselist=False)
-
+    genres: SQLAlchemyMapped[List["Genre"]] = relationship("Genre", secondary="movie_genres", back_populates="movies")
+    # 评分聚合随评论增删在同一事务中增量维护, 不再每次扫描全部评论
+    review_count: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, default=0, server_default="0")
+    rating_sum: SQLAlchemyMapped[float] = sqlalchemy_mapped_column(sqlalchemy.Float, nullable=False, default=0, server_default="0")
+    # DOUBLE而不是FLOAT, 分页游标里的平均分才能与列值精确比较
+    average_rating: SQLAlchemyMapped[float] = sqlalchemy_mapped_column(sqlalchemy.Double, nullable=False, default=0, server_default="0")
+    rating_1_count: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, default=0, server_default="0")
+    rating_2_count: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, default=0, server_default="0")
+    rating_3_count: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, default=0, server_default="0")
+    rating_4_count: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, default=0, server_default="0")
+    rating_5_count: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        sqlalchemy.Index("ix_movies_average_rating_id", "average_rating", "id"),
+        sqlalchemy.Index("ix_movies_year_id", "year", "id"),
+        sqlalchemy.Index("ix_movies_fulltext", "title", "description", "director", "cast", mysql_prefix="FULLTEXT"),
+    )
     __mapper_args__ = {"eager_defaults": True}
 
 class Reviews(Base):
@@ -52,6 +70,10 @@ class Reviews(Base):
     movie: SQLAlchemyMapped["Movie"] = relationship("Movie", back_populates="reviews")
     account: SQLAlchemyMapped["Account"] = relationship("Account", back_populates="reviews")
 
+    __table_args__ = (
+        # 单部电影的评论按时间倒序分页
+        sqlalchemy.Index("ix_reviews_movie_id_id", "movie_id", "id"),
+    )
     __mapper_args__ = {"eager_defaults": True}
 
 class HomePage(Base):
@@ -80,3 +102,17 @@ class JustReviewed(Base):
     movie: SQLAlchemyMapped["Movie"] = relationship("Movie", back_populates="justreviewed")
 
     __mapper_args__ = {"eager_defaults": True}
+
+class Genre(Base):
+    __tablename__ = 'genres'
+
+    id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement=True)
+    name: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False, unique=True)
+    movies: SQLAlchemyMapped[List["Movie"]] = relationship("Movie", secondary="movie_genres", back_populates="genres")
+
+class MovieGenre(Base):
+    __tablename__ = 'movie_genres'
+
+    # 主键(genre_id, movie_id)即按类型分页所用的索引
+    genre_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
+    movie_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True, index=True)
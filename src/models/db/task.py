@@ -1,4 +1,5 @@
 import datetime
+import decimal
 from typing import Sequence, List
 
 import sqlalchemy
@@ -48,3 +49,27 @@ class Task(Base):
 
     __mapper_args__ = {"eager_defaults": True}
 
+class CatalogVersion(Base):
+    __tablename__ = 'catalog_versions'
+
+    # 管理员修改目录数据(如任务种类)时递增, 各个worker据此判断内存目录是否过期
+    name: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), primary_key=True)
+    version: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, nullable=False, server_default="0")
+
+class TaskRewardClaim(Base):
+    __tablename__ = 'task_reward_claims'
+
+    # task_id唯一: 数据库层面保证每个任务的奖励只能领取一次
+    id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement=True)
+    task_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, unique=True)
+    account_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("account.id", ondelete="CASCADE"), nullable=False)
+    idempotency_key: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=True)
+    reward: SQLAlchemyMapped[decimal.Decimal] = sqlalchemy_mapped_column(sqlalchemy.Numeric(precision=20, scale=8), nullable=False)
+    transaction_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("transactions.id"), nullable=False)
+    created_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(
+        sqlalchemy.DateTime(timezone=True), nullable=False, server_default=sqlalchemy_functions.now()
+    )
+
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("account_id", "idempotency_key", name="uq_task_reward_claims_account_id_idempotency_key"),
+    )
@@ -1,4 +1,5 @@
 import datetime
+import decimal
 from typing import List
 
 import sqlalchemy
@@ -14,7 +15,8 @@ class Wallet(Base):
     usdt_address: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=True)
     ethereum_address: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=True)
     tron_address: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=True)
-    balance: SQLAlchemyMapped[float] = sqlalchemy_mapped_column(sqlalchemy.Float, nullable=False, server_default="0")
+    # 物化余额, 只通过账本过账时的原子增量更新, 可由账本重建
+    balance: SQLAlchemyMapped[decimal.Decimal] = sqlalchemy_mapped_column(sqlalchemy.Numeric(precision=20, scale=8), nullable=False, server_default="0")
     transactions: Mapped[List["Transactions"]] = relationship("Transactions", back_populates="wallet")
     account_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("account.id", ondelete="CASCADE"))
     account: Mapped["Account"] = relationship("Account", back_populates="wallet", uselist=False)
@@ -26,7 +28,7 @@ class Transactions(Base):
     id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement="auto")
     wallet_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("wallet.id"))
     wallet: Mapped["Wallet"] = relationship("Wallet", back_populates="transactions", uselist=False)
-    amount: SQLAlchemyMapped[float] = sqlalchemy_mapped_column(sqlalchemy.Float, nullable=False)
+    amount: SQLAlchemyMapped[decimal.Decimal] = sqlalchemy_mapped_column(sqlalchemy.Numeric(precision=20, scale=8), nullable=False)
     created_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(
         sqlalchemy.DateTime(timezone=True), nullable=False, server_default=sqlalchemy_functions.now()
     )
@@ -41,4 +43,44 @@ class Transactions(Base):
     order_id: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
     payment_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=True)
 
-    __mapper_args__ = {"eager_defaults": True}
\ No newline at end of file
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # 按钱包分页读取交易记录
+        sqlalchemy.Index("ix_transactions_wallet_id_id", "wallet_id", "id"),
+    )
+
+class PaymentEvent(Base):
+    __tablename__ = "payment_events"
+    id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement="auto")
+    payment_id: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
+    payment_status: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
+    payload: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.Text, nullable=False)
+    received_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(
+        sqlalchemy.DateTime(timezone=True), nullable=False, server_default=sqlalchemy_functions.now()
+    )
+    processed_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(sqlalchemy.DateTime(timezone=True), nullable=True)
+
+    # nowpayments会重试回调, 同一支付的同一状态只保存一次
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("payment_id", "payment_status", name="uq_payment_events_payment_id_payment_status"),
+        sqlalchemy.Index("ix_payment_events_processed_at_id", "processed_at", "id"),
+    )
+
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entries"
+    # 复式记账: 同一journal_id下的分录金额之和为0, 只追加不修改
+    id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(primary_key=True, autoincrement="auto")
+    journal_id: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=96), nullable=False)
+    account: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
+    wallet_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("wallet.id", ondelete="CASCADE"), nullable=True)
+    amount: SQLAlchemyMapped[decimal.Decimal] = sqlalchemy_mapped_column(sqlalchemy.Numeric(precision=20, scale=8), nullable=False)
+    entry_type: SQLAlchemyMapped[str] = sqlalchemy_mapped_column(sqlalchemy.String(length=64), nullable=False)
+    transaction_id: SQLAlchemyMapped[int] = sqlalchemy_mapped_column(sqlalchemy.Integer, sqlalchemy.ForeignKey("transactions.id"), nullable=True)
+    created_at: SQLAlchemyMapped[datetime.datetime] = sqlalchemy_mapped_column(
+        sqlalchemy.DateTime(timezone=True), nullable=False, server_default=sqlalchemy_functions.now()
+    )
+
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("journal_id", "account", name="uq_ledger_entries_journal_id_account"),
+        sqlalchemy.Index("ix_ledger_entries_wallet_id_id", "wallet_id", "id"),
+    )
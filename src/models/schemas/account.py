@@ -32,7 +32,9 @@ class AccountInLogin(BaseSchemaModel):
 
 class AccountWithToken(BaseSchemaModel):
     profile_picture: str
-    token: str
+    # 只在登录/注册/刷新时签发, 读取接口不再返回token
+    token: str | None = None
+    refresh_token: str | None = None
     username: str
     email: pydantic.EmailStr
     is_verified: bool
@@ -0,0 +1,15 @@
+from src.models.schemas.base import BaseSchemaModel
+
+
+class GeoIPDetails(BaseSchemaModel):
+    ip: str
+    is_proxy: bool = False
+    calling_code: str = "Unknown"
+    country_name: str = "Unknown"
+    country_code: str = "Unknown"
+    region_name: str = "Unknown"
+    city: str = "Unknown"
+
+    @property
+    def ip_location(self) -> str:
+        return f"{self.country_name}, {self.region_name}, {self.city}"
@@ -1,4 +1,5 @@
 import datetime
+import typing
 
 import pydantic
 from fastapi.security import OAuth2PasswordBearer
@@ -12,5 +13,30 @@ class JWToken(pydantic.BaseModel):
 class JWTAccount(pydantic.BaseModel):
     username: str
     email: pydantic.EmailStr
+    # 旧token没有以下字段
+    account_id: int | None = None
+    wallet_id: int | None = None
+    level: int | None = None
+    jti: str | None = None
+
+
+class AccountPrincipal(typing.NamedTuple):
+    id: int
+    username: str
+    level: int
+    wallet_id: int
+    # 旧token没有jti, 无法单独撤销
+    jti: str | None = None
+    expires_at: int | None = None
+
+
+class RefreshTokenInRequest(pydantic.BaseModel):
+    refresh_token: str
+
+
+class TokenPairInResponse(pydantic.BaseModel):
+    token: str
+    refresh_token: str
+    expires_in: int
 
 
@@ -25,6 +25,9 @@ class ReviewInResponse(ReviewBase):
     profile_picture: str
     username: str
 
+class ReviewsInResponse(BaseSchemaModel):
+    reviews: List[ReviewInResponse]
+    next_cursor: Optional[str] = None
 
 
 class MovieBase(BaseSchemaModel):
@@ -69,7 +72,15 @@ class RatingPercentages(BaseSchemaModel):
 class MovieInResponse(MovieBase):
     id: int
     reviews: Optional[List[ReviewInResponse]] = None
+    reviews_next_cursor: Optional[str] = None
+    review_count: Optional[int] = None
     movie_rating: Optional[RatingPercentages] = None
 
 class MoviesInResponse(BaseSchemaModel):
-    movies: List[MovieInResponse]
\ No newline at end of file
+    movies: List[MovieInResponse]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None
+
+class GenreFacetInResponse(BaseSchemaModel):
+    genre: str
+    movie_count: int
\ No newline at end of file
@@ -1,6 +1,8 @@
 import datetime
 from typing import Optional
 
+import pydantic
+
 from src.models.schemas.base import BaseSchemaModel
 
 class TaskCategoryBase(BaseSchemaModel):
@@ -37,3 +39,24 @@ class TaskInResponse(TaskBase):
 class TaskInAssign(BaseSchemaModel):
     account_id: int
     task_level: int
+
+class TaskInBulkAssign(BaseSchemaModel):
+    account_ids: list[int] = pydantic.Field(min_length=1, max_length=100_000)
+    task_level: int | None = None
+    task_category_id: int | None = None
+
+    @pydantic.model_validator(mode="after")
+    def check_level_or_category(self) -> "TaskInBulkAssign":
+        if (self.task_level is None) == (self.task_category_id is None):
+            raise ValueError("Exactly one of task_level and task_category_id is required")
+        return self
+
+class TaskProgressDistributionInResponse(BaseSchemaModel):
+    task_category_id: int
+    task_count: int
+    completed_count: int
+    claimed_count: int
+    mean: float
+    median: float
+    bucket_edges: list[float]
+    bucket_counts: list[int]
@@ -71,6 +71,14 @@ class WalletInResponse(BaseSchemaModel):
     tron_address: Optional[str]=None
     balance: float
     transactions: Optional[list[TransactionInResponse]] = None
+    transactions_next_cursor: Optional[str] = None
+
+class TransactionSummaryInResponse(BaseSchemaModel):
+    transaction_count: int
+    total_topped_up: float
+    total_withdrawn: float
+    total_rewarded: float
+    last_transaction_at: datetime.datetime | None
 
 class TopupInCreate(BaseSchemaModel):
     amount: float
@@ -1,38 +1,38 @@
 import datetime
 import typing
 
+import loguru
 import sqlalchemy
 from fastapi import HTTPException
 from sqlalchemy.sql import functions as sqlalchemy_functions
-import httpx
 import re
 import random
 import string
 
-from src.config.manager import settings
 from src.models.db.account import Account, Referal, CustomerService
-from src.models.db.task import Task, TaskCategory
+from src.models.db.movie import Reviews
 from src.models.db.wallet import Wallet
 from src.models.schemas.account import AccountInCreate, AccountInLogin, AccountInUpdate
 from src.models.schemas.account import IPCheckInResponse
+from src.models.schemas.jwt import AccountPrincipal
 from src.models.schemas.wallet import WalletInCreate
 from src.repository.crud.base import BaseCRUDRepository
+from src.repository.crud.movie import MovieCRUDRepository
+from src.repository.crud.task import TaskCrudRepository
 from src.securities.hashing.password import pwd_generator
 from src.securities.verifications.credentials import credential_verifier
 from src.utilities.exceptions.database import EntityAlreadyExists, EntityDoesNotExist
-from src.utilities.exceptions.password import PasswordDoesNotMatch
+from src.utilities.exceptions.geoip import GeoIPLookupError
+from src.utilities.geoip.resolver import geoip_resolver
+from src.utilities.http.clients import http_clients
+from src.utilities.exceptions.password import PasswordDoesNotMatch, PasswordHashingBusy
 
 
 class AccountCRUDRepository(BaseCRUDRepository):
     async def create_account(self, account_create: AccountInCreate,request) -> typing.Tuple[Account, Wallet]:
         new_account = Account(username=account_create.username, email=account_create.email, is_logged_in=True, registration_ip=request.client.host)
 
-        new_account.set_hash_salt(hash_salt=pwd_generator.generate_salt)
-        new_account.set_hashed_password(
-            hashed_password=pwd_generator.generate_hashed_password(
-                hash_salt=new_account.hash_salt, new_password=account_create.password
-            )
-        )
+        await self.set_account_password(account=new_account, password=account_create.password)
 
         self.async_session.add(instance=new_account)
         await self.async_session.flush()
@@ -42,12 +42,7 @@ class AccountCRUDRepository(BaseCRUDRepository):
     async def create_account_by_admin(self, account_create: AccountInCreate,request) -> Account:
         new_account = Account(username=account_create.username, email=account_create.email, is_logged_in=True, registration_ip=request.client.host, is_test_account=True)
 
-        new_account.set_hash_salt(hash_salt=pwd_generator.generate_salt)
-        new_account.set_hashed_password(
-            hashed_password=pwd_generator.generate_hashed_password(
-                hash_salt=new_account.hash_salt, new_password=account_create.password
-            )
-        )
+        await self.set_account_password(account=new_account, password=account_create.password)
 
         self.async_session.add(instance=new_account)
         await self.async_session.flush()
@@ -55,6 +50,16 @@ class AccountCRUDRepository(BaseCRUDRepository):
         return new_account, new_wallet
 
 
+    async def set_account_password(self, account: Account, password: str) -> None:
+        # 哈希在进程池中执行, 不阻塞事件循环
+        try:
+            account.set_hash_salt(hash_salt=pwd_generator.generate_salt)
+            account.set_hashed_password(
+                hashed_password=await pwd_generator.generate_hashed_password(hash_salt=account.hash_salt, new_password=password)
+            )
+        except PasswordHashingBusy as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
     async def read_accounts(self) -> typing.Sequence[Account]:
         stmt = sqlalchemy.select(Account)
         query = await self.async_session.execute(statement=stmt)
@@ -69,24 +74,43 @@ class AccountCRUDRepository(BaseCRUDRepository):
 
         return query.scalar()  # type: ignore
 
-    async def read_account_by_username(self, username: str, request) -> Account:
-        stmt = sqlalchemy.select(Account).options(sqlalchemy.orm.joinedload(Account.wallet), sqlalchemy.orm.joinedload(Account.tasks)).where(Account.username == username)
+    async def read_account_by_username(self, username: str) -> Account:
+        stmt = sqlalchemy.select(Account).options(sqlalchemy.orm.joinedload(Account.wallet)).where(Account.username == username)
         query = await self.async_session.execute(statement=stmt)
 
         if not query:
             raise EntityDoesNotExist(f"Account with username `{username}` does not exist!")
 
-        db_account = query.scalar()  # type: ignore
-        db_account.current_ip = request.client.host
-        db_account.is_logged_in = True
-        ip_check = await self.is_ip_proxy(ip=db_account.current_ip)
-        db_account.is_proxy = ip_check.is_proxy
-        db_account.ip_location = ip_check.ip_location
-        db_account.updated_at = datetime.datetime.now()
-        db_account.user_agent = request.headers['user-agent']
+        return query.scalar()  # type: ignore
+
+    async def read_principal_by_username(self, username: str) -> AccountPrincipal | None:
+        stmt = (
+            sqlalchemy.select(Account.id, Account.username, Account.level, Wallet.id.label("wallet_id"))
+            .join(Wallet, Wallet.account_id == Account.id)
+            .where(Account.username == username)
+        )
+        row = (await self.async_session.execute(statement=stmt)).first()
+        return None if row is None else AccountPrincipal(*row)
+
+    async def update_account_activity(self, id: int, ip: str, user_agent: str | None) -> None:
+        """
+        Record where an account was last seen from. Runs off the request path, see `AccountActivityUpdater`.
+        """
+        ip_check = await self.is_ip_proxy(ip=ip)
+        stmt = (
+            sqlalchemy.update(table=Account)
+            .where(Account.id == id)
+            .values(
+                current_ip=ip,
+                is_logged_in=True,
+                is_proxy=ip_check.is_proxy,
+                ip_location=ip_check.ip_location,
+                user_agent=user_agent,
+                updated_at=datetime.datetime.now(),
+            )
+        )
+        await self.async_session.execute(statement=stmt)
         await self.async_session.commit()
-        await self.async_session.refresh(instance=db_account)
-        return db_account
 
     async def read_account_by_email(self, email: str) -> Account:
         stmt = sqlalchemy.select(Account).options(sqlalchemy.orm.selectinload(Account.wallet)).where(Account.email == email)
@@ -107,8 +131,18 @@ class AccountCRUDRepository(BaseCRUDRepository):
         if not db_account:
             raise HTTPException(status_code=400, detail="Account does not exist!")  # type: ignore
 
-        if not pwd_generator.is_password_authenticated(hash_salt=db_account.hash_salt, password=account_login.password, hashed_password=db_account.hashed_password):  # type: ignore
+        try:
+            is_authenticated = await pwd_generator.is_password_authenticated(hash_salt=db_account.hash_salt, password=account_login.password, hashed_password=db_account.hashed_password)  # type: ignore
+        except PasswordHashingBusy as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        if not is_authenticated:
             raise HTTPException(status_code=400, detail="Password does not match!")  # type: ignore
+        if pwd_generator.is_rehash_needed(hashed_password=db_account.hashed_password):
+            # 旧策略的哈希在登录时升级, 进程池繁忙时下次再升级
+            try:
+                await self.set_account_password(account=db_account, password=account_login.password)
+            except HTTPException:
+                loguru.logger.warning(f"Hashing --- Skipped rehash of account `{db_account.id}`, pool is busy")
 
         db_account.current_ip = request.client.host
         db_account.is_logged_in = True
@@ -141,8 +175,7 @@ class AccountCRUDRepository(BaseCRUDRepository):
             update_stmt = update_stmt.values(email=new_account_data["email"])
 
         if new_account_data["password"]:
-            update_account.set_hash_salt(hash_salt=pwd_generator.generate_salt)  # type: ignore
-            update_account.set_hashed_password(hashed_password=pwd_generator.generate_hashed_password(hash_salt=update_account.hash_salt, new_password=new_account_data["password"]))  # type: ignore
+            await self.set_account_password(account=update_account, password=new_account_data["password"])  # type: ignore
 
         if new_account_data["profile_image"]:
             update_stmt = update_stmt.values(profile_image=new_account_data["profile_image"])
@@ -161,9 +194,14 @@ class AccountCRUDRepository(BaseCRUDRepository):
         if not delete_account:
             raise EntityDoesNotExist(f"Account with id `{id}` does not exist!")  # type: ignore
 
+        reviewed_movies_stmt = sqlalchemy.select(Reviews.movie_id).where(Reviews.account_id == delete_account.id).distinct()
+        reviewed_movie_ids = (await self.async_session.execute(statement=reviewed_movies_stmt)).scalars().all()
+
         stmt = sqlalchemy.delete(table=Account).where(Account.id == delete_account.id)
 
         await self.async_session.execute(statement=stmt)
+        # 评论由外键级联删除, 需要重新计算这些电影的评分聚合
+        await MovieCRUDRepository(async_session=self.async_session).refresh_rating_aggregates(movie_ids=reviewed_movie_ids)
         await self.async_session.commit()
 
         return f"Account with id '{id}' is successfully deleted!"
@@ -191,61 +229,31 @@ class AccountCRUDRepository(BaseCRUDRepository):
     async def initialize_account(self,account: Account):
         new_wallet = Wallet(account_id=account.id)
         self.async_session.add(instance=new_wallet)
-        stmp = sqlalchemy.select(TaskCategory).where(TaskCategory.access_level == 1)
-        query = await self.async_session.execute(statement=stmp)
-        task_categories = query.scalars().all()
-        tasks = []
-        for task_category in task_categories:
-            db_task = Task(
-                task_category_id=task_category.id,
-                account_id=account.id,
-            )
-            self.async_session.add(instance=db_task)
-            tasks.append(db_task)
+        await TaskCrudRepository(async_session=self.async_session).add_default_tasks(account_id=account.id)
         await self.async_session.commit()
         await self.async_session.refresh(instance=account)
         await self.async_session.refresh(instance=new_wallet)
         return account, new_wallet
 
     async def is_ip_proxy(self, ip: str) -> IPCheckInResponse:
-        ipregistry_api_key = settings.IPREGISTRY_API_KEY
-        url = f"https://api.ipregistry.co/{ip}?key={ipregistry_api_key}"
         if ip == "127.0.0.1":
             return IPCheckInResponse(ip=ip, is_proxy=False, ip_location="Localhost")
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                response.raise_for_status()  # 会抛出异常，如果响应状态不是200
-                result = response.json()
-
-            # Simplify proxy check
-            is_proxy = any(result.get('security', {}).values())
-
-            # Improve location extraction
-            location_data = result.get('location', {})
-            country = location_data.get('country', {}).get('name', "Unknown")
-            region = location_data.get('region', {}).get('name', "Unknown")
-            city = location_data.get('city', "Unknown")
-            ip_location = f"{country}, {region}, {city}"
-
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=e.response.status_code, detail="Error retrieving IP information")
-        except KeyError:
-            raise ValueError("Malformed response received from IP registry API")
+            details = await geoip_resolver.resolve(ip=ip)
+        except GeoIPLookupError as e:
+            raise HTTPException(status_code=e.status_code, detail="Error retrieving IP information")
 
-        return IPCheckInResponse(ip=ip, is_proxy=is_proxy, ip_location=ip_location)
+        return IPCheckInResponse(ip=ip, is_proxy=details.is_proxy, ip_location=details.ip_location)
 
     async def verify_recapcha(self, recaptcha: str) -> bool:
         secret_key = "6LeiQ7YpAAAAAAJHyDtBA1-tiUyAM7QSI6KVGigo"
-        url = "https://www.google.com/recaptcha/api/siteverify"
         payload = {
             'secret': secret_key,
             'response': recaptcha
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, data=payload)
-            result = response.json()
+        response = await http_clients.get(name="recaptcha").post("/recaptcha/api/siteverify", data=payload)
+        result = response.json()
         if not result['success']:
             raise Exception("Recaptcha verification failed")
         return True
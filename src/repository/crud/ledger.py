@@ -0,0 +1,139 @@
+import decimal
+
+import loguru
+import sqlalchemy
+
+from src.models.db.wallet import LedgerEntry, Wallet
+from src.repository.crud.base import BaseCRUDRepository
+
+# 系统账户: 资金进出平台的对手方
+NOWPAYMENTS_ACCOUNT = "external:nowpayments"
+WITHDRAWALS_ACCOUNT = "external:withdrawals"
+TASK_REWARDS_ACCOUNT = "system:task-rewards"
+ADJUSTMENTS_ACCOUNT = "system:adjustments"
+OPENING_ACCOUNT = "system:opening"
+
+Amount = decimal.Decimal | float | int | str
+
+
+def wallet_account(wallet_id: int) -> str:
+    return f"wallet:{wallet_id}"
+
+
+def to_amount(amount: Amount) -> decimal.Decimal:
+    # 经过str转换, 避免float的二进制误差进入账本
+    return decimal.Decimal(str(amount)).quantize(decimal.Decimal("0.00000001"))
+
+
+class LedgerCrudRepository(BaseCRUDRepository):
+    """
+    Posts balanced journals to the append-only `ledger_entries` table and keeps `wallet.balance` as their
+    materialized sum with atomic `balance = balance + amount` updates in the caller's transaction. Nothing is
+    committed here.
+    """
+
+    async def _post(
+        self,
+        journal_id: str,
+        wallet_id: int,
+        amount: decimal.Decimal,
+        counter_account: str,
+        entry_type: str,
+        transaction_id: int | None,
+    ) -> None:
+        await self.async_session.execute(
+            sqlalchemy.insert(LedgerEntry).values([
+                {
+                    "journal_id": journal_id,
+                    "account": wallet_account(wallet_id),
+                    "wallet_id": wallet_id,
+                    "amount": amount,
+                    "entry_type": entry_type,
+                    "transaction_id": transaction_id,
+                },
+                {
+                    "journal_id": journal_id,
+                    "account": counter_account,
+                    "wallet_id": None,
+                    "amount": -amount,
+                    "entry_type": entry_type,
+                    "transaction_id": transaction_id,
+                },
+            ])
+        )
+
+    async def credit_wallet(
+        self,
+        journal_id: str,
+        wallet_id: int,
+        amount: Amount,
+        counter_account: str,
+        entry_type: str,
+        transaction_id: int | None = None,
+    ) -> None:
+        amount = to_amount(amount)
+        await self._post(journal_id, wallet_id, amount, counter_account, entry_type, transaction_id)
+        await self.async_session.execute(
+            sqlalchemy.update(Wallet)
+            .where(Wallet.id == wallet_id)
+            .values(balance=Wallet.balance + amount)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def debit_wallet(
+        self,
+        journal_id: str,
+        wallet_id: int,
+        amount: Amount,
+        counter_account: str,
+        entry_type: str,
+        transaction_id: int | None = None,
+    ) -> bool:
+        """
+        Returns False, posting nothing, when the wallet does not hold `amount`.
+        """
+        amount = to_amount(amount)
+        result = await self.async_session.execute(
+            sqlalchemy.update(Wallet)
+            .where(Wallet.id == wallet_id, Wallet.balance >= amount)
+            .values(balance=Wallet.balance - amount)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+        await self._post(journal_id, wallet_id, -amount, counter_account, entry_type, transaction_id)
+        return True
+
+    async def read_ledger_balance(self, wallet_id: int) -> decimal.Decimal:
+        stmt = sqlalchemy.select(sqlalchemy.func.coalesce(sqlalchemy.func.sum(LedgerEntry.amount), 0)).where(
+            LedgerEntry.wallet_id == wallet_id
+        )
+        return to_amount(await self.async_session.scalar(stmt))
+
+    async def reconcile_wallet_balances(self, chunk_size: int = 1000) -> int:
+        """
+        Rebuild `wallet.balance` from the ledger, one id range of `chunk_size` wallets per statement and commit,
+        and return how many balances had drifted.
+        """
+        ledger_balance = (
+            sqlalchemy.select(sqlalchemy.func.coalesce(sqlalchemy.func.sum(LedgerEntry.amount), 0))
+            .where(LedgerEntry.wallet_id == Wallet.id)
+            .scalar_subquery()
+        )
+        max_id = await self.async_session.scalar(sqlalchemy.select(sqlalchemy.func.max(Wallet.id)))
+        drifted = 0
+        for start in range(0, (max_id or 0) + 1, chunk_size):
+            result = await self.async_session.execute(
+                sqlalchemy.update(Wallet)
+                .where(Wallet.id >= start, Wallet.id < start + chunk_size, Wallet.balance != ledger_balance)
+                .values(balance=ledger_balance)
+                .execution_options(synchronize_session=False)
+            )
+            await self.async_session.commit()
+            if result.rowcount:
+                loguru.logger.warning(
+                    f"Ledger --- Rebuilt {result.rowcount} drifted balances of wallets {start}-{start + chunk_size - 1}"
+                )
+            drifted += result.rowcount
+        return drifted
+
@@ -1,14 +1,29 @@
 import typing
 
 import sqlalchemy
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.exc import IntegrityError
 
-from src.models.db.movie import Movie, Reviews, SearchingPage, HomePage, JustReviewed
-from src.models.schemas.movie import MovieInCreate, ReviewInCreate, RatingPercentages
+from src.models.db.account import Account
+from src.models.db.movie import RATING_STARS, Movie, Reviews, SearchingPage, HomePage, JustReviewed, Genre, MovieGenre
+from src.models.schemas.movie import MovieInCreate, ReviewInCreate, RatingPercentages, MovieInResponse, MoviesInResponse
 from src.repository.crud.base import BaseCRUDRepository
+from src.utilities.caches.curated_movies import curated_movie_list_cache
 from src.utilities.exceptions.database import EntityDoesNotExist, EntityAlreadyExists
+from src.utilities.formatters.cursor import decode_cursor, encode_cursor
+from src.utilities.formatters.search import FULLTEXT_MIN_TOKEN_SIZE, format_boolean_prefix_query, tokenize_search_query
 from src.utilities.imdb_scraper.imdb import async_get_by_id
 
 
+def parse_genre_names(genre: str | None) -> list[str]:
+    names: dict[str, str] = dict()
+    for name in (genre or "").split(","):
+        name = name.strip()[:64]
+        if name:
+            names.setdefault(name.lower(), name)
+    return list(names.values())
+
+
 class MovieCRUDRepository(BaseCRUDRepository):
     async def create_movie(self, movie: MovieInCreate,account_id: int) -> Movie:
         if movie.imdb_url:
@@ -37,13 +52,14 @@ class MovieCRUDRepository(BaseCRUDRepository):
                 director=movie.director,
                 cast=movie.cast,
                 duration=movie.duration,
-                cover_image_url=movie.cover_image_url,
+                cover_image_url=str(movie.cover_image_url) if movie.cover_image_url else None,
                 account_id=account_id
             )
         try:
             await self.is_movie_title_taken(title=new_movie.title)
         except EntityAlreadyExists:
             raise EntityAlreadyExists(f"Movie with title `{new_movie.title}` already exists!")
+        new_movie.genres = await self.read_or_create_genres(names=parse_genre_names(genre=new_movie.genre))
         self.async_session.add(instance=new_movie)
         await self.async_session.commit()
         await self.async_session.refresh(instance=new_movie)
@@ -57,27 +73,84 @@ class MovieCRUDRepository(BaseCRUDRepository):
             rating=review.rating,
         )
         self.async_session.add(instance=new_review)
+        await self.apply_review_to_rating_aggregates(movie_id=review.movie_id, rating=review.rating)
         await self.async_session.commit()
         await self.async_session.refresh(instance=new_review)
         return new_review
 
+    async def delete_review(self, review_id: int, account_id: int) -> None:
+        stmt = sqlalchemy.select(Reviews).where(Reviews.id == review_id, Reviews.account_id == account_id)
+        query = await self.async_session.execute(statement=stmt)
+        review = query.scalar()
+
+        if not review:
+            raise EntityDoesNotExist(f"Review with id `{review_id}` does not exist!")
+
+        await self.async_session.delete(review)
+        await self.apply_review_to_rating_aggregates(movie_id=review.movie_id, rating=review.rating, sign=-1)
+        await self.async_session.commit()
+
     async def read_movie_by_id(self, id: int) -> Movie:
-        stmt = sqlalchemy.select(Movie).options(sqlalchemy.orm.joinedload(Movie.reviews).joinedload(Reviews.account)).where(Movie.id == id)
+        # 评论通过 read_reviews_of_movie 单独分页读取, 这里只读电影本身
+        stmt = sqlalchemy.select(Movie).where(Movie.id == id)
         query = await self.async_session.execute(statement=stmt)
+        movie = query.scalar()
 
-        if not query:
+        if not movie:
             raise EntityDoesNotExist(f"Movie with id `{id}` does not exist!")
 
-        return query.scalar()
+        return movie
+
+    async def read_reviews_of_movie(
+        self, movie_id: int, cursor: str | None = None, page_size: int = 10
+    ) -> typing.Tuple[typing.Sequence[sqlalchemy.Row], str | None]:
+        """
+        Newest-first page of the reviews of a movie with only the author columns the response needs, walking the
+        (movie_id, id) index. Returns the rows and the cursor of the next page.
+        """
+        # id随插入时间单调递增, 按id分页与按created_at一致, 且游标值可以精确比较
+        stmt = (
+            sqlalchemy.select(
+                Reviews.id,
+                Reviews.movie_id,
+                Reviews.account_id,
+                Reviews.review,
+                Reviews.rating,
+                Reviews.created_at,
+                Reviews.updated_at,
+                Account.profile_image,
+                Account.username,
+            )
+            .join(Account, Account.id == Reviews.account_id)
+            .where(Reviews.movie_id == movie_id)
+            .order_by(Reviews.id.desc())
+            .limit(page_size + 1)
+        )
+        if cursor:
+            (last_id,) = decode_cursor(cursor=cursor, types=(int,))
+            stmt = stmt.where(Reviews.id < last_id)
 
-    async def read_all(self,page) -> typing.Sequence[Movie]:
-        stmt = sqlalchemy.select(Movie).limit(10).offset((page-1)*10)
         query = await self.async_session.execute(statement=stmt)
-        return query.scalars().all()
+        rows = query.all()
+        next_cursor = None
+        if len(rows) > page_size:
+            last_row = rows[page_size - 1]
+            next_cursor = encode_cursor(last_row.id)
+        return rows[:page_size], next_cursor
 
-    async def session_update(self, movie: Movie):
-        await self.async_session.refresh(instance=movie)
-        return movie
+    async def read_all(
+        self, page: int | None = None, cursor: str | None = None, page_size: int = 10
+    ) -> typing.Tuple[typing.Sequence[Movie], str | None]:
+        after = decode_cursor(cursor=cursor, types=(int, int)) if cursor else None
+        return await self._read_movies_page(
+            stmt=sqlalchemy.select(Movie), sort_key=Movie.id, descending=False, after=after, page=page, page_size=page_size
+        )
+
+    async def read_movies_pending_review(self, limit: int = 100) -> typing.Sequence[Movie]:
+        # 管理员审核列表: 未审核的电影, 按上传顺序
+        stmt = sqlalchemy.select(Movie).where(Movie.is_verified == False).order_by(Movie.id).limit(limit)
+        query = await self.async_session.execute(statement=stmt)
+        return query.scalars().all()
 
     async def is_movie_title_taken(self, title: str):
         stmt = sqlalchemy.select(Movie).where(Movie.title == title)
@@ -87,22 +160,12 @@ class MovieCRUDRepository(BaseCRUDRepository):
             raise EntityAlreadyExists(f"Movie with title `{title}` already exists!")
         return movie
 
-    async def calculate_rates_in_percentage(self, reviews):
-        # 初始化评级计数器
-        ratings_count = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-
-        # 计数每个评级的出现次数
-        for review in reviews:
-            if 1 <= review.rating <= 5:
-                if review.rating not in ratings_count:
-                    ratings_count[review.rating] = 0
-                ratings_count[review.rating] += 1
-
-        # 计算总评论数
-        total_reviews = len(reviews)
+    async def calculate_rates_in_percentage(self, movie: Movie) -> RatingPercentages:
+        # 直接使用电影上维护的聚合列, 不需要加载评论
+        total_reviews = movie.review_count
 
         # 避免除以零的错误
-        if total_reviews == 0:
+        if not total_reviews:
             return RatingPercentages(
                 average_rating=0.0,
                 rating_1=0.0,
@@ -113,14 +176,13 @@ class MovieCRUDRepository(BaseCRUDRepository):
             )
 
         # 计算每个评级的百分比
-        ratings_percentage = {rating: (count / total_reviews) * 100 for rating, count in ratings_count.items()}
-
-        # 计算平均评分
-        average_rating = sum(rating * count for rating, count in ratings_count.items()) / total_reviews
+        ratings_percentage = {
+            star: (getattr(movie, f"rating_{star}_count") / total_reviews) * 100 for star in RATING_STARS
+        }
 
         # 创建并返回RatingPercentages实例
         return RatingPercentages(
-            average_rating=average_rating,
+            average_rating=movie.rating_sum / total_reviews,
             rating_1=ratings_percentage[1],
             rating_2=ratings_percentage[2],
             rating_3=ratings_percentage[3],
@@ -128,61 +190,277 @@ class MovieCRUDRepository(BaseCRUDRepository):
             rating_5=ratings_percentage[5]
         )
 
-    async def read_movies_sorted_by_year(self, page: int, order: str) -> typing.Sequence[Movie]:
-        if order.lower() == 'asc':
-            order_by_clause = Movie.year.asc()
-        else:
-            order_by_clause = Movie.year.desc()
-        stmt = sqlalchemy.select(Movie).order_by(order_by_clause).limit(10).offset((page-1)*10)
-        query = await self.async_session.execute(statement=stmt)
-        return query.scalars().all()
+    async def apply_review_to_rating_aggregates(self, movie_id: int, rating: float, sign: int = 1) -> None:
+        # sign=1 表示新增评论, sign=-1 表示删除评论
+        is_in_range = 1 <= rating <= 5
+        review_count = Movie.review_count + sign
+        rating_sum = Movie.rating_sum + (sign * rating if is_in_range else 0)
+        # MySQL按从左到右的顺序执行SET, 平均分必须放在最前面才能基于旧值计算
+        values = [
+            (Movie.average_rating, sqlalchemy.case((review_count > 0, rating_sum / review_count), else_=0)),
+            (Movie.review_count, review_count),
+            (Movie.rating_sum, rating_sum),
+        ]
+        if is_in_range and float(rating).is_integer():
+            star_count = getattr(Movie, f"rating_{int(rating)}_count")
+            values.append((star_count, star_count + sign))
 
-    async def read_movies_sorted_by_rating(self, page: int, order: str, page_size: int = 10) -> typing.Sequence[Movie]:
-        # 构造一个查询，计算每部电影的平均评分，并按此排序
-        if order.lower() == 'asc':
-            order_by_clause = sqlalchemy.func.coalesce(sqlalchemy.func.avg(Reviews.rating), 0).asc()
-        else:
-            order_by_clause = sqlalchemy.func.coalesce(sqlalchemy.func.avg(Reviews.rating), 0).desc()
         stmt = (
-            sqlalchemy.select(Movie)
-            .outerjoin(Reviews, Movie.id == Reviews.movie_id)  # 使用外连接包括未被评价的电影
-            .group_by(Movie.id)
-            .order_by(order_by_clause)  # 使用coalesce处理未被评价的电影
-            .limit(page_size)
-            .offset(page_size * (page - 1))
-            .options(sqlalchemy.orm.joinedload(Movie.reviews))  # 可选，如果你在结果中需要访问具体的评价信息
+            sqlalchemy.update(Movie)
+            .where(Movie.id == movie_id)
+            .ordered_values(*values)
+            .execution_options(synchronize_session=False)
         )
+        await self.async_session.execute(statement=stmt)
 
-        results = await self.async_session.execute(stmt)
-        movies = results.scalars().unique().all()
-        return movies
+    async def refresh_rating_aggregates(self, movie_ids: typing.Iterable[int]) -> None:
+        # 从评论表重新计算聚合, 用于绕过ORM的级联删除之后
+        movie_ids = list(movie_ids)
+        if not movie_ids:
+            return
 
-    async def search_movie(self, search: str, page_size: int = 10, page_num: int = 1) -> typing.Sequence[Movie]:
-        stmt = sqlalchemy.select(Movie).where(Movie.title.ilike(f"%{search}%")).limit(page_size).offset((page_num - 1) * page_size)
-        query = await self.async_session.execute(stmt)
-        return query.scalars().all()
+        def aggregate_of_reviews(expression) -> sqlalchemy.ScalarSelect:
+            return (
+                sqlalchemy.select(sqlalchemy.func.coalesce(expression, 0))
+                .where(Reviews.movie_id == Movie.id)
+                .scalar_subquery()
+            )
+
+        is_in_range = Reviews.rating.between(1, 5)
+        review_count = aggregate_of_reviews(sqlalchemy.func.count(Reviews.id))
+        rating_sum = aggregate_of_reviews(sqlalchemy.func.sum(sqlalchemy.case((is_in_range, Reviews.rating), else_=0)))
+        star_counts = {
+            f"rating_{star}_count": aggregate_of_reviews(
+                sqlalchemy.func.sum(sqlalchemy.case((Reviews.rating == star, 1), else_=0))
+            )
+            for star in RATING_STARS
+        }
+        stmt = (
+            sqlalchemy.update(Movie)
+            .where(Movie.id.in_(movie_ids))
+            .values(
+                review_count=review_count,
+                rating_sum=rating_sum,
+                average_rating=sqlalchemy.case((review_count > 0, rating_sum / review_count), else_=0),
+                **star_counts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.async_session.execute(statement=stmt)
+
+    async def read_movies_sorted_by_year(
+        self, order: str, page: int | None = None, cursor: str | None = None, page_size: int = 10
+    ) -> typing.Tuple[typing.Sequence[Movie], str | None]:
+        # 按(year, id)索引排序
+        after = decode_cursor(cursor=cursor, types=(int, int)) if cursor else None
+        return await self._read_movies_page(
+            stmt=sqlalchemy.select(Movie),
+            sort_key=Movie.year,
+            descending=order.lower() != 'asc',
+            after=after,
+            page=page,
+            page_size=page_size,
+        )
+
+    async def read_movies_sorted_by_rating(
+        self, order: str, page: int | None = None, cursor: str | None = None, page_size: int = 10
+    ) -> typing.Tuple[typing.Sequence[Movie], str | None]:
+        # 按维护好的平均分排序, 走(average_rating, id)索引
+        after = decode_cursor(cursor=cursor, types=(float, int)) if cursor else None
+        return await self._read_movies_page(
+            stmt=sqlalchemy.select(Movie),
+            sort_key=Movie.average_rating,
+            descending=order.lower() != 'asc',
+            after=after,
+            page=page,
+            page_size=page_size,
+        )
+
+    async def _read_movies_page(
+        self,
+        stmt: sqlalchemy.Select,
+        sort_key: sqlalchemy.ColumnElement,
+        descending: bool,
+        after: typing.Sequence[typing.Any] | None,
+        page: int | None,
+        page_size: int,
+        cursor_prefix: typing.Tuple[typing.Any, ...] = (),
+    ) -> typing.Tuple[typing.Sequence[Movie], str | None]:
+        """
+        One page of `stmt` ordered by (`sort_key`, id), continuing after the (sort key, id) pair of a cursor when
+        `after` is given, or at the legacy offset of `page` otherwise. Returns the movies and the next cursor.
+        """
+        if descending:
+            stmt = stmt.order_by(sort_key.desc(), Movie.id.desc())
+        else:
+            stmt = stmt.order_by(sort_key.asc(), Movie.id.asc())
+        stmt = stmt.add_columns(sort_key).limit(page_size + 1)
+
+        if after is not None:
+            last_sort_key, last_id = after
+            if descending:
+                is_after = sqlalchemy.or_(sort_key < last_sort_key, sqlalchemy.and_(sort_key == last_sort_key, Movie.id < last_id))
+            else:
+                is_after = sqlalchemy.or_(sort_key > last_sort_key, sqlalchemy.and_(sort_key == last_sort_key, Movie.id > last_id))
+            stmt = stmt.where(is_after)
+        elif page:
+            stmt = stmt.offset((page - 1) * page_size)
 
-    async def read_movies_by_genre(self, genre: str) -> typing.Sequence[Movie]:
-        stmt = sqlalchemy.select(Movie).where(Movie.genre.ilike(f"%{genre}%"))
         query = await self.async_session.execute(stmt)
-        return query.scalars().all()
+        rows = query.all()
+        next_cursor = None
+        if len(rows) > page_size:
+            last_movie, last_sort_key = rows[page_size - 1]
+            next_cursor = encode_cursor(*cursor_prefix, last_sort_key, last_movie.id)
+        return [movie for movie, _ in rows[:page_size]], next_cursor
+
+    async def search_movie(
+        self, search: str, page_size: int = 10, page_num: int | None = None, cursor: str | None = None
+    ) -> typing.Tuple[typing.Sequence[Movie], str | None]:
+        terms = tokenize_search_query(search=search)
+        searchable_terms = [term for term in terms if len(term) >= FULLTEXT_MIN_TOKEN_SIZE]
+
+        if not terms:
+            return [], None
+
+        if not searchable_terms:
+            # 太短的词不在全文索引里, 退回到标题前缀匹配(可以走标题索引); 转义用户输入里的 % 和 _
+            after = decode_cursor(cursor=cursor, types=(str, int)) if cursor else None
+            return await self._read_movies_page(
+                stmt=sqlalchemy.select(Movie).where(Movie.title.startswith(" ".join(terms), autoescape=True)),
+                sort_key=Movie.title,
+                descending=False,
+                after=after,
+                page=page_num,
+                page_size=page_size,
+            )
+
+        relevance = mysql_match(Movie.title, Movie.description, Movie.director, Movie.cast, against=" ".join(searchable_terms))
+        # 游标记录了第一页所用的截短级别, 后续页沿用同一匹配条件
+        truncate_levels = (0, 1, 2)
+        after = None
+        if cursor:
+            truncate_by, *after = decode_cursor(cursor=cursor, types=(int, float, int))
+            if truncate_by not in truncate_levels:
+                raise ValueError("Malformed pagination cursor")
+            truncate_levels = (truncate_by,)
+
+        # 先按完整前缀搜索, 没有结果时逐步截短每个词来容忍拼写错误
+        for truncate_by in truncate_levels:
+            boolean_query = format_boolean_prefix_query(terms=searchable_terms, truncate_by=truncate_by)
+            is_matching = mysql_match(Movie.title, Movie.description, Movie.director, Movie.cast, against=boolean_query).in_boolean_mode()
+            movies, next_cursor = await self._read_movies_page(
+                stmt=sqlalchemy.select(Movie).where(is_matching),
+                sort_key=relevance,
+                descending=True,
+                after=after,
+                page=page_num,
+                page_size=page_size,
+                cursor_prefix=(truncate_by,),
+            )
+            if movies or cursor:
+                return movies, next_cursor
+            # 翻页越界时不要退回到更宽松的查询, 否则不同页用的是不同的匹配条件
+            if page_num and page_num > 1 and await self.async_session.scalar(sqlalchemy.select(sqlalchemy.exists().where(is_matching))):
+                return movies, None
+        return [], None
 
-    async def read_movies_of_searching_page(self):
-        stmt = sqlalchemy.select(SearchingPage).options(sqlalchemy.orm.joinedload(SearchingPage.movie))
+    async def read_or_create_genres(self, names: list[str]) -> list[Genre]:
+        if not names:
+            return []
+
+        stmt = sqlalchemy.select(Genre).where(Genre.name.in_(names))
         query = await self.async_session.execute(stmt)
-        return query.scalars().all()
+        genres = {genre.name.lower(): genre for genre in query.scalars().all()}
+
+        for name in names:
+            if name.lower() in genres:
+                continue
+            try:
+                async with self.async_session.begin_nested():
+                    genre = Genre(name=name)
+                    self.async_session.add(instance=genre)
+            except IntegrityError:
+                # 并发创建了同名类型
+                query = await self.async_session.execute(sqlalchemy.select(Genre).where(Genre.name == name))
+                genre = query.scalar_one()
+            genres[name.lower()] = genre
+
+        return [genres[name.lower()] for name in names]
+
+    async def read_movies_by_genre(
+        self, genre: str, cursor: str | None = None, page_size: int = 20
+    ) -> typing.Tuple[typing.Sequence[Movie], str | None, int | None]:
+        """
+        Newest-first page of the movies tagged with `genre`, walking the `movie_genres` primary key.
+        Returns the movies, the cursor of the next page and, on the first page only, the total count.
+        """
+        genre_id = await self.async_session.scalar(sqlalchemy.select(Genre.id).where(Genre.name == genre))
+        if genre_id is None:
+            return [], None, 0
+
+        stmt = (
+            sqlalchemy.select(Movie)
+            .join(MovieGenre, MovieGenre.movie_id == Movie.id)
+            .where(MovieGenre.genre_id == genre_id)
+            .order_by(MovieGenre.movie_id.desc())
+            .limit(page_size + 1)
+        )
+        if cursor:
+            (last_movie_id,) = decode_cursor(cursor=cursor, types=(int,))
+            stmt = stmt.where(MovieGenre.movie_id < last_movie_id)
 
-    async def read_movies_of_home_page(self):
-        stmt = sqlalchemy.select(HomePage).options(sqlalchemy.orm.joinedload(HomePage.movie))
         query = await self.async_session.execute(stmt)
-        return query.scalars().all()
+        movies = query.scalars().all()
+        next_cursor = encode_cursor(movies[page_size - 1].id) if len(movies) > page_size else None
+
+        total_count = None
+        if not cursor:
+            total_count = await self.async_session.scalar(
+                sqlalchemy.select(sqlalchemy.func.count()).select_from(MovieGenre).where(MovieGenre.genre_id == genre_id)
+            )
+        return movies[:page_size], next_cursor, total_count
 
-    async def read_movies_of_just_reviewed(self):
-        stmt = sqlalchemy.select(JustReviewed).options(sqlalchemy.orm.joinedload(JustReviewed.movie))
+    async def read_genre_facets(self) -> typing.Sequence[sqlalchemy.Row]:
+        movie_count = sqlalchemy.func.count(MovieGenre.movie_id).label("movie_count")
+        stmt = (
+            sqlalchemy.select(Genre.name, movie_count)
+            .join(MovieGenre, MovieGenre.genre_id == Genre.id)
+            .group_by(Genre.id, Genre.name)
+            .order_by(movie_count.desc(), Genre.name)
+        )
         query = await self.async_session.execute(stmt)
-        return query.scalars().all()
+        return query.all()
 
+    async def read_movies_of_searching_page_json(self) -> bytes:
+        return await self._read_curated_movies_json(curated_table=SearchingPage)
 
+    async def read_movies_of_home_page_json(self) -> bytes:
+        return await self._read_curated_movies_json(curated_table=HomePage)
 
+    async def read_movies_of_just_reviewed_json(self) -> bytes:
+        return await self._read_curated_movies_json(curated_table=JustReviewed)
 
+    async def _read_curated_movies_json(self, curated_table: type[HomePage | SearchingPage | JustReviewed]) -> bytes:
+        async def render() -> bytes:
+            stmt = (
+                sqlalchemy.select(
+                    Movie.id,
+                    Movie.title,
+                    Movie.description,
+                    Movie.year,
+                    Movie.rating,
+                    Movie.genre,
+                    Movie.director,
+                    Movie.cast,
+                    Movie.duration,
+                    Movie.cover_image_url,
+                )
+                .join(curated_table, curated_table.movie_id == Movie.id)
+                .order_by(curated_table.id)
+            )
+            query = await self.async_session.execute(stmt)
+            movies = [MovieInResponse(**row._mapping) for row in query.all()]
+            return MoviesInResponse(movies=movies).model_dump_json().encode()
 
+        return await curated_movie_list_cache.get_or_load(table=curated_table.__tablename__, loader=render)
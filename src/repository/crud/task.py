@@ -1,12 +1,17 @@
 import typing
 
+import numpy
 import sqlalchemy
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 
 from src.models.db.account import Account
-from src.models.db.task import TaskCategory, Task
+from src.models.db.task import TaskCategory, Task, TaskRewardClaim
+from src.models.db.wallet import Transactions, Wallet
 from src.models.schemas.task import TaskCategoryInCreate
 from src.repository.crud.base import BaseCRUDRepository
+from src.repository.crud.ledger import TASK_REWARDS_ACCOUNT, LedgerCrudRepository, to_amount
+from src.utilities.caches.task_categories import TaskCategoryEntry, task_category_catalog
 
 class TaskCrudRepository(BaseCRUDRepository):
     async def create_task_category(self, task_category: TaskCategoryInCreate) -> TaskCategory:
@@ -21,34 +26,66 @@ class TaskCrudRepository(BaseCRUDRepository):
             task_reward=task_category.task_reward
         )
         self.async_session.add(instance=db_task_category)
+        await task_category_catalog.bump_version(async_session=self.async_session)
         await self.async_session.commit()
+        task_category_catalog.invalidate()
         await self.async_session.refresh(instance=db_task_category)
         return db_task_category
-    async def read_task_categories(self) -> typing.Sequence[TaskCategory]:
-        stmt = sqlalchemy.select(TaskCategory)
-        query = await self.async_session.execute(statement=stmt)
-        return query.scalars().all()
-    async def read_task_categories_by_access_level(self, access_level: int) -> typing.Sequence[TaskCategory]:
-        stmt = sqlalchemy.select(TaskCategory).where(TaskCategory.access_level == access_level)
-        query = await self.async_session.execute(statement=stmt)
-        return query.scalars().all()
-
-    async def read_task_category_by_id(self, id: int) -> TaskCategory:
-        stmt = sqlalchemy.select(TaskCategory).where(TaskCategory.id == id)
-        query = await self.async_session.execute(statement=stmt)
-        return query.scalar()
-    async def apply_default_tasks(self, account_id: int)-> typing.Sequence[Task]:
+    async def read_task_categories(self) -> typing.Sequence[TaskCategoryEntry]:
+        await task_category_catalog.ensure_fresh(async_session=self.async_session)
+        return task_category_catalog.all()
+    async def read_task_categories_by_access_level(self, access_level: int) -> typing.Sequence[TaskCategoryEntry]:
+        await task_category_catalog.ensure_fresh(async_session=self.async_session)
+        return task_category_catalog.by_access_level(access_level=access_level)
+
+    async def read_task_category_by_id(self, id: int) -> TaskCategoryEntry | None:
+        await task_category_catalog.ensure_fresh(async_session=self.async_session)
+        return task_category_catalog.get(task_category_id=id)
+
+    async def add_default_tasks(self, account_id: int) -> None:
+        """
+        Queue the level-1 tasks of a new account as one multi-row INSERT in the current transaction.
+        """
         task_categories = await self.read_task_categories_by_access_level(access_level=1)
-        tasks = []
-        for task_category in task_categories:
-            db_task = Task(
-                task_category_id=task_category.id,
-                account_id=account_id,
+        if task_categories:
+            await self.async_session.execute(
+                sqlalchemy.insert(Task).values(
+                    [{"account_id": account_id, "task_category_id": task_category.id} for task_category in task_categories]
+                )
             )
-            self.async_session.add(instance=db_task)
-            tasks.append(db_task)
+
+    async def bulk_assign_tasks(
+        self,
+        account_ids: typing.Sequence[int],
+        task_level: int | None = None,
+        task_category_id: int | None = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Assign one task category, or every category of a level, to many accounts with INSERT ... SELECT. Accounts
+        that do not exist or already hold the category are skipped. Returns the number of tasks created.
+        """
+        if task_category_id is not None:
+            task_category = await self.read_task_category_by_id(id=task_category_id)
+            task_category_ids = [] if task_category is None else [task_category.id]
+        else:
+            task_category_ids = [category.id for category in await self.read_task_categories_by_access_level(access_level=task_level)]
+
+        unique_account_ids = sorted(set(account_ids))
+        assigned = 0
+        for category_id in task_category_ids:
+            for start in range(0, len(unique_account_ids), chunk_size):
+                # 排除不存在的账号和已经拥有该任务种类的账号
+                candidates = sqlalchemy.select(Account.id, sqlalchemy.literal(category_id)).where(
+                    Account.id.in_(unique_account_ids[start:start + chunk_size]),
+                    ~sqlalchemy.exists().where(Task.account_id == Account.id, Task.task_category_id == category_id),
+                )
+                result = await self.async_session.execute(
+                    sqlalchemy.insert(Task).from_select(["account_id", "task_category_id"], candidates)
+                )
+                assigned += result.rowcount
         await self.async_session.commit()
-        return tasks
+        return assigned
 
     async def read_tasks(self) -> typing.Sequence[Task]:
         stmt = sqlalchemy.select(Task)
@@ -60,108 +97,178 @@ class TaskCrudRepository(BaseCRUDRepository):
         query = await self.async_session.execute(statement=stmt)
         return query.scalars().all()
 
-    async def update_task_status(self, task: Task) -> Task:
-        # 检查电影上传和评论发布是否达到了任务类别要求的数量
-        basic_conditions_met = (
-                task.movies_uploaded_since_task_start >= task.task_category.movies_uploaded_count and
-                task.reviews_posted_since_task_start >= task.task_category.reviews_posted_count
+    async def apply_activity_counts(self, movie_uploads: dict[int, int], review_posts: dict[int, int]) -> None:
+        """
+        Apply a batch of activity events (account id -> number of events) to the open tasks of those accounts
+        with set-based UPDATEs, then complete every task whose requirements are now met.
+        """
+        counters = (
+            (Task.movies_uploaded_since_task_start, TaskCategory.movies_uploaded_count, movie_uploads),
+            (Task.reviews_posted_since_task_start, TaskCategory.reviews_posted_count, review_posts),
         )
+        for counter, required_count, counts in counters:
+            # 每个账户的事件数不同, 按事件数分组, 每组一条UPDATE
+            accounts_by_increment: dict[int, list[int]] = dict()
+            for account_id, increment in counts.items():
+                accounts_by_increment.setdefault(increment, []).append(account_id)
+
+            for increment, account_ids in accounts_by_increment.items():
+                # 与逐个+1相同: 计数只增加到任务类别要求的数量为止
+                incremented = counter + increment
+                stmt = (
+                    sqlalchemy.update(Task)
+                    .where(
+                        Task.task_category_id == TaskCategory.id,
+                        Task.account_id.in_(account_ids),
+                        Task.is_completed == False,
+                        counter < required_count,
+                    )
+                    .values({counter: sqlalchemy.case((incremented > required_count, required_count), else_=incremented)})
+                    .execution_options(synchronize_session=False)
+                )
+                await self.async_session.execute(statement=stmt)
+
+        await self.evaluate_task_completion(account_ids=set(movie_uploads) | set(review_posts))
+        await self.async_session.commit()
 
-        # 检查是否需要版权，并且如果需要，是否已经获得
-        copyright_condition_met = (
-                not task.task_category.is_copy_right_required or
-                (task.task_category.is_copy_right_required and task.is_copy_right_acquired)
+    @staticmethod
+    def build_task_completion_stmt(*conditions: sqlalchemy.ColumnElement[bool]) -> sqlalchemy.Update:
+        """
+        UPDATE tasks JOIN task_categories that marks every open task matching `conditions` as completed once its
+        counters reach the category requirements and its copyright requirement, if any, is met.
+        """
+        return (
+            sqlalchemy.update(Task)
+            .where(
+                Task.task_category_id == TaskCategory.id,
+                Task.is_completed == False,
+                Task.movies_uploaded_since_task_start >= TaskCategory.movies_uploaded_count,
+                Task.reviews_posted_since_task_start >= TaskCategory.reviews_posted_count,
+                sqlalchemy.or_(TaskCategory.is_copy_right_required == False, Task.is_copy_right_acquired == True),
+                *conditions,
+            )
+            .values({Task.is_completed: True})
+            .execution_options(synchronize_session=False)
         )
 
-        # 仅当所有条件都满足时，将任务标记为已完成
-        if basic_conditions_met and copyright_condition_met:
-            task.is_completed = True
-
-        return task
-
-
+    async def evaluate_task_completion(self, account_ids: typing.Iterable[int]) -> int:
+        """
+        Complete the qualifying open tasks of `account_ids` in one statement. Returns the number of completed tasks.
+        """
+        stmt = self.build_task_completion_stmt(Task.account_id.in_(list(account_ids)))
+        result = await self.async_session.execute(statement=stmt)
+        return result.rowcount
 
-    async def add_movie_uploaded_count(self, account_id: int) -> typing.Sequence[Task]:
-        # 查询账户的所有任务，预加载必要的关联数据
-        select_stmt = sqlalchemy.select(Task).options(
-            sqlalchemy.orm.joinedload(Task.task_category),
-            sqlalchemy.orm.joinedload(Task.account).joinedload(Account.wallet)
-        ).where(
-            Task.account_id == account_id,
-            Task.is_completed == False
+    async def re_evaluate_all_task_completion(self, batch_size: int = 10_000) -> int:
+        """
+        Re-evaluate every task, e.g. after an admin lowers a category's requirements. Walks the primary key in
+        ranges of `batch_size` ids and commits each range, so no statement locks the whole table.
+        """
+        max_id = await self.async_session.scalar(sqlalchemy.select(sqlalchemy.func.max(Task.id)))
+        completed = 0
+        for lower_id in range(0, max_id or 0, batch_size):
+            stmt = self.build_task_completion_stmt(Task.id > lower_id, Task.id <= lower_id + batch_size)
+            result = await self.async_session.execute(statement=stmt)
+            await self.async_session.commit()
+            completed += result.rowcount
+        return completed
+
+    async def claim_task_reward(self, account_id: int, task_id: int, idempotency_key: str | None = None) -> Task:
+        """
+        Pay out the reward of a completed task exactly once. The claim is a conditional UPDATE, the wallet gets an
+        atomic `balance = balance + reward` and a ledger transaction, all in one database transaction. Retrying with
+        the same `idempotency_key` returns the already claimed task instead of an error.
+        """
+        stmt = (
+            sqlalchemy.select(Task, Wallet.id)
+            .join(Task.task_category)
+            .join(Wallet, Wallet.account_id == Task.account_id)
+            .options(sqlalchemy.orm.contains_eager(Task.task_category))
+            .where(Task.account_id == account_id, Task.id == task_id)
         )
+        row = (await self.async_session.execute(statement=stmt)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found!")
+        task, wallet_id = row
+        # 响应直接由这里读到的数据构建, 脱离session以免提交后过期再查询一次
+        self.async_session.expunge(task)
+        self.async_session.expunge(task.task_category)
+
+        if idempotency_key is not None and await self._is_replayed_claim(account_id, task_id, idempotency_key):
+            sqlalchemy.orm.attributes.set_committed_value(task, "is_claimed", True)
+            return task
+        if not task.is_completed:
+            raise HTTPException(status_code=400, detail="Task is not completed yet!")
 
-        result = await self.async_session.execute(select_stmt)
-        tasks = result.scalars().all()
-
-        # 对每个任务进行处理，只增加那些未达到上传次数上限的任务的上传计数
-        for task in tasks:
-            if task.movies_uploaded_since_task_start < task.task_category.movies_uploaded_count:
-                task.movies_uploaded_since_task_start += 1
-                # 检查任务是否满足完成条件
-                task = await self.update_task_status(task)
-
-        # 提交所有更改
-        await self.async_session.commit()
-
-        return tasks
-
-    async def add_review_posted_count(self, account_id: int) -> typing.Sequence[Task]:
-        # 查询账户的所有任务，预加载必要的关联数据
-        select_stmt = sqlalchemy.select(Task).options(
-            sqlalchemy.orm.joinedload(Task.task_category),
-            sqlalchemy.orm.joinedload(Task.account).joinedload(Account.wallet)
-        ).where(
-            Task.account_id == account_id,
-            Task.is_completed == False
+        claim_stmt = (
+            sqlalchemy.update(Task)
+            .where(Task.id == task_id, Task.account_id == account_id, Task.is_completed == True, Task.is_claimed == False)
+            .values(is_claimed=True)
+            .execution_options(synchronize_session=False)
         )
+        if (await self.async_session.execute(statement=claim_stmt)).rowcount != 1:
+            await self.async_session.rollback()
+            # 并发的同一请求(相同幂等键)已经领取成功
+            if idempotency_key is not None and await self._is_replayed_claim(account_id, task_id, idempotency_key):
+                sqlalchemy.orm.attributes.set_committed_value(task, "is_claimed", True)
+                return task
+            raise HTTPException(status_code=400, detail="Task reward is already claimed!")
 
-        result = await self.async_session.execute(select_stmt)
-        tasks = result.scalars().all()
-
-        # 对每个任务进行处理，只增加那些未达到评论次数上限的任务的评论计数
-        for task in tasks:
-            if task.reviews_posted_since_task_start < task.task_category.reviews_posted_count:
-                task.reviews_posted_since_task_start += 1
-                # 检查任务是否满足完成条件
-                task = await self.update_task_status(task)
+        reward = to_amount(task.task_category.task_reward)
+        ledger_transaction = Transactions(
+            wallet_id=wallet_id,
+            amount=reward,
+            transaction_type="task-reward",
+            transaction_status="finished",
+            transaction_currency="usd",
+            order_id=f"task-reward-{task_id}",
+        )
+        self.async_session.add(instance=ledger_transaction)
+        await self.async_session.flush()
+        await LedgerCrudRepository(async_session=self.async_session).credit_wallet(
+            journal_id=f"task-reward-{task_id}",
+            wallet_id=wallet_id,
+            amount=reward,
+            counter_account=TASK_REWARDS_ACCOUNT,
+            entry_type="task-reward",
+            transaction_id=ledger_transaction.id,
+        )
+        self.async_session.add(
+            instance=TaskRewardClaim(
+                task_id=task_id,
+                account_id=account_id,
+                idempotency_key=idempotency_key,
+                reward=reward,
+                transaction_id=ledger_transaction.id,
+            )
+        )
+        try:
+            await self.async_session.commit()
+        except IntegrityError:
+            await self.async_session.rollback()
+            raise HTTPException(status_code=409, detail="Idempotency key was already used for another task!")
 
-        # 提交所有更改
-        await self.async_session.commit()
+        sqlalchemy.orm.attributes.set_committed_value(task, "is_claimed", True)
+        return task
 
-        return tasks
-    async def claim_task_reward(self, account_id:int, task_id:int) -> Task:
-        stmt = sqlalchemy.select(Task).options(
-            sqlalchemy.orm.joinedload(Task.task_category),
-            sqlalchemy.orm.joinedload(Task.account).joinedload(Account.wallet)
-        ).where(Task.account_id == account_id, Task.id == task_id)
-        query = await self.async_session.execute(statement=stmt)
-        task = query.scalar()
-        if task.is_completed == False:
-            raise HTTPException(status_code=400, detail="Task is not completed yet!")
-        if task.is_claimed == True:
-            raise HTTPException(status_code=400, detail="Task reward is already claimed!")
-        task.is_claimed = True
-        task.account.wallet.balance += task.task_category.task_reward
-        await self.async_session.commit()
-        await self.async_session.refresh(instance=task)
-        new_query=await self.async_session.execute(
-            sqlalchemy.select(Task).options(
-                sqlalchemy.orm.joinedload(Task.task_category),
-                sqlalchemy.orm.joinedload(Task.account).joinedload(Account.wallet)
-            ).where(Task.id == task.id)
+    async def _is_replayed_claim(self, account_id: int, task_id: int, idempotency_key: str) -> bool:
+        stmt = sqlalchemy.select(TaskRewardClaim.task_id).where(
+            TaskRewardClaim.account_id == account_id, TaskRewardClaim.idempotency_key == idempotency_key
         )
-        task = new_query.scalar()
-        return task
+        claimed_task_id = await self.async_session.scalar(stmt)
+        if claimed_task_id is None:
+            return False
+        if claimed_task_id != task_id:
+            raise HTTPException(status_code=409, detail="Idempotency key was already used for another task!")
+        return True
 
     async def assign_task(self, account_id: int, task_level: int) -> Task:
         """
         为用户分配一个指定等级且之前未领取的任务。
         """
-        # 查询指定等级的所有任务类别ID
-        task_categories_stmt = sqlalchemy.select(TaskCategory.id).where(TaskCategory.access_level == task_level)
-        task_categories_result = await self.async_session.execute(task_categories_stmt)
-        task_category_ids = [category_id for category_id in task_categories_result.scalars()]
+        # 从内存目录获取指定等级的所有任务类别ID
+        task_categories = await self.read_task_categories_by_access_level(access_level=task_level)
+        task_category_ids = [task_category.id for task_category in task_categories]
 
         if not task_category_ids:
             raise HTTPException(status_code=400, detail="No task categories found for the specified level.")
@@ -189,10 +296,8 @@ class TaskCrudRepository(BaseCRUDRepository):
         """
         为用户分配一个指定任务类别的任务。
         """
-        # 查询指定任务类别
-        task_category_stmt = sqlalchemy.select(TaskCategory).where(TaskCategory.id == task_category_id)
-        task_category_result = await self.async_session.execute(task_category_stmt)
-        task_category = task_category_result.scalar()
+        # 从内存目录查询指定任务类别
+        task_category = await self.read_task_category_by_id(id=task_category_id)
         if task_category is None:
             raise HTTPException(status_code=400, detail="Task category not found.")
 
@@ -202,6 +307,20 @@ class TaskCrudRepository(BaseCRUDRepository):
         await self.async_session.commit()
         await self.async_session.refresh(new_task)
         return new_task
+    async def read_task_progress_columns(self, task_category_id: int) -> numpy.ndarray:
+        """
+        The raw progress counters of every task of a category as an (n, 4) array of movies uploaded, reviews posted,
+        is_completed and is_claimed, read as plain rows without building ORM objects.
+        """
+        stmt = sqlalchemy.select(
+            Task.movies_uploaded_since_task_start,
+            Task.reviews_posted_since_task_start,
+            Task.is_completed,
+            Task.is_claimed,
+        ).where(Task.task_category_id == task_category_id)
+        rows = (await self.async_session.execute(statement=stmt)).all()
+        return numpy.array(rows, dtype=numpy.float64).reshape(-1, 4)
+
     def calculate_weighted_progress(self,movies_uploaded_since_task_start, reviews_posted_since_task_start,
                                     movies_uploaded_count, reviews_posted_count):
         # 初始权重
@@ -0,0 +1,116 @@
+import datetime
+import hashlib
+import secrets
+import uuid
+
+import sqlalchemy
+from sqlalchemy.exc import IntegrityError
+
+from src.config.manager import settings
+from src.models.db.account import Account, RefreshToken, RevokedToken
+from src.models.db.wallet import Wallet
+from src.repository.crud.base import BaseCRUDRepository
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+class TokenCrudRepository(BaseCRUDRepository):
+    async def create_refresh_token(self, account_id: int, family_id: str | None = None) -> str:
+        """
+        Store a new refresh token for `account_id` and return it; only its hash is persisted. Does not commit.
+        """
+        refresh_token = secrets.token_urlsafe(48)
+        self.async_session.add(instance=RefreshToken(
+            account_id=account_id,
+            token_hash=hash_refresh_token(refresh_token),
+            family_id=family_id or uuid.uuid4().hex,
+            expires_at=datetime.datetime.now(tz=datetime.timezone.utc)
+            + datetime.timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRATION_DAY),
+        ))
+        await self.async_session.flush()
+        return refresh_token
+
+    async def issue_refresh_token(self, account_id: int) -> str:
+        refresh_token = await self.create_refresh_token(account_id=account_id)
+        await self.async_session.commit()
+        return refresh_token
+
+    async def rotate_refresh_token(self, refresh_token: str) -> tuple[Account, int, str] | None:
+        """
+        Exchange a refresh token for a new one of the same family and return the account, its wallet id and the
+        new token. The exchange is a conditional UPDATE, so a token can be rotated once; presenting an already
+        rotated token again revokes its whole family and returns None.
+        """
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        token_hash = hash_refresh_token(refresh_token)
+        result = await self.async_session.execute(
+            sqlalchemy.update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        stmt = sqlalchemy.select(RefreshToken.account_id, RefreshToken.family_id, RefreshToken.revoked_at).where(
+            RefreshToken.token_hash == token_hash
+        )
+        row = (await self.async_session.execute(statement=stmt)).first()
+        if row is None:
+            return None
+        if result.rowcount != 1:
+            if row.revoked_at is not None:
+                # 已轮换过的token被再次使用, 视为泄露
+                await self.revoke_refresh_token_family(family_id=row.family_id)
+            return None
+
+        stmt = sqlalchemy.select(Account, Wallet.id).join(Wallet, Wallet.account_id == Account.id).where(Account.id == row.account_id)
+        account_row = (await self.async_session.execute(statement=stmt)).first()
+        if account_row is None:
+            await self.async_session.rollback()
+            return None
+        new_refresh_token = await self.create_refresh_token(account_id=row.account_id, family_id=row.family_id)
+        await self.async_session.commit()
+        return account_row[0], account_row[1], new_refresh_token
+
+    async def revoke_refresh_token(self, refresh_token: str) -> None:
+        stmt = sqlalchemy.select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(refresh_token))
+        family_id = await self.async_session.scalar(stmt)
+        if family_id is not None:
+            await self.revoke_refresh_token_family(family_id=family_id)
+
+    async def revoke_refresh_token_family(self, family_id: str) -> None:
+        await self.async_session.execute(
+            sqlalchemy.update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.datetime.now(tz=datetime.timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await self.async_session.commit()
+
+    async def revoke_access_token(self, jti: str, expires_at: datetime.datetime) -> None:
+        self.async_session.add(instance=RevokedToken(jti=jti, expires_at=expires_at))
+        try:
+            await self.async_session.commit()
+        except IntegrityError:
+            # 已经撤销过
+            await self.async_session.rollback()
+
+    async def is_access_token_revoked(self, jti: str) -> bool:
+        stmt = sqlalchemy.select(RevokedToken.id).where(RevokedToken.jti == jti)
+        return await self.async_session.scalar(stmt) is not None
+
+    async def read_revoked_token_ids(self, after_id: int = 0) -> list[tuple[int, str]]:
+        """
+        `(id, jti)` of the unexpired revoked access tokens recorded after `after_id`, oldest first.
+        """
+        stmt = (
+            sqlalchemy.select(RevokedToken.id, RevokedToken.jti)
+            .where(RevokedToken.id > after_id, RevokedToken.expires_at > datetime.datetime.now(tz=datetime.timezone.utc))
+            .order_by(RevokedToken.id)
+        )
+        query = await self.async_session.execute(statement=stmt)
+        return [(row.id, row.jti) for row in query]
@@ -4,23 +4,50 @@ import json
 import random
 import time
 import typing
+import uuid
 
-import requests
+import loguru
 import sqlalchemy
 from fastapi import HTTPException
-from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import functions as sqlalchemy_functions
 
-from src.models.db.account import Account
-from src.models.db.wallet import Wallet, Transactions
+from src.models.db.wallet import PaymentEvent, Wallet, Transactions
 from src.models.schemas.wallet import WalletInCreate, TransactionInCreate, WalletInResponse, TransactionInResponse, \
-    TopupInResponse, PaymentInCreate, PaymentInResponse, PaymentInfo, PaymentUpdate, WalletInUpdate, WithdrawInCreate, \
+    TopupInResponse, PaymentInCreate, PaymentInResponse, PaymentInfo, WalletInUpdate, WithdrawInCreate, \
     WalletInAdd
 from src.repository.crud.base import BaseCRUDRepository
+from src.repository.crud.ledger import ADJUSTMENTS_ACCOUNT, NOWPAYMENTS_ACCOUNT, OPENING_ACCOUNT, \
+    WITHDRAWALS_ACCOUNT, LedgerCrudRepository, to_amount
 from src.config.manager import settings
+from src.utilities.formatters.cursor import decode_cursor, encode_cursor
+from src.utilities.payments.gateway import payment_gateway
+
+
+# 终态: 进入后不再变化, 重复或乱序的回调不会再次入账
+FINAL_PAYMENT_STATUSES: tuple[str, ...] = ("finished", "failed", "refunded", "expired")
+
+
+class PaymentTransition(typing.NamedTuple):
+    transaction_id: int
+    wallet_id: int
+    payment_id: str
+    payment_status: str
+
+
 class WalletCrudRepository(BaseCRUDRepository):
     async def create_wallet(self, wallet_create: WalletInCreate) -> Wallet:
-        new_wallet = Wallet(account_id=wallet_create.account_id, balance=wallet_create.balance)
+        new_wallet = Wallet(account_id=wallet_create.account_id)
         self.async_session.add(instance=new_wallet)
+        await self.async_session.flush()
+        if wallet_create.balance:
+            await LedgerCrudRepository(async_session=self.async_session).credit_wallet(
+                journal_id=f"opening-{new_wallet.id}",
+                wallet_id=new_wallet.id,
+                amount=wallet_create.balance,
+                counter_account=OPENING_ACCOUNT,
+                entry_type="opening",
+            )
         await self.async_session.commit()
         await self.async_session.refresh(instance=new_wallet)
 
@@ -32,66 +59,119 @@ class WalletCrudRepository(BaseCRUDRepository):
         return query.scalars().all()
 
     async def read_wallet_by_id(self, id: int) -> Wallet:
-        stmt = sqlalchemy.select(Wallet).options(sqlalchemy.orm.joinedload(Wallet.transactions)).where(Wallet.id == id)
+        stmt = sqlalchemy.select(Wallet).where(Wallet.id == id)
         result = await self.async_session.execute(stmt)
         wallet = result.scalars().first()
         return wallet
     async def read_wallet_by_account_id(self, account_id: int) -> Wallet:
-        stmt = sqlalchemy.select(Wallet).options(sqlalchemy.orm.joinedload(Wallet.transactions)).where(Wallet.account_id == account_id)
+        stmt = sqlalchemy.select(Wallet).where(Wallet.account_id == account_id)
         query = await self.async_session.execute(statement=stmt)
         return query.scalar()
 
-    async def top_up(self, transaction: TransactionInCreate):
-        wallet = await self.read_wallet_by_id(id=transaction.wallet_id)
-        order_id = self.generate_transaction_id(user_id=transaction.wallet_id)
-        payment = await self.create_payment(PaymentInCreate(
+    async def read_transactions_of_wallet(
+        self, wallet_id: int, cursor: str | None = None, page_size: int = 10
+    ) -> typing.Tuple[typing.Sequence[Transactions], str | None]:
+        """
+        Newest-first page of the transactions of a wallet, walking the (wallet_id, id) index. Returns the page and
+        the cursor of the next page.
+        """
+        # id随插入时间单调递增, 按id分页与按created_at一致, 且游标值可以精确比较
+        stmt = (
+            sqlalchemy.select(Transactions)
+            .where(Transactions.wallet_id == wallet_id)
+            .order_by(Transactions.id.desc())
+            .limit(page_size + 1)
+        )
+        if cursor:
+            (last_id,) = decode_cursor(cursor=cursor, types=(int,))
+            stmt = stmt.where(Transactions.id < last_id)
+
+        query = await self.async_session.execute(statement=stmt)
+        transactions = query.scalars().all()
+        if len(transactions) <= page_size:
+            return transactions, None
+        transactions = transactions[:page_size]
+        return transactions, encode_cursor(transactions[-1].id)
+
+    async def read_transaction_summary(self, wallet_id: int) -> sqlalchemy.Row:
+        """
+        Count and totals of a wallet's transactions per type, aggregated in the database over the wallet's index
+        range instead of loading the history.
+        """
+        finished = Transactions.transaction_status == "finished"
+        stmt = sqlalchemy.select(
+            sqlalchemy.func.count(Transactions.id).label("transaction_count"),
+            sqlalchemy.func.coalesce(sqlalchemy.func.sum(sqlalchemy.case(
+                (sqlalchemy.and_(Transactions.transaction_type == "top-up", finished), Transactions.amount), else_=0
+            )), 0).label("total_topped_up"),
+            sqlalchemy.func.coalesce(sqlalchemy.func.sum(sqlalchemy.case(
+                (Transactions.transaction_type == "withdraw", Transactions.amount), else_=0
+            )), 0).label("total_withdrawn"),
+            sqlalchemy.func.coalesce(sqlalchemy.func.sum(sqlalchemy.case(
+                (sqlalchemy.and_(Transactions.transaction_type == "task-reward", finished), Transactions.amount), else_=0
+            )), 0).label("total_rewarded"),
+            sqlalchemy.func.max(Transactions.created_at).label("last_transaction_at"),
+        ).where(Transactions.wallet_id == wallet_id)
+        query = await self.async_session.execute(statement=stmt)
+        return query.one()
+
+    async def top_up(self, transaction: TransactionInCreate, idempotency_key: str | None = None) -> PaymentInResponse:
+        """
+        Create an upstream payment and record it as a pending top-up. The same `idempotency_key` maps to the same
+        `order_id`, so a retried top-up returns the payment created the first time instead of a second one.
+        """
+        if idempotency_key is None:
+            order_id = self.generate_transaction_id(user_id=transaction.wallet_id)
+        else:
+            order_id = hashlib.sha256(f"top-up-{transaction.wallet_id}-{idempotency_key}".encode()).hexdigest()
+
+        # 先请求支付网关再写库, 等待上游期间不占用数据库连接
+        payment = await payment_gateway.create_payment(PaymentInCreate(
             price_amount=transaction.amount,
             order_id=order_id,
             pay_currency=transaction.transaction_currency
         ))
-        new_transaction = Transactions(wallet_id=transaction.wallet_id,
-                                       amount=transaction.amount,
-                                       transaction_type='top-up',
-                                       transaction_currency=transaction.transaction_currency,
-                                       transaction_status='pending',
-                                       order_id=order_id,
-                                       payment_id=payment['payment_id'],
-        )
-        wallet.transactions.append(new_transaction)
-        self.async_session.add(instance=wallet)
-        await self.async_session.commit()
-        await self.async_session.refresh(instance=wallet)
-        payment=PaymentInResponse(
-            payment_id=payment['payment_id'],
-            pay_address=payment['pay_address'],
-            price_amount=payment['price_amount'],
-            price_currency=payment['price_currency'],
-            pay_amount=payment['pay_amount'],
-            pay_currency=payment['pay_currency'],
-            created_at=payment['created_at'],
-            expiration_estimate_date=payment['expiration_estimate_date'],
-            payment_status=payment['payment_status'],
-        )
+        recorded_stmt = sqlalchemy.select(Transactions.id).where(Transactions.order_id == order_id)
+        if await self.async_session.scalar(recorded_stmt) is None:
+            self.async_session.add(instance=Transactions(
+                wallet_id=transaction.wallet_id,
+                amount=to_amount(transaction.amount),
+                transaction_type='top-up',
+                transaction_currency=transaction.transaction_currency,
+                transaction_status='pending',
+                order_id=order_id,
+                payment_id=payment.payment_id,
+            ))
+            await self.async_session.commit()
         return payment
 
-    async def withdraw(self, withdraw: WithdrawInCreate, user: Account):
-        wallet = await self.read_wallet_by_id(id=user.wallet.id)
-        if withdraw.amount > wallet.balance:
-            raise HTTPException(status_code=400, detail="Insufficient balance")
-        wallet.balance -= withdraw.amount
+    async def withdraw(self, withdraw: WithdrawInCreate, wallet_id: int):
+        if withdraw.amount <= 0:
+            raise HTTPException(status_code=400, detail="Withdrawal amount must be positive")
         transaction = Transactions(
-            wallet_id=user.wallet.id,
-            amount=withdraw.amount,
+            wallet_id=wallet_id,
+            amount=to_amount(withdraw.amount),
             transaction_type='withdraw',
             transaction_currency=withdraw.withdrawal_method,
             transaction_status='pending',
-            order_id=self.generate_transaction_id(user_id=user.wallet.id),
+            order_id=self.generate_transaction_id(user_id=wallet_id),
         )
-        wallet.transactions.append(transaction)
+        self.async_session.add(instance=transaction)
+        await self.async_session.flush()
+        # 条件扣减: 余额不足时不更新, 不需要先读余额再写回
+        debited = await LedgerCrudRepository(async_session=self.async_session).debit_wallet(
+            journal_id=f"withdraw-{transaction.order_id}",
+            wallet_id=wallet_id,
+            amount=withdraw.amount,
+            counter_account=WITHDRAWALS_ACCOUNT,
+            entry_type="withdraw",
+            transaction_id=transaction.id,
+        )
+        if not debited:
+            await self.async_session.rollback()
+            raise HTTPException(status_code=400, detail="Insufficient balance")
         await self.async_session.commit()
-        await self.async_session.refresh(instance=wallet)
-        wallet = await self.read_wallet_by_id(id=wallet.id)
-        return wallet
+        return await self.read_wallet_by_id(id=wallet_id)
 
 
 
@@ -110,49 +190,93 @@ class WalletCrudRepository(BaseCRUDRepository):
         transaction_id = hashlib.sha256(unique_string.encode()).hexdigest()
         return transaction_id
 
-    def np_signature_check(self,np_secret_key, np_x_signature, message):
-        sorted_msg = message
-        digest = hmac.new(
-            str(np_secret_key).encode(),
-            f'{sorted_msg}'.encode(),
-            hashlib.sha512)
-        signature = digest.hexdigest()
-        print(signature)
-        print(np_x_signature)
-        if signature == np_x_signature:
-            return True
-        else:
-            raise Exception("Signature check failed")
+    def np_signature_check(self, np_secret_key: str, np_x_signature: str | None, message: str) -> bool:
+        if not np_x_signature:
+            return False
+        digest = hmac.new(str(np_secret_key).encode(), message.encode(), hashlib.sha512)
+        return hmac.compare_digest(digest.hexdigest(), np_x_signature)
 
-    async def create_payment(self, payment: PaymentInCreate) -> Transactions:
-        url = "https://api.nowpayments.io/v1/payment"
-        headers = {
-            "x-api-key": settings.NOWPAYMENTS_API_KEY,
-        }
-        data = {
-          "price_amount": payment.price_amount,
-          "price_currency": "usd",
-          "pay_currency": payment.pay_currency,
-          "ipn_callback_url": f"{settings.EXTERNAL_REQUEST_URL}/api/wallet/ipn_callback",
-          "order_id": payment.order_id,
-          "order_description": "Acount top-up",
+    async def record_payment_event(self, payment_id: str, payment_status: str, payload: str) -> bool:
+        """
+        Persist a verified IPN callback. Returns False when the same `(payment_id, payment_status)` was already
+        recorded, i.e. NOWPayments retried the callback.
+        """
+        self.async_session.add(
+            instance=PaymentEvent(payment_id=payment_id, payment_status=payment_status, payload=payload)
+        )
+        try:
+            await self.async_session.commit()
+        except IntegrityError:
+            await self.async_session.rollback()
+            return False
+        return True
+
+    async def apply_pending_payment_events(self, batch_size: int = 100) -> tuple[int, list[PaymentTransition]]:
+        """
+        Apply up to `batch_size` unprocessed payment events in one transaction and return how many events were
+        processed along with the status changes they caused. A transaction only moves out of a non-final status,
+        so replayed or out-of-order events never credit a wallet twice.
+        """
+        events_stmt = (
+            sqlalchemy.select(PaymentEvent.id, PaymentEvent.payment_id, PaymentEvent.payment_status)
+            .where(PaymentEvent.processed_at == None)
+            .order_by(PaymentEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = (await self.async_session.execute(statement=events_stmt)).all()
+        if not events:
+            await self.async_session.rollback()
+            return 0, []
+
+        transactions_stmt = sqlalchemy.select(
+            Transactions.id, Transactions.wallet_id, Transactions.amount, Transactions.payment_id
+        ).where(Transactions.payment_id.in_({event.payment_id for event in events}))
+        transactions = {
+            transaction.payment_id: transaction
+            for transaction in await self.async_session.execute(statement=transactions_stmt)
         }
-        response = requests.post(url, headers=headers, data=data)
-        response_data = response.json()
-        return response_data
 
-    async def update_payment_status(self, payment: PaymentUpdate):
-        # update payment status并更新钱包余额
-        stmt = sqlalchemy.select(Transactions).options(selectinload(Transactions.wallet)).where(Transactions.payment_id == payment.payment_id)
-        query = await self.async_session.execute(statement=stmt)
-        transaction = query.scalar()
-        transaction.transaction_status = payment.payment_status
-        if payment.payment_status == 'finished':
-            transaction.wallet.balance += transaction.amount
-        self.async_session.add(instance=transaction)
+        transitions = []
+        for event in events:
+            transaction = transactions.get(event.payment_id)
+            if transaction is None:
+                loguru.logger.warning(f"Payment Events --- No transaction for payment `{event.payment_id}`")
+                continue
+            result = await self.async_session.execute(
+                sqlalchemy.update(Transactions)
+                .where(
+                    Transactions.id == transaction.id,
+                    Transactions.transaction_status.not_in(FINAL_PAYMENT_STATUSES),
+                    Transactions.transaction_status != event.payment_status,
+                )
+                .values(transaction_status=event.payment_status)
+            )
+            if result.rowcount != 1:
+                continue
+            if event.payment_status == "finished":
+                await LedgerCrudRepository(async_session=self.async_session).credit_wallet(
+                    journal_id=f"payment-{event.payment_id}",
+                    wallet_id=transaction.wallet_id,
+                    amount=transaction.amount,
+                    counter_account=NOWPAYMENTS_ACCOUNT,
+                    entry_type="top-up",
+                    transaction_id=transaction.id,
+                )
+            transitions.append(PaymentTransition(
+                transaction_id=transaction.id,
+                wallet_id=transaction.wallet_id,
+                payment_id=event.payment_id,
+                payment_status=event.payment_status,
+            ))
+
+        await self.async_session.execute(
+            sqlalchemy.update(PaymentEvent)
+            .where(PaymentEvent.id.in_([event.id for event in events]))
+            .values(processed_at=sqlalchemy_functions.now())
+        )
         await self.async_session.commit()
-        await self.async_session.refresh(instance=transaction)
-        return transaction
+        return len(events), transitions
 
     async def check_payment_status(self, transaction) -> Transactions:
         stmt = sqlalchemy.select(Transactions).where(Transactions.payment_id == transaction.payment_id)
@@ -168,9 +292,6 @@ class WalletCrudRepository(BaseCRUDRepository):
         self.async_session.add(instance=wallet)
         await self.async_session.commit()
         await self.async_session.refresh(instance=wallet)
-        stmt = sqlalchemy.select(Wallet).options(sqlalchemy.orm.joinedload(Wallet.transactions)).where(Wallet.id == wallet.id)
-        result = await self.async_session.execute(stmt)
-        wallet = result.scalars().first()
         return wallet
 
     async def session_update(self, wallet: Wallet) -> Wallet:
@@ -180,17 +301,18 @@ class WalletCrudRepository(BaseCRUDRepository):
         return wallet
 
     async def add_balance(self, wallet: WalletInAdd) -> Wallet:
-        wallet = await self.read_wallet_by_account_id(account_id=wallet.account_id)
-        wallet.balance += wallet.balance
-        self.async_session.add(instance=wallet)
+        if wallet.amount <= 0:
+            raise HTTPException(status_code=400, detail="Amount must be positive")
+        db_wallet = await self.read_wallet_by_account_id(account_id=wallet.account_id)
+        if db_wallet is None:
+            raise HTTPException(status_code=404, detail="Wallet not found")
+        await LedgerCrudRepository(async_session=self.async_session).credit_wallet(
+            journal_id=f"adjustment-{uuid.uuid4().hex}",
+            wallet_id=db_wallet.id,
+            amount=wallet.amount,
+            counter_account=ADJUSTMENTS_ACCOUNT,
+            entry_type="adjustment",
+        )
         await self.async_session.commit()
-        await self.async_session.refresh(instance=wallet)
-        return wallet
-
-
-
-
-
-
-
-
+        await self.async_session.refresh(instance=db_wallet)
+        return db_wallet
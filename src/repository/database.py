@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
+    async_sessionmaker,
     AsyncEngine,
     AsyncSession,
 )
@@ -9,14 +10,27 @@ from src.config.manager import settings  # 确保这里正确引入了settings
 
 class AsyncDatabase:
     def __init__(self):
-        mysql_uri = f"{settings.MYSQL_SCHEMA}://{settings.MYSQL_USERNAME}:{settings.MYSQL_PASSWORD}@{settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DB}"
+        self.set_async_db_uri = f"{settings.MYSQL_SCHEMA}://{settings.MYSQL_USERNAME}:{settings.MYSQL_PASSWORD}@{settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DB}"
         self.async_engine: AsyncEngine = create_async_engine(
-            url=mysql_uri,
+            url=self.set_async_db_uri,
             echo=settings.IS_DB_ECHO_LOG,
             pool_size=settings.DB_POOL_SIZE,
             max_overflow=settings.DB_POOL_OVERFLOW,
+            pool_timeout=settings.DB_TIMEOUT,
+            pool_pre_ping=True,
+        )
+        # 每个请求从工厂获取独立的session, 而不是所有请求共用一个session
+        self.async_session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
+            bind=self.async_engine,
+            class_=AsyncSession,
+            expire_on_commit=settings.IS_DB_EXPIRE_ON_COMMIT,
         )
-        self.async_session: AsyncSession = AsyncSession(bind=self.async_engine)
         self.pool = self.async_engine.pool
 
+    def new_session(self) -> AsyncSession:
+        """
+        Open a fresh `AsyncSession` bound to the engine's connection pool.
+        """
+        return self.async_session_factory()
+
 async_db: AsyncDatabase = AsyncDatabase()
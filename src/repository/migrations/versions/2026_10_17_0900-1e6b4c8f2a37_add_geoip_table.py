@@ -0,0 +1,37 @@
+"""add geoip table
+
+Revision ID: 1e6b4c8f2a37
+Revises: 60d1844cb5d3
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "1e6b4c8f2a37"
+down_revision = "60d1844cb5d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geoip",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("ip", sa.String(length=45), nullable=False),
+        sa.Column("is_proxy", sa.Boolean(), nullable=False),
+        sa.Column("calling_code", sa.String(length=16), nullable=False),
+        sa.Column("country_name", sa.String(length=64), nullable=False),
+        sa.Column("country_code", sa.String(length=16), nullable=False),
+        sa.Column("region_name", sa.String(length=64), nullable=False),
+        sa.Column("city", sa.String(length=64), nullable=False),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ip"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("geoip")
@@ -0,0 +1,27 @@
+"""add fulltext index for movie search
+
+Revision ID: 3f7c1a2b9d10
+Revises: 1e6b4c8f2a37
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f7c1a2b9d10"
+down_revision = "1e6b4c8f2a37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_movies_title", "movies", ["title"])
+    op.create_index(
+        "ix_movies_fulltext", "movies", ["title", "description", "director", "cast"], mysql_prefix="FULLTEXT"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movies_fulltext", table_name="movies")
+    op.drop_index("ix_movies_title", table_name="movies")
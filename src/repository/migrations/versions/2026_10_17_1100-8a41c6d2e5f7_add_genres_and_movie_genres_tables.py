@@ -0,0 +1,75 @@
+"""add genres and movie_genres tables, backfilled from movies.genre
+
+Revision ID: 8a41c6d2e5f7
+Revises: 3f7c1a2b9d10
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8a41c6d2e5f7"
+down_revision = "3f7c1a2b9d10"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    genres = op.create_table(
+        "genres",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    movie_genres = op.create_table(
+        "movie_genres",
+        sa.Column("genre_id", sa.Integer(), nullable=False),
+        sa.Column("movie_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["genre_id"], ["genres.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["movie_id"], ["movies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("genre_id", "movie_id"),
+    )
+    op.create_index("ix_movie_genres_movie_id", "movie_genres", ["movie_id"])
+
+    connection = op.get_bind()
+    movies = sa.table("movies", sa.column("id", sa.Integer), sa.column("genre", sa.String))
+
+    genre_ids: dict[str, int] = dict()
+    last_movie_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(movies.c.id, movies.c.genre)
+            .where(movies.c.id > last_movie_id)
+            .order_by(movies.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_movie_id = rows[-1].id
+
+        links = []
+        for movie_id, genre in rows:
+            names: dict[str, str] = dict()
+            for name in (genre or "").split(","):
+                name = name.strip()[:64]
+                if name:
+                    names.setdefault(name.lower(), name)
+
+            for key, name in names.items():
+                if key not in genre_ids:
+                    genre_ids[key] = connection.execute(sa.insert(genres).values(name=name)).inserted_primary_key[0]
+                links.append({"genre_id": genre_ids[key], "movie_id": movie_id})
+
+        if links:
+            connection.execute(sa.insert(movie_genres), links)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movie_genres_movie_id", table_name="movie_genres")
+    op.drop_table("movie_genres")
+    op.drop_table("genres")
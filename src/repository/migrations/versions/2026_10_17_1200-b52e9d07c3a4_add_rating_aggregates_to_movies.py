@@ -0,0 +1,58 @@
+"""add rating aggregates to movies
+
+Revision ID: b52e9d07c3a4
+Revises: 8a41c6d2e5f7
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b52e9d07c3a4"
+down_revision = "8a41c6d2e5f7"
+branch_labels = None
+depends_on = None
+
+STAR_COUNT_COLUMNS = [f"rating_{star}_count" for star in range(1, 6)]
+
+
+def upgrade() -> None:
+    op.add_column("movies", sa.Column("review_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("movies", sa.Column("rating_sum", sa.Float(), nullable=False, server_default="0"))
+    op.add_column("movies", sa.Column("average_rating", sa.Float(), nullable=False, server_default="0"))
+    for column in STAR_COUNT_COLUMNS:
+        op.add_column("movies", sa.Column(column, sa.Integer(), nullable=False, server_default="0"))
+
+    # Backfill from the existing reviews in one set-based UPDATE ... JOIN.
+    star_sums = ", ".join(f"SUM(rating = {star}) AS {column}" for star, column in enumerate(STAR_COUNT_COLUMNS, start=1))
+    star_assignments = ", ".join(f"m.{column} = a.{column}" for column in STAR_COUNT_COLUMNS)
+    op.execute(
+        f"""
+        UPDATE movies m
+        JOIN (
+            SELECT movie_id,
+                   COUNT(*) AS review_count,
+                   SUM(CASE WHEN rating BETWEEN 1 AND 5 THEN rating ELSE 0 END) AS rating_sum,
+                   {star_sums}
+            FROM reviews
+            GROUP BY movie_id
+        ) a ON a.movie_id = m.id
+        SET m.average_rating = a.rating_sum / a.review_count,
+            m.review_count = a.review_count,
+            m.rating_sum = a.rating_sum,
+            {star_assignments}
+        """
+    )
+
+    op.create_index("ix_movies_average_rating_id", "movies", ["average_rating", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movies_average_rating_id", table_name="movies")
+    for column in reversed(STAR_COUNT_COLUMNS):
+        op.drop_column("movies", column)
+    op.drop_column("movies", "average_rating")
+    op.drop_column("movies", "rating_sum")
+    op.drop_column("movies", "review_count")
@@ -0,0 +1,41 @@
+"""add keyset pagination indexes to movies
+
+Revision ID: c7d3a1f58e26
+Revises: b52e9d07c3a4
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c7d3a1f58e26"
+down_revision = "b52e9d07c3a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_movies_year_id", "movies", ["year", "id"])
+    # Rating cursors carry the average back to the database, which only compares exactly against a DOUBLE column.
+    op.alter_column(
+        "movies",
+        "average_rating",
+        type_=sa.Double(),
+        existing_type=sa.Float(),
+        existing_nullable=False,
+        existing_server_default="0",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "movies",
+        "average_rating",
+        type_=sa.Float(),
+        existing_type=sa.Double(),
+        existing_nullable=False,
+        existing_server_default="0",
+    )
+    op.drop_index("ix_movies_year_id", table_name="movies")
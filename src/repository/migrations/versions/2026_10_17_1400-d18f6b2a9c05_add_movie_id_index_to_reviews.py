@@ -0,0 +1,23 @@
+"""add movie_id id index to reviews
+
+Revision ID: d18f6b2a9c05
+Revises: c7d3a1f58e26
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d18f6b2a9c05"
+down_revision = "c7d3a1f58e26"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_reviews_movie_id_id", "reviews", ["movie_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reviews_movie_id_id", table_name="reviews")
@@ -0,0 +1,39 @@
+"""add task_reward_claims table
+
+Revision ID: e4a7c9b1d263
+Revises: d18f6b2a9c05
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4a7c9b1d263"
+down_revision = "d18f6b2a9c05"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_reward_claims",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=64), nullable=True),
+        sa.Column("reward", sa.Float(), nullable=False),
+        sa.Column("transaction_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["account_id"], ["account.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["transaction_id"], ["transactions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("task_id"),
+        sa.UniqueConstraint("account_id", "idempotency_key", name="uq_task_reward_claims_account_id_idempotency_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("task_reward_claims")
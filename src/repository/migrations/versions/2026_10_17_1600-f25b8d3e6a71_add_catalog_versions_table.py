@@ -0,0 +1,30 @@
+"""add catalog_versions table
+
+Revision ID: f25b8d3e6a71
+Revises: e4a7c9b1d263
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f25b8d3e6a71"
+down_revision = "e4a7c9b1d263"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    catalog_versions = op.create_table(
+        "catalog_versions",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.bulk_insert(catalog_versions, [{"name": "task_categories", "version": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_versions")
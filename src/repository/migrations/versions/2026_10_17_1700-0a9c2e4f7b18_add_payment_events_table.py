@@ -0,0 +1,36 @@
+"""add payment_events table
+
+Revision ID: 0a9c2e4f7b18
+Revises: f25b8d3e6a71
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0a9c2e4f7b18"
+down_revision = "f25b8d3e6a71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "payment_events",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("payment_id", sa.String(length=64), nullable=False),
+        sa.Column("payment_status", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("received_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("payment_id", "payment_status", name="uq_payment_events_payment_id_payment_status"),
+    )
+    op.create_index("ix_payment_events_processed_at_id", "payment_events", ["processed_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_payment_events_processed_at_id", table_name="payment_events")
+    op.drop_table("payment_events")
@@ -0,0 +1,23 @@
+"""add wallet_id index to transactions
+
+Revision ID: 3b6e1f9a0c42
+Revises: 0a9c2e4f7b18
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b6e1f9a0c42"
+down_revision = "0a9c2e4f7b18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_transactions_wallet_id_id", "transactions", ["wallet_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_wallet_id_id", table_name="transactions")
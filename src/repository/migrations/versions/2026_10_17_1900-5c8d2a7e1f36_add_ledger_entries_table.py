@@ -0,0 +1,57 @@
+"""add ledger_entries table and store amounts as decimals
+
+Revision ID: 5c8d2a7e1f36
+Revises: 3b6e1f9a0c42
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c8d2a7e1f36"
+down_revision = "3b6e1f9a0c42"
+branch_labels = None
+depends_on = None
+
+AMOUNT = sa.Numeric(precision=20, scale=8)
+
+
+def upgrade() -> None:
+    op.alter_column("wallet", "balance", type_=AMOUNT, existing_type=sa.Float(), existing_nullable=False, existing_server_default="0")
+    op.alter_column("transactions", "amount", type_=AMOUNT, existing_type=sa.Float(), existing_nullable=False)
+    op.alter_column("task_reward_claims", "reward", type_=AMOUNT, existing_type=sa.Float(), existing_nullable=False)
+    op.create_table(
+        "ledger_entries",
+        sa.Column("id", sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column("journal_id", sa.String(length=96), nullable=False),
+        sa.Column("account", sa.String(length=64), nullable=False),
+        sa.Column("wallet_id", sa.Integer(), nullable=True),
+        sa.Column("amount", AMOUNT, nullable=False),
+        sa.Column("entry_type", sa.String(length=64), nullable=False),
+        sa.Column("transaction_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallet.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["transaction_id"], ["transactions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("journal_id", "account", name="uq_ledger_entries_journal_id_account"),
+    )
+    op.create_index("ix_ledger_entries_wallet_id_id", "ledger_entries", ["wallet_id", "id"])
+    # 为已有余额过一笔期初分录, 否则对账会把余额重建为0
+    op.execute(
+        "INSERT INTO ledger_entries (journal_id, account, wallet_id, amount, entry_type) "
+        "SELECT CONCAT('opening-', id), CONCAT('wallet:', id), id, balance, 'opening' FROM wallet WHERE balance <> 0"
+    )
+    op.execute(
+        "INSERT INTO ledger_entries (journal_id, account, wallet_id, amount, entry_type) "
+        "SELECT CONCAT('opening-', id), 'system:opening', NULL, -balance, 'opening' FROM wallet WHERE balance <> 0"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ledger_entries_wallet_id_id", table_name="ledger_entries")
+    op.drop_table("ledger_entries")
+    op.alter_column("task_reward_claims", "reward", type_=sa.Float(), existing_type=AMOUNT, existing_nullable=False)
+    op.alter_column("transactions", "amount", type_=sa.Float(), existing_type=AMOUNT, existing_nullable=False)
+    op.alter_column("wallet", "balance", type_=sa.Float(), existing_type=AMOUNT, existing_nullable=False, existing_server_default="0")
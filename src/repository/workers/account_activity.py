@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import loguru
+
+from src.config.manager import settings
+from src.repository.crud.account import AccountCRUDRepository
+from src.repository.database import async_db
+
+
+class AccountActivityUpdater:
+    """
+    Debounced "last seen" bookkeeping for authenticated accounts.
+
+    Authentication only reports activity here; the geo-IP lookup and the `account` row update run in a
+    background task with their own session, at most once per account every `debounce_seconds`.
+    """
+
+    def __init__(self, debounce_seconds: float, max_tracked_accounts: int = 100_000):
+        self._debounce_seconds = debounce_seconds
+        self._max_tracked_accounts = max_tracked_accounts
+        self._last_seen: dict[int, float] = dict()
+        self._pending: set[asyncio.Task] = set()
+
+    def touch(self, account_id: int, ip: str, user_agent: str | None) -> None:
+        now = time.monotonic()
+        last_seen = self._last_seen.get(account_id)
+        if last_seen is not None and now - last_seen < self._debounce_seconds:
+            return
+
+        if len(self._last_seen) >= self._max_tracked_accounts:
+            self._forget_expired(now=now)
+        self._last_seen[account_id] = now
+
+        task = asyncio.create_task(self._update(account_id=account_id, ip=ip, user_agent=user_agent))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _forget_expired(self, now: float) -> None:
+        self._last_seen = {
+            account_id: last_seen
+            for account_id, last_seen in self._last_seen.items()
+            if now - last_seen < self._debounce_seconds
+        }
+
+    async def _update(self, account_id: int, ip: str, user_agent: str | None) -> None:
+        try:
+            async with async_db.new_session() as async_session:
+                account_repo = AccountCRUDRepository(async_session=async_session)
+                await account_repo.update_account_activity(id=account_id, ip=ip, user_agent=user_agent)
+        except Exception as e:
+            # 下次请求时重试
+            self._last_seen.pop(account_id, None)
+            loguru.logger.warning(f"Account Activity --- Failed to update account `{account_id}`: {e}")
+
+    async def drain(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+def get_account_activity_updater() -> AccountActivityUpdater:
+    return AccountActivityUpdater(debounce_seconds=settings.ACCOUNT_ACTIVITY_DEBOUNCE_MIN * 60)
+
+
+account_activity_updater: AccountActivityUpdater = get_account_activity_updater()
@@ -0,0 +1,55 @@
+import asyncio
+
+import loguru
+
+from src.config.manager import settings
+from src.repository.crud.ledger import LedgerCrudRepository
+from src.repository.database import async_db
+
+
+class LedgerReconciler:
+    """
+    Periodically rebuilds the materialized `wallet.balance` from the ledger every `interval` seconds, streaming
+    through wallets in id ranges of `chunk_size` so no single statement locks the whole table.
+    """
+
+    def __init__(self, interval: float = 3600.0, chunk_size: int = 1000):
+        self._interval = interval
+        self._chunk_size = chunk_size
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                loguru.logger.error(f"Ledger --- Failed to reconcile wallet balances: {e}")
+
+    async def reconcile(self) -> int:
+        async with async_db.new_session() as async_session:
+            ledger_repo = LedgerCrudRepository(async_session=async_session)
+            return await ledger_repo.reconcile_wallet_balances(chunk_size=self._chunk_size)
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+def get_ledger_reconciler() -> LedgerReconciler:
+    return LedgerReconciler(
+        interval=settings.LEDGER_RECONCILE_INTERVAL_MIN * 60, chunk_size=settings.LEDGER_RECONCILE_CHUNK_SIZE
+    )
+
+
+ledger_reconciler: LedgerReconciler = get_ledger_reconciler()
@@ -0,0 +1,74 @@
+import asyncio
+
+import loguru
+
+from src.config.manager import settings
+from src.repository.crud.wallet import PaymentTransition, WalletCrudRepository
+from src.repository.database import async_db
+from src.repository.workers.payment_status import payment_status_hub
+
+
+class PaymentEventConsumer:
+    """
+    Applies persisted IPN callbacks off the request path.
+
+    The callback route only records the event and calls `notify`; the consumer then drains unprocessed events
+    in batches of `batch_size`. It also polls every `poll_interval` seconds to pick up events recorded by other
+    workers or left over from a restart.
+    """
+
+    def __init__(self, batch_size: int = 100, poll_interval: float = 5.0):
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                for transition in await self.drain():
+                    payment_status_hub.publish(transition)
+            except Exception as e:
+                loguru.logger.error(f"Payment Events --- Failed to apply events: {e}")
+
+    async def drain(self) -> list[PaymentTransition]:
+        transitions: list[PaymentTransition] = []
+        while True:
+            async with async_db.new_session() as async_session:
+                wallet_repo = WalletCrudRepository(async_session=async_session)
+                processed, applied = await wallet_repo.apply_pending_payment_events(batch_size=self._batch_size)
+            transitions.extend(applied)
+            if processed < self._batch_size:
+                return transitions
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        await self.drain()
+
+
+def get_payment_event_consumer() -> PaymentEventConsumer:
+    return PaymentEventConsumer(
+        batch_size=settings.PAYMENT_EVENT_BATCH_SIZE, poll_interval=settings.PAYMENT_EVENT_POLL_INTERVAL_SEC
+    )
+
+
+payment_event_consumer: PaymentEventConsumer = get_payment_event_consumer()
@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+
+import loguru
+import sqlalchemy
+
+from src.config.manager import settings
+from src.models.db.wallet import PaymentEvent, Transactions
+from src.repository.crud.wallet import PaymentTransition
+from src.repository.database import async_db
+from src.utilities.caches.ttl_lru import TTLLRUCache
+
+
+class PaymentStatusHub:
+    """
+    Fans transaction status changes out to the connected clients of a wallet.
+
+    Each connection owns a small bounded queue, so an idle connection costs one queue and one set entry. Changes
+    applied by this worker are published directly by the payment event consumer; changes applied by other
+    workers are picked up by one `payment_events` query every `poll_interval` seconds, and only while someone
+    is subscribed. A change is delivered once per worker even when both paths see it.
+    """
+
+    def __init__(self, poll_interval: float = 2.0, queue_size: int = 16):
+        self._poll_interval = poll_interval
+        self._queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue[PaymentTransition]]] = dict()
+        self._delivered: TTLLRUCache[int, str] = TTLLRUCache(maxsize=100_000, ttl=3600)
+        self._since: datetime.datetime | None = None
+        self._worker: asyncio.Task | None = None
+
+    def subscribe(self, wallet_id: int) -> asyncio.Queue[PaymentTransition]:
+        queue: asyncio.Queue[PaymentTransition] = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.setdefault(wallet_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, wallet_id: int, queue: asyncio.Queue[PaymentTransition]) -> None:
+        queues = self._subscribers.get(wallet_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[wallet_id]
+
+    def publish(self, transition: PaymentTransition) -> None:
+        if self._delivered.get(transition.transaction_id) == transition.payment_status:
+            return
+        self._delivered.set(transition.transaction_id, transition.payment_status)
+
+        for queue in self._subscribers.get(transition.wallet_id, ()):
+            if queue.full():
+                # 慢客户端只保留最新的状态
+                queue.get_nowait()
+            queue.put_nowait(transition)
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            if not self._subscribers:
+                self._since = None
+                continue
+            try:
+                await self.poll()
+            except Exception as e:
+                loguru.logger.error(f"Payment Status --- Failed to poll payment events: {e}")
+
+    async def poll(self) -> None:
+        async with async_db.new_session() as async_session:
+            now = await async_session.scalar(sqlalchemy.select(sqlalchemy.func.now()))
+            if self._since is not None:
+                # 往前多取一个周期, 避免其它worker提交较慢时漏掉事件; 重复的状态由publish去重
+                since = self._since - datetime.timedelta(seconds=self._poll_interval)
+                stmt = (
+                    sqlalchemy.select(
+                        Transactions.id, Transactions.wallet_id, Transactions.payment_id, Transactions.transaction_status
+                    )
+                    .join(PaymentEvent, PaymentEvent.payment_id == Transactions.payment_id)
+                    .where(PaymentEvent.processed_at >= since)
+                    .distinct()
+                )
+                for row in await async_session.execute(statement=stmt):
+                    self.publish(PaymentTransition(
+                        transaction_id=row.id,
+                        wallet_id=row.wallet_id,
+                        payment_id=row.payment_id,
+                        payment_status=row.transaction_status,
+                    ))
+        self._since = now
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+def get_payment_status_hub() -> PaymentStatusHub:
+    return PaymentStatusHub(poll_interval=settings.PAYMENT_STATUS_POLL_INTERVAL_SEC)
+
+
+payment_status_hub: PaymentStatusHub = get_payment_status_hub()
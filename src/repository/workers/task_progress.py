@@ -0,0 +1,98 @@
+import asyncio
+import collections
+
+import loguru
+
+from src.config.manager import settings
+from src.repository.crud.task import TaskCrudRepository
+from src.repository.database import async_db
+
+MOVIE_UPLOADED = "movie_uploaded"
+REVIEW_POSTED = "review_posted"
+TASK_PROGRESS_EVENTS = (MOVIE_UPLOADED, REVIEW_POSTED)
+
+
+class TaskProgressEngine:
+    """
+    Applies task progress off the request path.
+
+    Routes only `emit` activity events into an in-process queue; a single worker drains it in batches of up to
+    `batch_size` events (waiting at most `batch_interval` seconds to fill one) and applies each batch with a
+    few set-based UPDATEs in its own session.
+    """
+
+    def __init__(self, batch_size: int = 500, batch_interval: float = 0.5, max_queue_size: int = 100_000):
+        self._batch_size = batch_size
+        self._batch_interval = batch_interval
+        self._queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def emit(self, account_id: int, event: str) -> None:
+        if event not in TASK_PROGRESS_EVENTS:
+            raise ValueError(f"Unknown task progress event `{event}`")
+        try:
+            self._queue.put_nowait((account_id, event))
+        except asyncio.QueueFull:
+            loguru.logger.error(f"Task Progress --- Queue is full, dropped `{event}` of account `{account_id}`")
+
+    async def _next_batch(self) -> list[tuple[int, str]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self._batch_interval
+        while len(batch) < self._batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._apply(batch=batch)
+            except Exception as e:
+                loguru.logger.error(f"Task Progress --- Failed to apply {len(batch)} events: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _apply(self, batch: list[tuple[int, str]]) -> None:
+        counts: dict[str, collections.Counter] = {event: collections.Counter() for event in TASK_PROGRESS_EVENTS}
+        for account_id, event in batch:
+            counts[event][account_id] += 1
+
+        async with async_db.new_session() as async_session:
+            task_repo = TaskCrudRepository(async_session=async_session)
+            await task_repo.apply_activity_counts(
+                movie_uploads=dict(counts[MOVIE_UPLOADED]), review_posts=dict(counts[REVIEW_POSTED])
+            )
+
+    async def flush(self) -> None:
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        await self.flush()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+def get_task_progress_engine() -> TaskProgressEngine:
+    return TaskProgressEngine(
+        batch_size=settings.TASK_PROGRESS_BATCH_SIZE, batch_interval=settings.TASK_PROGRESS_BATCH_INTERVAL_MS / 1000
+    )
+
+
+task_progress_engine: TaskProgressEngine = get_task_progress_engine()
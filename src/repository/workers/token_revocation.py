@@ -0,0 +1,90 @@
+import asyncio
+
+import loguru
+
+from src.config.manager import settings
+from src.repository.crud.token import TokenCrudRepository
+from src.repository.database import async_db
+from src.utilities.caches.bloom import BloomFilter
+
+
+class TokenRevocationList:
+    """
+    Keeps the jti of every revoked, unexpired access token in an in-process Bloom filter, so checking a request's
+    token costs a few hash probes instead of a query. Only a filter hit is confirmed against the database, so a
+    false positive costs one query and never rejects a valid token.
+
+    Revocations recorded by other workers are picked up every `sync_interval` seconds, and the filter is rebuilt
+    from the unexpired rows every `rebuild_interval` seconds so expired revocations fall out of it.
+    """
+
+    def __init__(self, capacity: int = 100_000, sync_interval: float = 5.0, rebuild_interval: float = 3600.0):
+        self._capacity = capacity
+        self._sync_interval = sync_interval
+        self._rebuild_interval = rebuild_interval
+        self._filter = BloomFilter(capacity=capacity)
+        self._last_id = 0
+        self._worker: asyncio.Task | None = None
+
+    def revoke_locally(self, jti: str) -> None:
+        self._filter.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti not in self._filter:
+            return False
+        async with async_db.new_session() as async_session:
+            return await TokenCrudRepository(async_session=async_session).is_access_token_revoked(jti=jti)
+
+    async def _load(self, bloom_filter: BloomFilter, after_id: int) -> int:
+        async with async_db.new_session() as async_session:
+            revoked = await TokenCrudRepository(async_session=async_session).read_revoked_token_ids(after_id=after_id)
+        for revoked_id, jti in revoked:
+            bloom_filter.add(jti)
+            after_id = revoked_id
+        return after_id
+
+    async def sync(self) -> None:
+        self._last_id = await self._load(bloom_filter=self._filter, after_id=self._last_id)
+
+    async def rebuild(self) -> None:
+        # 过期的撤销记录无法从布隆过滤器中删除, 定期整体重建
+        bloom_filter = BloomFilter(capacity=max(self._capacity, len(self._filter) * 2))
+        last_id = await self._load(bloom_filter=bloom_filter, after_id=0)
+        self._filter, self._last_id = bloom_filter, last_id
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        rebuild_at = loop.time() + self._rebuild_interval
+        while True:
+            await asyncio.sleep(self._sync_interval)
+            try:
+                if loop.time() >= rebuild_at:
+                    await self.rebuild()
+                    rebuild_at = loop.time() + self._rebuild_interval
+                else:
+                    await self.sync()
+            except Exception as e:
+                loguru.logger.error(f"Token Revocation --- Failed to sync revoked tokens: {e}")
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+def get_token_revocation_list() -> TokenRevocationList:
+    return TokenRevocationList(
+        capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY, sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL_SEC
+    )
+
+
+token_revocation_list: TokenRevocationList = get_token_revocation_list()
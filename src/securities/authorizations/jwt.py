@@ -1,17 +1,23 @@
 import datetime
+import hashlib
+import time
+import typing
+import uuid
 
 import pydantic
 from jose import jwt as jose_jwt, JWTError as JoseJWTError
 
 from src.config.manager import settings
 from src.models.db.account import Account
-from src.models.schemas.jwt import JWTAccount, JWToken
+from src.models.schemas.jwt import AccountPrincipal, JWTAccount, JWToken
+from src.utilities.caches.ttl_lru import TTLLRUCache
 from src.utilities.exceptions.database import EntityDoesNotExist
 
 
 class JWTGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, cache_size: int = 10000):
+        # 已验证token -> principal, 键为token的sha256, 条目在token的exp时过期
+        self._verified_tokens: TTLLRUCache[bytes, AccountPrincipal] = TTLLRUCache(maxsize=cache_size, ttl=0)
 
     def _generate_jwt_token(
         self,
@@ -31,19 +37,26 @@ class JWTGenerator:
 
         return jose_jwt.encode(to_encode, key=settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
-    def generate_access_token(self, account: Account) -> str:
+    def generate_access_token(self, account: Account, wallet_id: int | None = None) -> str:
         if not account:
             raise EntityDoesNotExist(f"Cannot generate JWT token for without Account entity!")
 
         return self._generate_jwt_token(
-            jwt_data=JWTAccount(username=account.username, email=account.email).dict(),  # type: ignore
-            expires_delta=datetime.timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRATION_TIME),
+            jwt_data=JWTAccount(
+                username=account.username,
+                email=account.email,
+                account_id=account.id,
+                wallet_id=wallet_id,
+                level=account.level,
+                jti=uuid.uuid4().hex,
+            ).dict(exclude_none=True),  # type: ignore
+            expires_delta=datetime.timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRATION_MIN),
         )
 
-    def retrieve_details_from_token(self,token: str, secret_key: str = settings.JWT_SECRET_KEY):
+    def _decode_token(self, token: str, secret_key: str) -> tuple[JWTAccount, int]:
         try:
             payload = jose_jwt.decode(token=token, key=secret_key, algorithms=[settings.JWT_ALGORITHM])
-            jwt_account = JWTAccount(username=payload["username"], email=payload["email"])
+            jwt_account = JWTAccount(**payload)
 
         except JoseJWTError as token_decode_error:
             raise ValueError("Unable to decode JWT Token") from token_decode_error
@@ -51,11 +64,52 @@ class JWTGenerator:
         except pydantic.ValidationError as validation_error:
             raise ValueError("Invalid payload in token") from validation_error
 
+        return jwt_account, payload["exp"]
+
+    def retrieve_details_from_token(self, token: str, secret_key: str = settings.JWT_SECRET_KEY):
+        jwt_account, _ = self._decode_token(token=token, secret_key=secret_key)
         return jwt_account.username
 
+    async def retrieve_principal_from_token(
+        self,
+        token: str,
+        read_principal_by_username: typing.Callable[[str], typing.Awaitable[AccountPrincipal | None]],
+    ) -> AccountPrincipal | None:
+        """
+        Verify `token` and return its principal, served from the cache until the token expires. Tokens issued
+        before the account claims existed are resolved once with `read_principal_by_username`.
+        """
+        key = _token_key(token)
+        cached = self._verified_tokens.get(key)
+        if cached is not None:
+            return cached
+
+        jwt_account, exp = self._decode_token(token=token, secret_key=settings.JWT_SECRET_KEY)
+        if jwt_account.account_id is None or jwt_account.wallet_id is None or jwt_account.level is None:
+            principal = await read_principal_by_username(jwt_account.username)
+            if principal is None:
+                return None
+        else:
+            principal = AccountPrincipal(
+                id=jwt_account.account_id,
+                username=jwt_account.username,
+                level=jwt_account.level,
+                wallet_id=jwt_account.wallet_id,
+                jti=jwt_account.jti,
+                expires_at=exp,
+            )
+
+        ttl = exp - time.time()
+        if ttl > 0:
+            self._verified_tokens.set(key, principal, ttl=ttl)
+        return principal
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 
 def get_jwt_generator() -> JWTGenerator:
-    return JWTGenerator()
+    return JWTGenerator(cache_size=settings.JWT_VERIFIED_CACHE_SIZE)
 
 
 
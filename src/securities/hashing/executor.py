@@ -0,0 +1,96 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import time
+import typing
+
+import loguru
+
+from src.config.manager import settings
+from src.utilities.exceptions.password import PasswordHashingBusy
+
+
+@dataclasses.dataclass
+class HashingMetrics:
+    completed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    total_wait_sec: float = 0.0
+    total_run_sec: float = 0.0
+
+    def as_dict(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "mean_wait_ms": round(self.total_wait_sec / completed * 1000, 2),
+            "mean_run_ms": round(self.total_run_sec / completed * 1000, 2),
+        }
+
+
+class HashingExecutor:
+    """
+    Runs CPU-bound password hashing in a process pool so neither the event loop nor the GIL is held while
+    bcrypt/Argon2 run.
+
+    At most `max_pending` calls may be queued on or running in the pool; a call that cannot get a slot within
+    `queue_timeout` seconds raises `PasswordHashingBusy` instead of piling more work onto a saturated pool.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64, queue_timeout: float = 2.0):
+        self._max_workers = max_workers
+        self._queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pool: concurrent.futures.ProcessPoolExecutor | None = None
+        self.metrics = HashingMetrics()
+
+    def start(self) -> None:
+        if self._pool is None:
+            # spawn: 不继承事件循环和数据库连接
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    async def run(self, fn: typing.Callable[..., typing.Any], *args: typing.Any) -> typing.Any:
+        """
+        Run the module-level function `fn(*args)` in the pool. `fn` and its arguments must be picklable.
+        """
+        self.start()
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._queue_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.rejected += 1
+            loguru.logger.warning(f"Hashing --- Pool saturated, rejected `{fn.__name__}` ({self.metrics.in_flight} in flight)")
+            raise PasswordHashingBusy("Password hashing is overloaded, please retry")
+
+        started_at = time.perf_counter()
+        self.metrics.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.completed += 1
+            self.metrics.total_wait_sec += started_at - queued_at
+            self.metrics.total_run_sec += time.perf_counter() - started_at
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        loguru.logger.info(f"Hashing --- Pool stopped: {self.metrics.as_dict()}")
+
+
+def get_hashing_executor() -> HashingExecutor:
+    return HashingExecutor(
+        max_workers=settings.HASHING_POOL_WORKERS,
+        max_pending=settings.HASHING_MAX_PENDING,
+        queue_timeout=settings.HASHING_QUEUE_TIMEOUT_MS / 1000,
+    )
+
+
+hashing_executor: HashingExecutor = get_hashing_executor()
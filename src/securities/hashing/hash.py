@@ -1,45 +1,77 @@
+import dataclasses
+import functools
+import secrets
+
+import loguru
 from passlib.context import CryptContext
 
 from src.config.manager import settings
+from src.securities.hashing.executor import hashing_executor
+from src.securities.hashing.policy import LEGACY_POLICY_VERSION, HashingPolicy, calibrate_argon2_time_cost, \
+    get_hashing_policy, policy_context, split_policy_version
 
 
 class HashGenerator:
-    def __init__(self):
-        self._hash_ctx_layer_1: CryptContext = CryptContext(
-            schemes=[settings.HASHING_ALGORITHM_LAYER_1], deprecated="auto"
-        )
-        self._hash_ctx_layer_2: CryptContext = CryptContext(
-            schemes=[settings.HASHING_ALGORITHM_LAYER_2], deprecated="auto"
-        )
-        self._hash_ctx_salt: str = settings.HASHING_SALT
-
-    @property
-    def _get_hashing_salt(self) -> str:
-        return self._hash_ctx_salt
-
-    @property
-    def generate_password_salt_hash(self) -> str:
-        """
-        A function to generate a hash from Bcrypt to append to the user password.
-        """
-        return self._hash_ctx_layer_1.hash(secret=self._get_hashing_salt)
+    """
+    Hashes passwords with Argon2id under the current `HashingPolicy` in the hashing process pool, and tags every
+    hash with the policy version so hashes written under an older policy can be recognised and upgraded.
+    """
 
-    def generate_password_hash(self, hash_salt: str, password: str) -> str:
-        """
-        A function that adds the user's password with the layer 1 Bcrypt hash, before
-        hash it for the second time using Argon2 algorithm.
-        """
-        return self._hash_ctx_layer_2.hash(secret=hash_salt + password)
+    def __init__(self, policy: HashingPolicy):
+        self.policy = policy
 
-    def is_password_verified(self, password: str, hashed_password: str) -> bool:
+    async def calibrate(self, target_ms: int, max_time_cost: int) -> HashingPolicy:
         """
-        A function that decodes users' password and verifies whether it is the correct password.
+        Replace the configured time cost with the one that takes `target_ms` on this machine. A `target_ms` of 0
+        keeps the configured policy.
         """
-        return self._hash_ctx_layer_2.verify(secret=password, hash=hashed_password)
+        if target_ms > 0:
+            time_cost = await hashing_executor.run(
+                calibrate_argon2_time_cost, self.policy.memory_cost, self.policy.parallelism, target_ms, max_time_cost
+            )
+            self.policy = dataclasses.replace(self.policy, time_cost=time_cost)
+            loguru.logger.info(f"Hashing --- Calibrated policy v{self.policy.version} to {self.policy}")
+        return self.policy
+
+    def generate_password_salt(self) -> str:
+        return secrets.token_hex(32)
+
+    async def generate_password_hash(self, hash_salt: str, password: str) -> str:
+        return await hashing_executor.run(_generate_password_hash, self.policy, hash_salt + password)
+
+    async def is_password_verified(self, password: str, hashed_password: str) -> bool:
+        return await hashing_executor.run(_is_password_verified, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        version, _ = split_policy_version(hashed_password)
+        return version < self.policy.version
 
 
 def get_hash_generator() -> HashGenerator:
-    return HashGenerator()
+    return HashGenerator(policy=get_hashing_policy())
 
 
 hash_generator: HashGenerator = get_hash_generator()
+
+
+@functools.lru_cache(maxsize=1)
+def _legacy_context() -> CryptContext:
+    return CryptContext(schemes=[settings.HASHING_ALGORITHM_LAYER_2], deprecated="auto")
+
+
+@functools.lru_cache(maxsize=1)
+def _verify_context() -> CryptContext:
+    return CryptContext(schemes=["argon2"])
+
+
+# 在哈希进程池中执行
+def _generate_password_hash(policy: HashingPolicy, secret: str) -> str:
+    return policy.tag(policy_context(policy).hash(secret))
+
+
+def _is_password_verified(secret: str, hashed_password: str) -> bool:
+    version, raw_hash = split_policy_version(hashed_password)
+    if version == LEGACY_POLICY_VERSION:
+        return _legacy_context().verify(secret=secret, hash=raw_hash)
+    # argon2哈希自带参数, 校验不依赖当前策略
+    return _verify_context().verify(secret=secret, hash=raw_hash)
@@ -0,0 +1,68 @@
+import dataclasses
+import functools
+import math
+import time
+
+from passlib.context import CryptContext
+
+from src.config.manager import settings
+
+# 没有版本标记的旧哈希 (bcrypt盐 + HASHING_ALGORITHM_LAYER_2)
+LEGACY_POLICY_VERSION = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class HashingPolicy:
+    """
+    Argon2id cost parameters of one policy `version`. Hashes are stored tagged as `v<version>$argon2id$...`;
+    bump `HASHING_POLICY_VERSION` together with the costs to have older hashes upgraded on their next login.
+    """
+
+    version: int
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+
+    def tag(self, hashed_password: str) -> str:
+        return f"v{self.version}{hashed_password}"
+
+
+def split_policy_version(hashed_password: str) -> tuple[int, str]:
+    prefix, separator, rest = hashed_password.partition("$")
+    if separator and prefix[:1] == "v" and prefix[1:].isdigit():
+        return int(prefix[1:]), separator + rest
+    return LEGACY_POLICY_VERSION, hashed_password
+
+
+@functools.lru_cache(maxsize=8)
+def policy_context(policy: HashingPolicy) -> CryptContext:
+    return CryptContext(
+        schemes=["argon2"],
+        argon2__type="ID",
+        argon2__rounds=policy.time_cost,
+        argon2__memory_cost=policy.memory_cost,
+        argon2__parallelism=policy.parallelism,
+    )
+
+
+def calibrate_argon2_time_cost(memory_cost: int, parallelism: int, target_ms: int, max_time_cost: int) -> int:
+    """
+    Smallest Argon2 time cost whose hash takes at least `target_ms` on this machine, capped at `max_time_cost`.
+    Argon2 time grows linearly with the time cost, so one pass at cost 1 (best of three) is enough to estimate it.
+    """
+    context = policy_context(HashingPolicy(version=0, time_cost=1, memory_cost=memory_cost, parallelism=parallelism))
+    elapsed = math.inf
+    for _ in range(3):
+        started_at = time.perf_counter()
+        context.hash("calibration")
+        elapsed = min(elapsed, time.perf_counter() - started_at)
+    return max(1, min(max_time_cost, math.ceil(target_ms / 1000 / elapsed)))
+
+
+def get_hashing_policy() -> HashingPolicy:
+    return HashingPolicy(
+        version=settings.HASHING_POLICY_VERSION,
+        time_cost=settings.HASHING_ARGON2_TIME_COST,
+        memory_cost=settings.HASHING_ARGON2_MEMORY_KIB,
+        parallelism=settings.HASHING_ARGON2_PARALLELISM,
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import typing
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config.manager import settings
+from src.models.db.movie import HomePage, JustReviewed, Movie, SearchingPage
+from src.utilities.caches.ttl_lru import TTLLRUCache
+
+CURATED_MOVIE_TABLES: tuple[str, ...] = (HomePage.__tablename__, SearchingPage.__tablename__, JustReviewed.__tablename__)
+_PENDING_INVALIDATIONS_KEY = "curated_movie_lists_pending_invalidations"
+
+
+class CuratedMovieListCache:
+    """
+    Pre-serialized JSON for the admin-curated movie lists (home page, searching page, just reviewed).
+
+    Entries are dropped when a committed session touched the backing tables or a listed movie; the TTL bounds
+    staleness for edits made by other workers or directly in the database.
+    """
+
+    def __init__(self, ttl: float):
+        self._cache: TTLLRUCache[str, bytes] = TTLLRUCache(maxsize=len(CURATED_MOVIE_TABLES), ttl=ttl)
+        self._locks: dict[str, asyncio.Lock] = {table: asyncio.Lock() for table in CURATED_MOVIE_TABLES}
+
+    async def get_or_load(self, table: str, loader: typing.Callable[[], typing.Awaitable[bytes]]) -> bytes:
+        cached = self._cache.get(table)
+        if cached is not None:
+            return cached
+
+        async with self._locks[table]:
+            cached = self._cache.get(table)
+            if cached is None:
+                cached = await loader()
+                self._cache.set(table, cached)
+        return cached
+
+    def invalidate(self, *tables: str) -> None:
+        for table in tables or CURATED_MOVIE_TABLES:
+            self._cache.pop(table)
+
+
+def get_curated_movie_list_cache() -> CuratedMovieListCache:
+    return CuratedMovieListCache(ttl=settings.CURATED_MOVIES_CACHE_TTL_SEC)
+
+
+curated_movie_list_cache: CuratedMovieListCache = get_curated_movie_list_cache()
+
+
+@event.listens_for(Session, "after_flush")
+def collect_curated_movie_list_changes(session: Session, flush_context: typing.Any) -> None:
+    pending: set[str] = session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Movie):
+            pending.update(CURATED_MOVIE_TABLES)
+        elif isinstance(instance, (HomePage, SearchingPage, JustReviewed)):
+            pending.add(instance.__tablename__)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_curated_movie_lists(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if pending:
+        curated_movie_list_cache.invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_curated_movie_list_changes(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
@@ -0,0 +1,110 @@
+import asyncio
+import dataclasses
+import time
+import typing
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.manager import settings
+from src.models.db.task import CatalogVersion, TaskCategory
+
+TASK_CATEGORY_CATALOG = "task_categories"
+
+
+@dataclasses.dataclass(frozen=True)
+class TaskCategoryEntry:
+    id: int
+    name: str
+    description: str
+    access_level: int
+    movies_uploaded_count: int
+    reviews_posted_count: int
+    total_movies_uploaded: int
+    total_reviews_posted: int
+    is_copy_right_required: bool
+    task_reward: float
+
+
+class TaskCategoryCatalog:
+    """
+    An in-process copy of `task_categories`, indexed by id and by access level.
+
+    Admin writes bump the `catalog_versions` row for the catalog in the same transaction. Every worker compares
+    that version at most once per `check_interval` seconds and reloads the catalog when it changed, so all workers
+    converge without querying the categories on every request.
+    """
+
+    def __init__(self, check_interval: float):
+        self._check_interval = check_interval
+        self._by_id: dict[int, TaskCategoryEntry] = {}
+        self._by_access_level: dict[int, tuple[TaskCategoryEntry, ...]] = {}
+        self._version: int | None = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def load(self, async_session: AsyncSession) -> None:
+        version = await self._read_version(async_session)
+        rows = (await async_session.execute(sqlalchemy.select(TaskCategory.__table__).order_by(TaskCategory.id))).all()
+        entries = [TaskCategoryEntry(**{field.name: getattr(row, field.name) for field in dataclasses.fields(TaskCategoryEntry)}) for row in rows]
+
+        by_access_level: dict[int, list[TaskCategoryEntry]] = {}
+        for entry in entries:
+            by_access_level.setdefault(entry.access_level, []).append(entry)
+        self._by_id = {entry.id: entry for entry in entries}
+        self._by_access_level = {level: tuple(level_entries) for level, level_entries in by_access_level.items()}
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    async def ensure_fresh(self, async_session: AsyncSession) -> None:
+        if time.monotonic() - self._checked_at < self._check_interval:
+            return
+
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self._check_interval:
+                return
+            if self._version is None or await self._read_version(async_session) != self._version:
+                await self.load(async_session)
+            else:
+                self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """
+        Force the next `ensure_fresh` to reload, used by this worker right after its own admin write committed.
+        """
+        self._version = None
+        self._checked_at = float("-inf")
+
+    @staticmethod
+    async def bump_version(async_session: AsyncSession) -> None:
+        """
+        Increment the catalog version inside the caller's transaction.
+        """
+        result = await async_session.execute(
+            sqlalchemy.update(CatalogVersion)
+            .where(CatalogVersion.name == TASK_CATEGORY_CATALOG)
+            .values(version=CatalogVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            await async_session.execute(sqlalchemy.insert(CatalogVersion).values(name=TASK_CATEGORY_CATALOG, version=1))
+
+    @staticmethod
+    async def _read_version(async_session: AsyncSession) -> int:
+        stmt = sqlalchemy.select(CatalogVersion.version).where(CatalogVersion.name == TASK_CATEGORY_CATALOG)
+        return (await async_session.scalar(stmt)) or 0
+
+    def all(self) -> list[TaskCategoryEntry]:
+        return list(self._by_id.values())
+
+    def get(self, task_category_id: int) -> TaskCategoryEntry | None:
+        return self._by_id.get(task_category_id)
+
+    def by_access_level(self, access_level: int) -> tuple[TaskCategoryEntry, ...]:
+        return self._by_access_level.get(access_level, ())
+
+
+def get_task_category_catalog() -> TaskCategoryCatalog:
+    return TaskCategoryCatalog(check_interval=settings.TASK_CATEGORY_CATALOG_CHECK_SEC)
+
+
+task_category_catalog: TaskCategoryCatalog = get_task_category_catalog()
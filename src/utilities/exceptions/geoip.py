@@ -0,0 +1,8 @@
+class GeoIPLookupError(Exception):
+    """
+    Throw an exception when the geo-IP backend cannot resolve an IP address.
+    """
+
+    def __init__(self, message: str, status_code: int = 502):
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,4 @@
+class UpstreamUnavailable(Exception):
+    """
+    Throw an exception when an upstream service is failing and its circuit breaker is open.
+    """
@@ -2,3 +2,13 @@ class PasswordDoesNotMatch(Exception):
     """
     Throw an exception when the account password does not match the entitiy's hashed password from the database.
     """
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Throw an exception when the password hashing pool is saturated and a request waited too long for a slot.
+    """
+
+    def __init__(self, message: str, status_code: int = 503):
+        super().__init__(message)
+        self.status_code = status_code
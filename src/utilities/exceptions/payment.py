@@ -0,0 +1,8 @@
+class PaymentGatewayError(Exception):
+    """
+    Throw an exception when the payment gateway is unreachable or rejects a request.
+    """
+
+    def __init__(self, message: str, status_code: int = 502):
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,32 @@
+import base64
+import json
+import typing
+
+
+def encode_cursor(*values: typing.Any) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque, URL-safe cursor.
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> list[typing.Any]:
+    """
+    Decode a cursor produced by `encode_cursor`, raising `ValueError` unless it holds exactly one value of each
+    of `types`, in order.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as decode_error:
+        raise ValueError("Malformed pagination cursor") from decode_error
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Malformed pagination cursor")
+
+    for value, value_type in zip(values, types):
+        accepted_types = (int, float) if value_type is float else value_type
+        if isinstance(value, bool) or not isinstance(value, accepted_types):
+            raise ValueError("Malformed pagination cursor")
+    return values
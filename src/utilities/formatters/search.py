@@ -0,0 +1,27 @@
+import re
+
+# innodb_ft_min_token_size 的默认值
+FULLTEXT_MIN_TOKEN_SIZE: int = 3
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize_search_query(search: str, max_terms: int = 8) -> list[str]:
+    """
+    Split a user's search box input into plain lowercase terms, dropping anything FULLTEXT boolean mode would read
+    as an operator.
+    """
+    return [term.lower() for term in SEARCH_TOKEN_PATTERN.findall(search)][:max_terms]
+
+
+def format_boolean_prefix_query(terms: list[str], truncate_by: int = 0) -> str:
+    """
+    Build a FULLTEXT boolean-mode query requiring every term as a prefix, e.g. `+incep* +nolan*`.
+    `truncate_by` shortens each term to tolerate typos near the end of a word (`incepton` -> `incept*`).
+    """
+    prefixes = []
+    for term in terms:
+        if len(term) < FULLTEXT_MIN_TOKEN_SIZE:
+            continue
+        prefix = term[: max(FULLTEXT_MIN_TOKEN_SIZE, len(term) - truncate_by)]
+        prefixes.append(f"+{prefix}*")
+    return " ".join(prefixes)
@@ -0,0 +1,58 @@
+import httpx
+
+from src.models.schemas.geoip import GeoIPDetails
+from src.utilities.exceptions.geoip import GeoIPLookupError
+from src.utilities.exceptions.http_client import UpstreamUnavailable
+from src.utilities.http.clients import http_clients
+
+
+class GeoIPBackend:
+    async def lookup(self, ip: str) -> GeoIPDetails:
+        raise NotImplementedError
+
+
+class LocalGeoIPBackend(GeoIPBackend):
+    """
+    Resolves every address to a fixed "Local" location without leaving the process. Used for loopback and
+    private addresses, and as the whole backend in tests and local development.
+    """
+
+    async def lookup(self, ip: str) -> GeoIPDetails:
+        return GeoIPDetails(
+            ip=ip,
+            is_proxy=False,
+            calling_code="Local",
+            country_name="Local",
+            country_code="Local",
+            region_name="Local",
+            city="Local",
+        )
+
+
+class IPRegistryGeoIPBackend(GeoIPBackend):
+    def __init__(self, api_key: str):
+        self._api_key = api_key
+
+    async def lookup(self, ip: str) -> GeoIPDetails:
+        try:
+            response = await http_clients.get(name="ipregistry").get(f"/{ip}", params={"key": self._api_key})
+            response.raise_for_status()  # 会抛出异常，如果响应状态不是200
+            result = response.json()
+        except httpx.HTTPStatusError as e:
+            raise GeoIPLookupError(f"ipregistry returned {e.response.status_code} for `{ip}`", status_code=e.response.status_code) from e
+        except httpx.RequestError as e:
+            raise GeoIPLookupError(f"ipregistry request for `{ip}` failed: {e}") from e
+        except UpstreamUnavailable as e:
+            raise GeoIPLookupError(str(e), status_code=503) from e
+
+        location = result.get("location") or {}
+        country = location.get("country") or {}
+        return GeoIPDetails(
+            ip=ip,
+            is_proxy=any((result.get("security") or {}).values()),
+            calling_code=country.get("calling_code") or "Unknown",
+            country_name=country.get("name") or "Unknown",
+            country_code=country.get("code") or "Unknown",
+            region_name=(location.get("region") or {}).get("name") or "Unknown",
+            city=location.get("city") or "Unknown",
+        )
@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+import ipaddress
+
+import loguru
+
+from src.config.manager import settings
+from src.models.schemas.geoip import GeoIPDetails
+from src.utilities.caches.ttl_lru import TTLLRUCache
+from src.utilities.geoip.backends import GeoIPBackend, IPRegistryGeoIPBackend, LocalGeoIPBackend
+from src.utilities.geoip.stores import DatabaseGeoIPStore, GeoIPStore
+
+
+class GeoIPResolver:
+    """
+    Resolves IP addresses through three tiers: an in-process LRU+TTL cache, a persistent store and finally
+    the backend. Concurrent lookups of the same address share a single in-flight resolution.
+    """
+
+    def __init__(
+        self,
+        backend: GeoIPBackend,
+        store: GeoIPStore | None = None,
+        cache_size: int = 10_000,
+        cache_ttl: float = 3600,
+        store_max_age: datetime.timedelta = datetime.timedelta(days=30),
+    ):
+        self.backend = backend
+        self.store = store or GeoIPStore()
+        self._local_backend = LocalGeoIPBackend()
+        self._cache: TTLLRUCache[str, GeoIPDetails] = TTLLRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._store_max_age = store_max_age
+        self._in_flight: dict[str, asyncio.Task] = dict()
+
+    @staticmethod
+    def is_local_ip(ip: str) -> bool:
+        try:
+            return not ipaddress.ip_address(ip).is_global
+        except ValueError:
+            return True
+
+    async def resolve(self, ip: str) -> GeoIPDetails:
+        if self.is_local_ip(ip=ip):
+            return await self._local_backend.lookup(ip=ip)
+
+        cached = self._cache.get(ip)
+        if cached is not None:
+            return cached
+
+        in_flight = self._in_flight.get(ip)
+        if in_flight is None:
+            in_flight = asyncio.create_task(self._resolve_uncached(ip=ip))
+            self._in_flight[ip] = in_flight
+            in_flight.add_done_callback(lambda _: self._in_flight.pop(ip, None))
+
+        # shield: 一个调用方被取消时不影响其他等待同一IP的调用方
+        return await asyncio.shield(in_flight)
+
+    async def _resolve_uncached(self, ip: str) -> GeoIPDetails:
+        try:
+            details = await self.store.load(ip=ip, max_age=self._store_max_age)
+        except Exception as e:
+            loguru.logger.warning(f"GeoIP --- Store lookup for `{ip}` failed: {e}")
+            details = None
+
+        if details is None:
+            details = await self.backend.lookup(ip=ip)
+            await self.store.save(details=details)
+
+        self._cache.set(ip, details)
+        return details
+
+    def invalidate(self, ip: str) -> None:
+        self._cache.pop(ip)
+
+
+def get_geoip_resolver() -> GeoIPResolver:
+    if settings.GEOIP_BACKEND == "local":
+        return GeoIPResolver(backend=LocalGeoIPBackend())
+
+    return GeoIPResolver(
+        backend=IPRegistryGeoIPBackend(api_key=settings.IPREGISTRY_API_KEY),
+        store=DatabaseGeoIPStore(),
+        cache_size=settings.GEOIP_CACHE_SIZE,
+        cache_ttl=settings.GEOIP_CACHE_TTL_MIN * 60,
+        store_max_age=datetime.timedelta(days=settings.GEOIP_STORE_TTL_DAY),
+    )
+
+
+geoip_resolver: GeoIPResolver = get_geoip_resolver()
@@ -0,0 +1,75 @@
+import datetime
+
+import loguru
+import sqlalchemy
+from sqlalchemy.exc import IntegrityError
+
+from src.models.db.geoip import GeoIPRecord
+from src.models.schemas.geoip import GeoIPDetails
+from src.repository.database import async_db
+
+
+class GeoIPStore:
+    """
+    The persistent tier behind the in-process cache. The base store keeps nothing.
+    """
+
+    async def load(self, ip: str, max_age: datetime.timedelta) -> GeoIPDetails | None:
+        return None
+
+    async def save(self, details: GeoIPDetails) -> None:
+        pass
+
+
+class DatabaseGeoIPStore(GeoIPStore):
+    """
+    Keeps resolved addresses in the `geoip` table so they survive restarts and are shared by all workers.
+    Uses its own short session so lookups never touch the caller's transaction.
+    """
+
+    async def load(self, ip: str, max_age: datetime.timedelta) -> GeoIPDetails | None:
+        stmt = sqlalchemy.select(GeoIPRecord).where(
+            GeoIPRecord.ip == ip,
+            GeoIPRecord.resolved_at >= datetime.datetime.now(tz=datetime.timezone.utc) - max_age,
+        )
+        async with async_db.new_session() as async_session:
+            query = await async_session.execute(statement=stmt)
+            record = query.scalar()
+
+        if not record:
+            return None
+
+        return GeoIPDetails(
+            ip=record.ip,
+            is_proxy=record.is_proxy,
+            calling_code=record.calling_code,
+            country_name=record.country_name,
+            country_code=record.country_code,
+            region_name=record.region_name,
+            city=record.city,
+        )
+
+    async def save(self, details: GeoIPDetails) -> None:
+        values = details.model_dump()
+        async with async_db.new_session() as async_session:
+            try:
+                async_session.add(instance=GeoIPRecord(**values))
+                await async_session.commit()
+            except IntegrityError:
+                await async_session.rollback()
+                await self._refresh(async_session=async_session, details=details, values=values)
+            except Exception as e:
+                loguru.logger.warning(f"GeoIP --- Failed to persist `{details.ip}`: {e}")
+
+    async def _refresh(self, async_session, details: GeoIPDetails, values: dict) -> None:
+        # 已有记录时改为更新; 持久化失败不应影响已经成功的查询
+        update_stmt = (
+            sqlalchemy.update(table=GeoIPRecord)
+            .where(GeoIPRecord.ip == details.ip)
+            .values(**values, resolved_at=datetime.datetime.now(tz=datetime.timezone.utc))
+        )
+        try:
+            await async_session.execute(statement=update_stmt)
+            await async_session.commit()
+        except Exception as e:
+            loguru.logger.warning(f"GeoIP --- Failed to refresh `{details.ip}`: {e}")
@@ -0,0 +1,42 @@
+import time
+
+from src.utilities.exceptions.http_client import UpstreamUnavailable
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for `reset_timeout` seconds.
+    Afterwards a single trial call is let through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_progress = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        if self._opened_at is None:
+            return
+
+        if time.monotonic() - self._opened_at < self._reset_timeout or self._trial_in_progress:
+            raise UpstreamUnavailable(f"Circuit for upstream `{self.name}` is open")
+
+        self._trial_in_progress = True
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._trial_in_progress or self._consecutive_failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+        self._trial_in_progress = False
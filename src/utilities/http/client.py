@@ -0,0 +1,147 @@
+import asyncio
+import random
+import typing
+
+import httpx
+import loguru
+import pydantic
+
+from src.utilities.exceptions.http_client import UpstreamUnavailable
+from src.utilities.http.circuit_breaker import CircuitBreaker
+
+IDEMPOTENT_METHODS: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({429, 502, 503, 504})
+# 请求根本没有发出去, 任何方法都可以安全重试
+UNSENT_REQUEST_ERRORS: tuple[type[httpx.TransportError], ...] = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class UpstreamSettings(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
+    base_url: str
+    timeout: float = 5.0
+    connect_timeout: float = 3.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    max_retries: int = 2
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    headers: dict[str, str] = dict()
+    transport: httpx.AsyncBaseTransport | None = None
+
+
+class UpstreamClient:
+    """
+    A long-lived, pooled client for one upstream service with timeouts, jittered retries and a circuit breaker.
+
+    Requests that never reached the upstream (connect errors, pool timeouts) are always retried. Other failures
+    are only retried for idempotent methods, unless the caller passes `idempotent=True` (e.g. a POST keyed by
+    an id the upstream de-duplicates on).
+    """
+
+    def __init__(self, name: str, upstream_settings: UpstreamSettings):
+        self.name = name
+        self.settings = upstream_settings
+        self.circuit_breaker = CircuitBreaker(
+            name=name,
+            failure_threshold=upstream_settings.failure_threshold,
+            reset_timeout=upstream_settings.reset_timeout,
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.settings.base_url,
+                headers=self.settings.headers,
+                timeout=httpx.Timeout(self.settings.timeout, connect=self.settings.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.settings.max_connections,
+                    max_keepalive_connections=self.settings.max_keepalive_connections,
+                ),
+                transport=self.settings.transport,
+            )
+        return self._client
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter
+        return random.uniform(0, min(self.settings.backoff_max, self.settings.backoff_base * 2**attempt))
+
+    async def request(
+        self, method: str, url: str, *, idempotent: bool | None = None, **kwargs: typing.Any
+    ) -> httpx.Response:
+        method = method.upper()
+        retryable = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+        attempts = self.settings.max_retries + 1
+
+        for attempt in range(attempts):
+            is_last_attempt = attempt + 1 >= attempts
+            self.circuit_breaker.before_call()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self.circuit_breaker.record_failure()
+                if is_last_attempt or not (retryable or isinstance(e, UNSENT_REQUEST_ERRORS)):
+                    raise
+                loguru.logger.warning(f"Upstream `{self.name}` --- {method} {url} failed ({e!r}), retrying")
+            except BaseException:
+                # 取消或其它httpx错误也要结束半开状态的试探, 否则熔断器会一直保持打开
+                self.circuit_breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self.circuit_breaker.record_success()
+                else:
+                    self.circuit_breaker.record_failure()
+
+                if is_last_attempt or not retryable or response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                loguru.logger.warning(f"Upstream `{self.name}` --- {method} {url} returned {response.status_code}, retrying")
+
+            await asyncio.sleep(self._backoff(attempt=attempt))
+
+        raise UpstreamUnavailable(f"Upstream `{self.name}` exhausted its retries")  # pragma: no cover
+
+    async def get(self, url: str, **kwargs: typing.Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: typing.Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class HTTPClientRegistry:
+    """
+    Application-scoped registry of `UpstreamClient`s, opened on startup and closed on shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._settings: dict[str, UpstreamSettings] = dict()
+        self._clients: dict[str, UpstreamClient] = dict()
+
+    def register(self, name: str, upstream_settings: UpstreamSettings) -> None:
+        self._settings[name] = upstream_settings
+        self._clients.pop(name, None)
+
+    def get(self, name: str) -> UpstreamClient:
+        upstream_client = self._clients.get(name)
+        if upstream_client is None:
+            upstream_client = UpstreamClient(name=name, upstream_settings=self._settings[name])
+            self._clients[name] = upstream_client
+        return upstream_client
+
+    async def startup(self) -> None:
+        for name in self._settings:
+            _ = self.get(name=name).client
+
+    async def shutdown(self) -> None:
+        for upstream_client in self._clients.values():
+            await upstream_client.aclose()
+        self._clients.clear()
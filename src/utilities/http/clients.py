@@ -0,0 +1,42 @@
+from src.config.manager import settings
+from src.utilities.http.client import HTTPClientRegistry, UpstreamSettings
+from src.utilities.payments.fake_server import FakeNOWPaymentsServer
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    registry = HTTPClientRegistry()
+    registry.register(
+        name="ipregistry",
+        upstream_settings=UpstreamSettings(base_url="https://api.ipregistry.co", timeout=3.0, max_connections=50),
+    )
+    registry.register(
+        name="nowpayments",
+        upstream_settings=UpstreamSettings(
+            base_url="https://api.nowpayments.io",
+            timeout=15.0,
+            max_connections=20,
+            headers={"x-api-key": settings.NOWPAYMENTS_API_KEY},
+            transport=FakeNOWPaymentsServer().transport if settings.PAYMENT_PROVIDER == "fake" else None,
+        ),
+    )
+    registry.register(
+        name="recaptcha",
+        upstream_settings=UpstreamSettings(base_url="https://www.google.com", timeout=5.0, max_connections=20),
+    )
+    registry.register(
+        name="imdb",
+        upstream_settings=UpstreamSettings(
+            base_url="https://www.imdb.com",
+            timeout=10.0,
+            max_connections=5,
+            headers={
+                "Accept": "text/html,application/xhtml+xml",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/84.0.4147.105 Safari/537.36",
+                "Referer": "https://www.imdb.com/",
+            },
+        ),
+    )
+    return registry
+
+
+http_clients: HTTPClientRegistry = get_http_client_registry()
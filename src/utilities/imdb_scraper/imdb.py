@@ -2,17 +2,22 @@ import asyncio
 import json
 import re
 
-from PyMovieDb import IMDB
+import httpx
+from PyMovieDb import ImdbParser
 from fastapi import HTTPException
 
-from src.models.db.movie import Movie
-imdb = IMDB()
+from src.utilities.http.clients import http_clients
+
+JSON_LD_PATTERN = re.compile(r'<script type="application/ld\+json">(.*?)</script>', re.S)
+
+
 async def async_get_by_id(imdb_url: str):
-    loop = asyncio.get_running_loop()
-    # 在线程池中运行同步函数，避免阻塞事件循环
+    # 只取路径, 请求始终发往imdb.com并复用连接池
+    path = httpx.URL(imdb_url).path
     try:
-        json_result = await loop.run_in_executor(None, imdb.get, imdb_url)
-        result = json.loads(json_result)
+        response = await http_clients.get(name="imdb").get(path)
+        response.raise_for_status()
+        result = parse_movie_json_ld(response.text)
         result['duration'] = parse_iso_duration(result.get('duration')) if result.get('duration') else None
     except Exception as e:
         print(e)
@@ -20,6 +25,40 @@ async def async_get_by_id(imdb_url: str):
     return result
 
 
+def parse_movie_json_ld(html: str) -> dict:
+    """
+    Extract the movie's schema.org JSON-LD block from an IMDb title page, in the same shape PyMovieDb returns.
+    """
+    match = JSON_LD_PATTERN.search(html)
+    if not match:
+        raise ValueError("No JSON-LD block found on the IMDb page")
+
+    raw = ''.join(match.group(1).splitlines())
+    try:
+        result = json.loads(raw)
+    except json.decoder.JSONDecodeError:
+        # description/trailer/reviewBody里有时会有未转义的字符
+        to_parse = ImdbParser(raw)
+        to_parse.remove_trailer
+        try:
+            result = json.loads(to_parse.remove_description)
+        except json.decoder.JSONDecodeError:
+            result = json.loads(to_parse.remove_review_body)
+
+    genre = result.get('genre') or []
+    return {
+        'name': result.get('name'),
+        'poster': result.get('image'),
+        'description': result.get('description'),
+        'contentRating': result.get('contentRating'),
+        'genre': [genre] if isinstance(genre, str) else genre,
+        'datePublished': result.get('datePublished'),
+        'duration': result.get('duration'),
+        'actor': [{'name': actor.get('name'), 'url': actor.get('url')} for actor in result.get('actor', [])],
+        'director': [{'name': director.get('name'), 'url': director.get('url')} for director in result.get('director', [])],
+    }
+
+
 def parse_iso_duration(duration):
     # Regex to find hours (H) and minutes (M) in ISO 8601 duration strings
     pattern = re.compile(r'PT(\d+H)?(\d+M)?')
@@ -38,7 +77,7 @@ def parse_iso_duration(duration):
     return total_minutes
 async def main():
     movie = await async_get_by_id('https://www.imdb.com/title/tt16426418/?ref_=hm_inth_tt_i_5')
-    print(movie.title)
+    print(movie['name'])
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -0,0 +1,49 @@
+import datetime
+import itertools
+
+import httpx
+
+
+class FakeNOWPaymentsServer:
+    """
+    An in-process stand-in for the NOWPayments `/v1/payment` API, mounted as the transport of the `nowpayments`
+    HTTP client when `PAYMENT_PROVIDER=fake`. Local development and tests go through the real client code path
+    without reaching the network. The same `order_id` always returns the same payment.
+    """
+
+    def __init__(self) -> None:
+        self._payment_ids = itertools.count(start=5_000_000_000)
+        self.payments: dict[str, dict] = dict()
+        self.requests: list[httpx.Request] = list()
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.method != "POST" or request.url.path != "/v1/payment":
+            return httpx.Response(404, json={"message": "Not found"})
+
+        # 与nowpayments客户端一致, 请求体是表单编码
+        body = dict(httpx.QueryParams(request.content.decode()))
+        order_id = body.get("order_id")
+        if not order_id or not body.get("price_amount") or not body.get("pay_currency"):
+            return httpx.Response(400, json={"message": "price_amount, pay_currency and order_id are required"})
+
+        if order_id not in self.payments:
+            created_at = datetime.datetime.now(tz=datetime.timezone.utc)
+            price_amount = float(body["price_amount"])
+            self.payments[order_id] = {
+                "payment_id": next(self._payment_ids),
+                "payment_status": "waiting",
+                "pay_address": f"fake-{body['pay_currency']}-{order_id[:16]}",
+                "price_amount": price_amount,
+                "price_currency": body.get("price_currency", "usd"),
+                "pay_amount": price_amount,
+                "pay_currency": body["pay_currency"],
+                "order_id": order_id,
+                "created_at": created_at.isoformat(),
+                "expiration_estimate_date": (created_at + datetime.timedelta(minutes=20)).isoformat(),
+            }
+        return httpx.Response(201, json=self.payments[order_id])
@@ -0,0 +1,44 @@
+import asyncio
+
+from src.config.manager import settings
+from src.models.schemas.wallet import PaymentInCreate, PaymentInResponse
+from src.utilities.caches.ttl_lru import TTLLRUCache
+from src.utilities.payments.providers import PaymentProvider, get_payment_provider
+
+
+class PaymentGateway:
+    """
+    Creates payments through a `PaymentProvider`, keyed by `order_id`: concurrent requests for the same order
+    share one upstream call and a retried order returns the payment that was already created for it.
+    """
+
+    def __init__(self, provider: PaymentProvider, cache_size: int = 10_000, cache_ttl: float = 3600):
+        self.provider = provider
+        self._payments: TTLLRUCache[str, PaymentInResponse] = TTLLRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._in_flight: dict[str, asyncio.Task] = dict()
+
+    async def create_payment(self, payment: PaymentInCreate) -> PaymentInResponse:
+        created = self._payments.get(payment.order_id)
+        if created is not None:
+            return created
+
+        in_flight = self._in_flight.get(payment.order_id)
+        if in_flight is None:
+            in_flight = asyncio.create_task(self._create_uncached(payment=payment))
+            self._in_flight[payment.order_id] = in_flight
+            in_flight.add_done_callback(lambda _: self._in_flight.pop(payment.order_id, None))
+
+        # shield: 客户端断开不会取消已经发出的支付创建请求
+        return await asyncio.shield(in_flight)
+
+    async def _create_uncached(self, payment: PaymentInCreate) -> PaymentInResponse:
+        created = await self.provider.create_payment(payment=payment)
+        self._payments.set(payment.order_id, created)
+        return created
+
+
+def get_payment_gateway() -> PaymentGateway:
+    return PaymentGateway(provider=get_payment_provider(), cache_ttl=settings.PAYMENT_ORDER_CACHE_TTL_MIN * 60)
+
+
+payment_gateway: PaymentGateway = get_payment_gateway()
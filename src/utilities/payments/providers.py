@@ -0,0 +1,58 @@
+import httpx
+
+from src.config.manager import settings
+from src.models.schemas.wallet import PaymentInCreate, PaymentInResponse
+from src.utilities.exceptions.http_client import UpstreamUnavailable
+from src.utilities.exceptions.payment import PaymentGatewayError
+from src.utilities.http.clients import http_clients
+
+
+class PaymentProvider:
+    async def create_payment(self, payment: PaymentInCreate) -> PaymentInResponse:
+        raise NotImplementedError
+
+
+class NOWPaymentsProvider(PaymentProvider):
+    """
+    Creates payments through the pooled `nowpayments` client. Requests that never reached NOWPayments are
+    retried by the client; anything that may have been processed is surfaced instead of being re-sent.
+    """
+
+    def __init__(self, ipn_callback_url: str, client_name: str = "nowpayments"):
+        self._ipn_callback_url = ipn_callback_url
+        self._client_name = client_name
+
+    async def create_payment(self, payment: PaymentInCreate) -> PaymentInResponse:
+        data = {
+            "price_amount": payment.price_amount,
+            "price_currency": "usd",
+            "pay_currency": payment.pay_currency,
+            "ipn_callback_url": self._ipn_callback_url,
+            "order_id": payment.order_id,
+            "order_description": "Acount top-up",
+        }
+        try:
+            response = await http_clients.get(name=self._client_name).post("/v1/payment", data=data)
+        except (UpstreamUnavailable, httpx.TransportError) as e:
+            raise PaymentGatewayError(f"Payment gateway is unavailable: {e}", status_code=503)
+        if response.is_error:
+            raise PaymentGatewayError(f"Payment gateway rejected the payment with status {response.status_code}")
+        response_data = response.json()
+        if "payment_id" not in response_data:
+            raise PaymentGatewayError("Payment gateway returned no payment_id")
+        return PaymentInResponse(
+            payment_id=response_data["payment_id"],
+            pay_address=response_data["pay_address"],
+            price_amount=response_data["price_amount"],
+            price_currency=response_data["price_currency"],
+            pay_amount=response_data["pay_amount"],
+            pay_currency=response_data["pay_currency"],
+            created_at=response_data["created_at"],
+            expiration_estimate_date=response_data["expiration_estimate_date"],
+            payment_status=response_data["payment_status"],
+        )
+
+
+def get_payment_provider() -> PaymentProvider:
+    # PAYMENT_PROVIDER=fake时nowpayments客户端挂载的是本地假服务, 代码路径相同
+    return NOWPaymentsProvider(ipn_callback_url=f"{settings.EXTERNAL_REQUEST_URL}/api/wallet/ipn_callback")
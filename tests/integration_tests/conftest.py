@@ -0,0 +1,39 @@
+import asyncio
+import typing
+
+import pytest
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.repository.table import Base
+from src.utilities.caches.task_categories import task_category_catalog
+
+Scenario = typing.Callable[[async_sessionmaker[AsyncSession]], typing.Awaitable[typing.Any]]
+
+
+@pytest.fixture(name="run_in_sqlite")
+def run_in_sqlite() -> typing.Callable[[Scenario], typing.Any]:
+    """
+    A fixture that runs an async scenario against a fresh in-memory SQLite database with every table created.
+    Pass a file `url` when the scenario needs truly concurrent sessions: in-memory SQLite shares one connection.
+    """
+
+    def run(scenario: Scenario, url: str = "sqlite+aiosqlite://") -> typing.Any:
+        async def main() -> typing.Any:
+            engine = create_async_engine(url)
+            # SQLite只有打开外键约束才会执行 ON DELETE CASCADE
+            sqlalchemy.event.listen(
+                engine.sync_engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON")
+            )
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            # 新数据库, 丢弃上一个场景加载的任务种类目录
+            task_category_catalog.invalidate()
+            try:
+                return await scenario(async_sessionmaker(bind=engine, expire_on_commit=False))
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,56 @@
+import json
+
+from src.models.db.account import Account
+from src.models.db.movie import HomePage, Movie
+from src.repository.crud.movie import MovieCRUDRepository
+from src.utilities.caches.curated_movies import curated_movie_list_cache
+
+
+def _movie(title: str, account: Account) -> Movie:
+    return Movie(
+        account=account,
+        title=title,
+        description="",
+        year=2024,
+        rating="PG",
+        genre="Drama",
+        director="",
+        cast="",
+        cover_image_url="https://example.com/cover.png",
+    )
+
+
+def test_home_page_cache_is_invalidated_on_commit(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple[list, list, list]:
+        curated_movie_list_cache.invalidate()
+
+        async with session_factory() as async_session:
+            account = Account(username="curator", email="curator@example.com")
+            first, second = _movie("First", account=account), _movie("Second", account=account)
+            async_session.add_all([first, second])
+            await async_session.flush()
+            async_session.add(HomePage(movie_id=first.id))
+            await async_session.commit()
+
+            movie_repo = MovieCRUDRepository(async_session=async_session)
+            before = json.loads(await movie_repo.read_movies_of_home_page_json())
+
+            # 直接改库但不经过ORM, 缓存仍然返回旧数据
+            await async_session.execute(HomePage.__table__.delete())
+            cached = json.loads(await movie_repo.read_movies_of_home_page_json())
+
+            async_session.add(HomePage(movie_id=second.id))
+            await async_session.commit()
+            after = json.loads(await movie_repo.read_movies_of_home_page_json())
+
+        return (
+            [movie["title"] for movie in before["movies"]],
+            [movie["title"] for movie in cached["movies"]],
+            [movie["title"] for movie in after["movies"]],
+        )
+
+    before, cached, after = run_in_sqlite(scenario)
+
+    assert before == ["First"]
+    assert cached == ["First"]
+    assert after == ["Second"]
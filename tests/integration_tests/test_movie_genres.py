@@ -0,0 +1,49 @@
+from src.models.db.account import Account
+from src.models.schemas.movie import MovieInCreate
+from src.repository.crud.movie import MovieCRUDRepository
+
+
+def _movie_in_create(title: str, genre: str) -> MovieInCreate:
+    return MovieInCreate(
+        title=title,
+        description="",
+        year=2024,
+        rating="PG",
+        genre=genre,
+        director="",
+        cast="",
+        cover_image_url="https://example.com/cover.png",
+    )
+
+
+def test_genre_pages_and_facets(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account = Account(username="uploader", email="uploader@example.com")
+            async_session.add(account)
+            await async_session.commit()
+
+            movie_repo = MovieCRUDRepository(async_session=async_session)
+            for index in range(5):
+                genre = "Drama, Action" if index % 2 == 0 else "Drama"
+                await movie_repo.create_movie(movie=_movie_in_create(f"Movie {index}", genre), account_id=account.id)
+
+            first_page, next_cursor, total_count = await movie_repo.read_movies_by_genre("Drama", page_size=3)
+            second_page, last_cursor, _ = await movie_repo.read_movies_by_genre("Drama", cursor=next_cursor, page_size=3)
+            facets = await movie_repo.read_genre_facets()
+
+        return (
+            [movie.title for movie in first_page],
+            [movie.title for movie in second_page],
+            total_count,
+            last_cursor,
+            [(facet.name, facet.movie_count) for facet in facets],
+        )
+
+    first_page, second_page, total_count, last_cursor, facets = run_in_sqlite(scenario)
+
+    assert first_page == ["Movie 4", "Movie 3", "Movie 2"]
+    assert second_page == ["Movie 1", "Movie 0"]
+    assert total_count == 5
+    assert last_cursor is None
+    assert facets == [("Drama", 5), ("Action", 3)]
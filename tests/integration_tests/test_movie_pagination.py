@@ -0,0 +1,75 @@
+import pytest
+
+from src.models.db.account import Account
+from src.models.db.movie import Movie
+from src.repository.crud.movie import MovieCRUDRepository
+
+
+def _movie(title: str, year: int, account: Account) -> Movie:
+    return Movie(
+        account=account,
+        title=title,
+        description="",
+        year=year,
+        rating="PG",
+        genre="Drama",
+        director="",
+        cast="",
+        cover_image_url="https://example.com/cover.png",
+    )
+
+
+def test_year_cursor_walks_ties_without_gaps(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account = Account(username="uploader", email="uploader@example.com")
+            years = {"A": 2001, "B": 2003, "C": 2003, "D": 2003, "E": 1999}
+            async_session.add_all([_movie(title, year, account=account) for title, year in years.items()])
+            await async_session.commit()
+
+            movie_repo = MovieCRUDRepository(async_session=async_session)
+            pages, cursor = [], None
+            while True:
+                movies, cursor = await movie_repo.read_movies_sorted_by_year(order="desc", cursor=cursor, page_size=2)
+                pages.append([movie.title for movie in movies])
+                if cursor is None:
+                    break
+
+            # 插入新电影后, 已翻过的位置之后的页不受影响
+            first_page, cursor = await movie_repo.read_movies_sorted_by_year(order="desc", page_size=2)
+            async_session.add(_movie("F", 2003, account=account))
+            await async_session.commit()
+            second_page, _ = await movie_repo.read_movies_sorted_by_year(order="desc", cursor=cursor, page_size=2)
+
+            # 兼容的page参数仍按偏移量分页, 新插入的电影会把后面的行往后推
+            legacy_page, _ = await movie_repo.read_movies_sorted_by_year(order="desc", page=2, page_size=2)
+
+            with pytest.raises(ValueError):
+                await movie_repo.read_movies_sorted_by_year(order="desc", cursor="not-a-cursor")
+
+        return pages, [movie.title for movie in second_page], [movie.title for movie in legacy_page]
+
+    pages, second_page_after_insert, legacy_page = run_in_sqlite(scenario)
+
+    assert pages == [["D", "C"], ["B", "A"], ["E"]]
+    assert second_page_after_insert == ["B", "A"]
+    assert legacy_page == ["C", "B"]
+
+
+def test_short_search_matches_title_prefix_literally(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account = Account(username="uploader", email="uploader@example.com")
+            async_session.add_all([_movie(title, 2000, account=account) for title in ("a_b", "axb", "Up")])
+            await async_session.commit()
+
+            movie_repo = MovieCRUDRepository(async_session=async_session)
+            underscore, _ = await movie_repo.search_movie("a_")
+            punctuation_only, _ = await movie_repo.search_movie("?!")
+
+        return [movie.title for movie in underscore], punctuation_only
+
+    underscore, punctuation_only = run_in_sqlite(scenario)
+
+    assert underscore == ["a_b"]
+    assert punctuation_only == []
@@ -0,0 +1,55 @@
+from src.models.db.account import Account
+from src.models.db.movie import Movie
+from src.models.schemas.movie import ReviewInCreate
+from src.repository.crud.account import AccountCRUDRepository
+from src.repository.crud.movie import MovieCRUDRepository
+
+
+def _movie(title: str, account: Account) -> Movie:
+    return Movie(
+        account=account,
+        title=title,
+        description="",
+        year=2024,
+        rating="PG",
+        genre="Drama",
+        director="",
+        cast="",
+        cover_image_url="https://example.com/cover.png",
+    )
+
+
+def test_rating_aggregates_follow_review_changes(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            author = Account(username="author", email="author@example.com")
+            critic = Account(username="critic", email="critic@example.com")
+            liked, disliked = _movie("Liked", account=author), _movie("Disliked", account=author)
+            async_session.add_all([author, critic, liked, disliked])
+            await async_session.commit()
+
+            movie_repo = MovieCRUDRepository(async_session=async_session)
+            await movie_repo.create_review(ReviewInCreate(movie_id=liked.id, review="", rating=5), account_id=author.id)
+            await movie_repo.create_review(ReviewInCreate(movie_id=liked.id, review="", rating=4), account_id=critic.id)
+            removed = await movie_repo.create_review(ReviewInCreate(movie_id=disliked.id, review="", rating=2), account_id=author.id)
+            await movie_repo.create_review(ReviewInCreate(movie_id=disliked.id, review="", rating=1), account_id=critic.id)
+            await movie_repo.delete_review(review_id=removed.id, account_id=author.id)
+
+            await async_session.refresh(liked)
+            after_reviews = await movie_repo.calculate_rates_in_percentage(movie=liked)
+            movies_by_rating, _ = await movie_repo.read_movies_sorted_by_rating(order="desc")
+            ranking = [movie.title for movie in movies_by_rating]
+
+            await AccountCRUDRepository(async_session=async_session).delete_account_by_id(id=critic.id)
+            await async_session.refresh(liked)
+            await async_session.refresh(disliked)
+            after_account_deletion = (liked.review_count, liked.average_rating, disliked.review_count, disliked.average_rating)
+
+        return after_reviews, ranking, after_account_deletion
+
+    after_reviews, ranking, after_account_deletion = run_in_sqlite(scenario)
+
+    assert after_reviews.average_rating == 4.5
+    assert (after_reviews.rating_4, after_reviews.rating_5, after_reviews.rating_1) == (50.0, 50.0, 0.0)
+    assert ranking == ["Liked", "Disliked"]
+    assert after_account_deletion == (1, 5.0, 0, 0.0)
@@ -0,0 +1,43 @@
+from src.models.db.account import Account
+from src.models.db.movie import Movie
+from src.models.schemas.movie import ReviewInCreate
+from src.repository.crud.movie import MovieCRUDRepository
+
+
+def test_reviews_are_paged_newest_first(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> list[list[str]]:
+        async with session_factory() as async_session:
+            account = Account(username="critic", email="critic@example.com")
+            movie = Movie(
+                account=account,
+                title="Reviewed",
+                description="",
+                year=2024,
+                rating="PG",
+                genre="Drama",
+                director="",
+                cast="",
+                cover_image_url="https://example.com/cover.png",
+            )
+            async_session.add(movie)
+            await async_session.commit()
+
+            movie_repo = MovieCRUDRepository(async_session=async_session)
+            for index in range(5):
+                await movie_repo.create_review(
+                    ReviewInCreate(movie_id=movie.id, review=f"review {index}", rating=4), account_id=account.id
+                )
+
+            pages, cursor = [], None
+            # 上限防止游标不前进时测试卡死
+            for _ in range(5):
+                rows, cursor = await movie_repo.read_reviews_of_movie(movie_id=movie.id, cursor=cursor, page_size=2)
+                pages.append([row.review for row in rows])
+                assert all(row.username == "critic" for row in rows)
+                if cursor is None:
+                    break
+            return pages
+
+    pages = run_in_sqlite(scenario)
+
+    assert pages == [["review 4", "review 3"], ["review 2", "review 1"], ["review 0"]]
@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+
+import sqlalchemy
+
+from src.models.db.account import Account
+from src.models.db.wallet import PaymentEvent, Transactions, Wallet
+from src.repository.crud.wallet import WalletCrudRepository
+from src.repository.workers import payment_status
+from src.repository.workers.payment_status import PaymentStatusHub
+
+
+def test_signature_check_rejects_missing_and_forged_signatures() -> None:
+    wallet_repo = WalletCrudRepository(async_session=None)
+    message = '{"payment_id":1,"payment_status":"finished"}'
+    signature = hmac.new(b"secret", message.encode(), hashlib.sha512).hexdigest()
+
+    assert wallet_repo.np_signature_check("secret", signature, message)
+    assert not wallet_repo.np_signature_check("secret", None, message)
+    assert not wallet_repo.np_signature_check("other", signature, message)
+
+
+def test_replayed_and_late_callbacks_credit_the_wallet_once(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            wallet = Wallet(account=Account(username="alice", email="alice@example.com"), balance=5)
+            async_session.add(Transactions(
+                wallet=wallet, amount=10, transaction_type="top-up", transaction_status="pending",
+                transaction_currency="btc", order_id="order-1", payment_id="42",
+            ))
+            await async_session.commit()
+
+            wallet_repo = WalletCrudRepository(async_session=async_session)
+            recorded = [
+                await wallet_repo.record_payment_event(payment_id=payment_id, payment_status=status, payload="{}")
+                for payment_id, status in [
+                    ("42", "waiting"), ("42", "finished"), ("42", "finished"), ("42", "failed"), ("404", "finished"),
+                ]
+            ]
+            first = await wallet_repo.apply_pending_payment_events(batch_size=2)
+            second = await wallet_repo.apply_pending_payment_events(batch_size=10)
+            third = await wallet_repo.apply_pending_payment_events(batch_size=10)
+
+            balance = await async_session.scalar(sqlalchemy.select(Wallet.balance))
+            status = await async_session.scalar(sqlalchemy.select(Transactions.transaction_status))
+            pending = await async_session.scalar(
+                sqlalchemy.select(sqlalchemy.func.count()).where(PaymentEvent.processed_at == None)
+            )
+        return recorded, first, second, third, balance, status, pending
+
+    recorded, first, second, third, balance, status, pending = run_in_sqlite(scenario)
+
+    assert recorded == [True, True, False, True, True]
+    assert first[0] == 2
+    assert [transition.payment_status for transition in first[1]] == ["waiting", "finished"]
+    assert second == (2, [])
+    assert third == (0, [])
+    assert (balance, status, pending) == (15, "finished", 0)
+
+
+def test_status_hub_picks_up_events_applied_by_other_workers(run_in_sqlite, monkeypatch) -> None:
+    async def scenario(session_factory) -> list:
+        monkeypatch.setattr(payment_status.async_db, "new_session", session_factory)
+        hub = PaymentStatusHub(poll_interval=60)
+
+        async with session_factory() as async_session:
+            wallet = Wallet(account=Account(username="alice", email="alice@example.com"))
+            async_session.add(Transactions(
+                wallet=wallet, amount=10, transaction_type="top-up", transaction_status="pending",
+                transaction_currency="btc", order_id="order-1", payment_id="42",
+            ))
+            await async_session.commit()
+            queue = hub.subscribe(wallet_id=wallet.id)
+            await hub.poll()
+
+            wallet_repo = WalletCrudRepository(async_session=async_session)
+            await wallet_repo.record_payment_event(payment_id="42", payment_status="finished", payload="{}")
+            await wallet_repo.apply_pending_payment_events()
+            await hub.poll()
+            await hub.poll()
+        return [queue.get_nowait().payment_status for _ in range(queue.qsize())]
+
+    assert run_in_sqlite(scenario) == ["finished"]
+
@@ -0,0 +1,55 @@
+import datetime
+
+from src.models.db.account import Account
+from src.models.db.wallet import Wallet
+from src.repository.crud.token import TokenCrudRepository
+
+
+def test_refresh_tokens_rotate_once_and_reuse_revokes_the_family(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account = Account(username="alice", email="alice@example.com", wallet=Wallet())
+            async_session.add(account)
+            await async_session.commit()
+
+            token_repo = TokenCrudRepository(async_session=async_session)
+            first = await token_repo.issue_refresh_token(account_id=account.id)
+            rotated = await token_repo.rotate_refresh_token(refresh_token=first)
+            db_account, wallet_id, second = rotated
+            replayed = await token_repo.rotate_refresh_token(refresh_token=first)
+            # 重放旧token后, 同一family中最新的token也失效
+            after_replay = await token_repo.rotate_refresh_token(refresh_token=second)
+            unknown = await token_repo.rotate_refresh_token(refresh_token="unknown")
+        return (db_account.username, wallet_id == account.wallet.id, second != first), replayed, after_replay, unknown
+
+    rotated, replayed, after_replay, unknown = run_in_sqlite(scenario)
+
+    assert rotated == ("alice", True, True)
+    assert replayed is None
+    assert after_replay is None
+    assert unknown is None
+
+
+def test_revoked_access_tokens_are_listed_until_they_expire(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            token_repo = TokenCrudRepository(async_session=async_session)
+            now = datetime.datetime.now(tz=datetime.timezone.utc)
+            await token_repo.revoke_access_token(jti="expired", expires_at=now - datetime.timedelta(minutes=1))
+            await token_repo.revoke_access_token(jti="live", expires_at=now + datetime.timedelta(minutes=10))
+            await token_repo.revoke_access_token(jti="live", expires_at=now + datetime.timedelta(minutes=10))
+            revoked = await token_repo.read_revoked_token_ids()
+            after_last = await token_repo.read_revoked_token_ids(after_id=revoked[-1][0])
+            return (
+                [jti for _, jti in revoked],
+                after_last,
+                await token_repo.is_access_token_revoked(jti="live"),
+                await token_repo.is_access_token_revoked(jti="other"),
+            )
+
+    revoked, after_last, live, other = run_in_sqlite(scenario)
+
+    assert revoked == ["live"]
+    assert after_last == []
+    assert live is True
+    assert other is False
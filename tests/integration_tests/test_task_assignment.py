@@ -0,0 +1,85 @@
+import sqlalchemy
+
+from src.models.db.account import Account
+from src.models.db.task import Task, TaskCategory
+from src.repository.crud.task import TaskCrudRepository
+from src.models.schemas.task import TaskCategoryInCreate
+
+
+def _category(name: str, access_level: int) -> TaskCategory:
+    return TaskCategory(
+        name=name,
+        description="",
+        access_level=access_level,
+        movies_uploaded_count=1,
+        reviews_posted_count=1,
+        total_movies_uploaded=1,
+        total_reviews_posted=1,
+        task_reward=1.0,
+    )
+
+
+async def _assigned(async_session) -> set[tuple[str, str]]:
+    stmt = (
+        sqlalchemy.select(Account.username, TaskCategory.name)
+        .join(Task, Task.account_id == Account.id)
+        .join(TaskCategory, TaskCategory.id == Task.task_category_id)
+    )
+    return set((await async_session.execute(stmt)).tuples())
+
+
+def test_bulk_assignment_skips_existing_tasks_and_unknown_accounts(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            alice = Account(username="alice", email="alice@example.com")
+            bob = Account(username="bob", email="bob@example.com")
+            second, third, advanced = _category("second", 2), _category("third", 2), _category("advanced", 3)
+            async_session.add_all([alice, bob, advanced, Task(account=alice, task_category=second), third])
+            await async_session.commit()
+
+            task_repo = TaskCrudRepository(async_session=async_session)
+            by_level = await task_repo.bulk_assign_tasks(account_ids=[alice.id, bob.id, bob.id, 999], task_level=2)
+            by_category = await task_repo.bulk_assign_tasks(
+                account_ids=[alice.id, bob.id], task_category_id=advanced.id, chunk_size=1
+            )
+            again = await task_repo.bulk_assign_tasks(account_ids=[alice.id, bob.id], task_level=2)
+            return by_level, by_category, again, await _assigned(async_session)
+
+    by_level, by_category, again, assigned = run_in_sqlite(scenario)
+
+    assert (by_level, by_category, again) == (3, 2, 0)
+    assert assigned == {
+        ("alice", "second"), ("alice", "third"), ("alice", "advanced"),
+        ("bob", "second"), ("bob", "third"), ("bob", "advanced"),
+    }
+
+
+def test_default_tasks_come_from_the_category_catalog(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            alice = Account(username="alice", email="alice@example.com")
+            bob = Account(username="bob", email="bob@example.com")
+            carol = Account(username="carol", email="carol@example.com")
+            async_session.add_all([alice, bob, carol, _category("first", 1), _category("later", 2)])
+            await async_session.commit()
+
+            task_repo = TaskCrudRepository(async_session=async_session)
+            await task_repo.add_default_tasks(account_id=alice.id)
+            # 绕过管理员接口直接写入的任务种类不会递增目录版本, 目录不会重新加载
+            async_session.add(_category("unversioned", 1))
+            await async_session.commit()
+            await task_repo.add_default_tasks(account_id=bob.id)
+            await task_repo.create_task_category(
+                task_category=TaskCategoryInCreate(
+                    name="created", description="", access_level=1, movies_uploaded_count=1, reviews_posted_count=1,
+                    total_movies_uploaded=1, total_reviews_posted=1, task_reward=1.0,
+                )
+            )
+            await task_repo.add_default_tasks(account_id=carol.id)
+            await async_session.commit()
+            return await _assigned(async_session)
+
+    assert run_in_sqlite(scenario) == {
+        ("alice", "first"), ("bob", "first"),
+        ("carol", "first"), ("carol", "unversioned"), ("carol", "created"),
+    }
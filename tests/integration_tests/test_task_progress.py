@@ -0,0 +1,115 @@
+import pytest
+
+from src.models.db.account import Account
+from src.models.db.task import Task, TaskCategory
+from src.repository.crud.task import TaskCrudRepository
+from src.repository.workers import task_progress
+from src.repository.workers.task_progress import MOVIE_UPLOADED, REVIEW_POSTED, TaskProgressEngine
+
+
+def _category(name: str, movies: int, reviews: int, is_copy_right_required: bool = False) -> TaskCategory:
+    return TaskCategory(
+        name=name,
+        description="",
+        access_level=1,
+        movies_uploaded_count=movies,
+        reviews_posted_count=reviews,
+        total_movies_uploaded=movies,
+        total_reviews_posted=reviews,
+        is_copy_right_required=is_copy_right_required,
+        task_reward=1.0,
+    )
+
+
+def test_events_are_applied_in_batches(run_in_sqlite, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def scenario(session_factory) -> dict:
+        monkeypatch.setattr(task_progress.async_db, "new_session", session_factory)
+
+        async with session_factory() as async_session:
+            alice = Account(username="alice", email="alice@example.com")
+            bob = Account(username="bob", email="bob@example.com")
+            starter = _category("starter", movies=2, reviews=1)
+            licensed = _category("licensed", movies=1, reviews=0, is_copy_right_required=True)
+            async_session.add_all([
+                Task(account=alice, task_category=starter),
+                Task(account=alice, task_category=licensed),
+                Task(account=bob, task_category=starter),
+            ])
+            await async_session.commit()
+
+            engine = TaskProgressEngine(batch_size=100, batch_interval=0.01)
+            engine.start()
+            for account_id, event in [
+                (alice.id, MOVIE_UPLOADED), (alice.id, MOVIE_UPLOADED), (alice.id, MOVIE_UPLOADED),
+                (alice.id, REVIEW_POSTED), (bob.id, MOVIE_UPLOADED),
+            ]:
+                engine.emit(account_id=account_id, event=event)
+            await engine.stop()
+
+            tasks = (await async_session.execute(
+                Task.__table__.select().order_by(Task.id)
+            )).all()
+
+        usernames = {alice.id: "alice", bob.id: "bob"}
+        category_names = {starter.id: "starter", licensed.id: "licensed"}
+        return {
+            (usernames[task.account_id], category_names[task.task_category_id]): (
+                task.movies_uploaded_since_task_start, task.reviews_posted_since_task_start, task.is_completed
+            )
+            for task in tasks
+        }
+
+    progress = run_in_sqlite(scenario)
+
+    assert progress == {
+        ("alice", "starter"): (2, 1, True),
+        ("alice", "licensed"): (1, 0, False),
+        ("bob", "starter"): (1, 0, False),
+    }
+
+
+def test_re_evaluation_walks_every_task_range(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple[int, list[bool]]:
+        async with session_factory() as async_session:
+            account = Account(username="alice", email="alice@example.com")
+            category = _category("starter", movies=2, reviews=0)
+            tasks = [
+                Task(account=account, task_category=category, movies_uploaded_since_task_start=uploads)
+                for uploads in (0, 2, 1, 3, 2)
+            ]
+            async_session.add_all(tasks)
+            await async_session.commit()
+
+            task_repo = TaskCrudRepository(async_session=async_session)
+            completed = await task_repo.re_evaluate_all_task_completion(batch_size=2)
+            rows = (await async_session.execute(Task.__table__.select().order_by(Task.id))).all()
+
+        return completed, [row.is_completed for row in rows]
+
+    completed, is_completed = run_in_sqlite(scenario)
+
+    assert completed == 3
+    assert is_completed == [False, True, False, True, True]
+
+
+def test_progress_columns_are_read_per_category(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> list:
+        async with session_factory() as async_session:
+            alice = Account(username="alice", email="alice@example.com")
+            bob = Account(username="bob", email="bob@example.com")
+            starter = _category("starter", movies=2, reviews=2)
+            other = _category("other", movies=1, reviews=1)
+            async_session.add_all([
+                Task(account=alice, task_category=starter, movies_uploaded_since_task_start=2,
+                     reviews_posted_since_task_start=2, is_completed=True, is_claimed=True),
+                Task(account=bob, task_category=starter, movies_uploaded_since_task_start=1),
+                Task(account=bob, task_category=other),
+            ])
+            await async_session.commit()
+
+            columns = await TaskCrudRepository(async_session=async_session).read_task_progress_columns(
+                task_category_id=starter.id
+            )
+        return sorted(map(tuple, columns.tolist()))
+
+    assert run_in_sqlite(scenario) == [(1.0, 0.0, 0.0, 0.0), (2.0, 2.0, 1.0, 1.0)]
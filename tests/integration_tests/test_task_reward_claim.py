@@ -0,0 +1,80 @@
+import asyncio
+
+import fastapi
+import pytest
+
+from src.models.db.account import Account
+from src.models.db.task import Task, TaskCategory, TaskRewardClaim
+from src.models.db.wallet import Transactions, Wallet
+from src.repository.crud.task import TaskCrudRepository
+
+
+async def _completed_task(async_session) -> tuple[int, int, int]:
+    account = Account(username="alice", email="alice@example.com")
+    wallet = Wallet(account=account, balance=0)
+    category = TaskCategory(
+        name="starter",
+        description="",
+        access_level=1,
+        movies_uploaded_count=1,
+        reviews_posted_count=0,
+        total_movies_uploaded=1,
+        total_reviews_posted=0,
+        task_reward=2.5,
+    )
+    task = Task(account=account, task_category=category, is_completed=True, movies_uploaded_since_task_start=1)
+    async_session.add_all([wallet, task])
+    await async_session.commit()
+    return account.id, task.id, wallet.id
+
+
+def test_concurrent_claims_pay_out_once(run_in_sqlite, tmp_path) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account_id, task_id, _ = await _completed_task(async_session)
+
+        async def claim(attempt: int) -> str:
+            async with session_factory() as async_session:
+                task_repo = TaskCrudRepository(async_session=async_session)
+                try:
+                    await task_repo.claim_task_reward(account_id=account_id, task_id=task_id)
+                except fastapi.HTTPException as e:
+                    return e.detail
+                return "claimed"
+
+        outcomes = await asyncio.gather(*(claim(attempt) for attempt in range(100)))
+
+        async with session_factory() as async_session:
+            balance = await async_session.scalar(Wallet.__table__.select().with_only_columns(Wallet.balance))
+            ledger_rows = (await async_session.execute(Transactions.__table__.select())).all()
+        return outcomes, balance, len(ledger_rows)
+
+    outcomes, balance, ledger_rows = run_in_sqlite(scenario, url=f"sqlite+aiosqlite:///{tmp_path / 'claims.db'}?timeout=60")
+
+    assert outcomes.count("claimed") == 1
+    assert set(outcomes) == {"claimed", "Task reward is already claimed!"}
+    assert balance == 2.5
+    assert ledger_rows == 1
+
+
+def test_retry_with_same_idempotency_key_replays_the_claim(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account_id, task_id, _ = await _completed_task(async_session)
+            task_repo = TaskCrudRepository(async_session=async_session)
+
+            first = await task_repo.claim_task_reward(account_id=account_id, task_id=task_id, idempotency_key="k-1")
+            replay = await task_repo.claim_task_reward(account_id=account_id, task_id=task_id, idempotency_key="k-1")
+            with pytest.raises(fastapi.HTTPException) as without_key:
+                await task_repo.claim_task_reward(account_id=account_id, task_id=task_id)
+
+            balance = await async_session.scalar(Wallet.__table__.select().with_only_columns(Wallet.balance))
+            claims = (await async_session.execute(TaskRewardClaim.__table__.select())).all()
+        return (first.is_claimed, replay.is_claimed), without_key.value.status_code, balance, len(claims)
+
+    is_claimed, status_code_without_key, balance, claims = run_in_sqlite(scenario)
+
+    assert is_claimed == (True, True)
+    assert status_code_without_key == 400
+    assert balance == 2.5
+    assert claims == 1
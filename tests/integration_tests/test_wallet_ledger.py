@@ -0,0 +1,79 @@
+import decimal
+
+import fastapi
+import pytest
+import sqlalchemy
+
+from src.models.db.account import Account
+from src.models.db.wallet import LedgerEntry, Wallet
+from src.models.schemas.wallet import WalletInAdd, WithdrawInCreate
+from src.repository.crud.ledger import ADJUSTMENTS_ACCOUNT, LedgerCrudRepository
+from src.repository.crud.wallet import WalletCrudRepository
+
+
+async def _journal_totals(async_session) -> list:
+    stmt = sqlalchemy.select(sqlalchemy.func.sum(LedgerEntry.amount)).group_by(LedgerEntry.journal_id)
+    return list((await async_session.execute(stmt)).scalars())
+
+
+def test_credit_and_debit_keep_balance_exact_and_journals_balanced(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            account = Account(username="alice", email="alice@example.com", wallet=Wallet())
+            async_session.add(account)
+            await async_session.commit()
+
+            wallet_id = account.wallet.id
+            ledger_repo = LedgerCrudRepository(async_session=async_session)
+            for index in range(10):
+                await ledger_repo.credit_wallet(
+                    journal_id=f"credit-{index}", wallet_id=wallet_id, amount=0.1,
+                    counter_account=ADJUSTMENTS_ACCOUNT, entry_type="adjustment",
+                )
+            await async_session.commit()
+
+            wallet_repo = WalletCrudRepository(async_session=async_session)
+            await wallet_repo.withdraw(withdraw=WithdrawInCreate(amount=0.3, withdrawal_method="usdt"), wallet_id=wallet_id)
+            with pytest.raises(fastapi.HTTPException) as insufficient:
+                await wallet_repo.withdraw(withdraw=WithdrawInCreate(amount=0.71, withdrawal_method="usdt"), wallet_id=wallet_id)
+
+            balance = await async_session.scalar(sqlalchemy.select(Wallet.balance).where(Wallet.id == wallet_id))
+            ledger_balance = await ledger_repo.read_ledger_balance(wallet_id=wallet_id)
+            journals = await _journal_totals(async_session)
+        return balance, ledger_balance, insufficient.value.status_code, journals
+
+    balance, ledger_balance, status_code, journals = run_in_sqlite(scenario)
+
+    assert balance == ledger_balance == decimal.Decimal("0.7")
+    assert status_code == 400
+    assert len(journals) == 11
+    assert all(total == 0 for total in journals)
+
+
+def test_reconcile_rebuilds_drifted_balances_from_ledger(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            accounts = [Account(username=f"user{i}", email=f"user{i}@example.com", wallet=Wallet()) for i in range(5)]
+            async_session.add_all(accounts)
+            await async_session.commit()
+
+            wallet_repo = WalletCrudRepository(async_session=async_session)
+            for account in accounts:
+                await wallet_repo.add_balance(wallet=WalletInAdd(account_id=account.id, amount=12.5))
+            # 模拟绕过账本的写入
+            await async_session.execute(
+                sqlalchemy.update(Wallet).where(Wallet.id.in_([accounts[1].wallet.id, accounts[3].wallet.id])).values(balance=99)
+            )
+            await async_session.commit()
+
+            ledger_repo = LedgerCrudRepository(async_session=async_session)
+            drifted = await ledger_repo.reconcile_wallet_balances(chunk_size=2)
+            again = await ledger_repo.reconcile_wallet_balances(chunk_size=2)
+            balances = list((await async_session.execute(sqlalchemy.select(Wallet.balance).order_by(Wallet.id))).scalars())
+        return drifted, again, balances
+
+    drifted, again, balances = run_in_sqlite(scenario)
+
+    assert drifted == 2
+    assert again == 0
+    assert balances == [decimal.Decimal("12.5")] * 5
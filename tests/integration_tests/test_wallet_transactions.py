@@ -0,0 +1,38 @@
+from src.models.db.account import Account
+from src.models.db.wallet import Transactions, Wallet
+from src.repository.crud.wallet import WalletCrudRepository
+
+
+def test_transaction_history_pages_and_summary(run_in_sqlite) -> None:
+    async def scenario(session_factory) -> tuple:
+        async with session_factory() as async_session:
+            wallet = Wallet(account=Account(username="alice", email="alice@example.com"))
+            other = Wallet(account=Account(username="bob", email="bob@example.com"))
+            for index, (transaction_type, status, amount) in enumerate([
+                ("top-up", "finished", 10), ("top-up", "pending", 99), ("withdraw", "pending", 4),
+                ("task-reward", "finished", 2.5), ("top-up", "finished", 5),
+            ]):
+                async_session.add(Transactions(
+                    wallet=wallet, amount=amount, transaction_type=transaction_type, transaction_status=status,
+                    transaction_currency="usd", order_id=f"order-{index}",
+                ))
+            async_session.add(Transactions(
+                wallet=other, amount=1000, transaction_type="top-up", transaction_status="finished",
+                transaction_currency="usd", order_id="other",
+            ))
+            await async_session.commit()
+
+            wallet_repo = WalletCrudRepository(async_session=async_session)
+            pages, cursor = [], None
+            for _ in range(5):
+                page, cursor = await wallet_repo.read_transactions_of_wallet(wallet_id=wallet.id, cursor=cursor, page_size=2)
+                pages.append([transaction.order_id for transaction in page])
+                if cursor is None:
+                    break
+            summary = await wallet_repo.read_transaction_summary(wallet_id=wallet.id)
+        return pages, tuple(summary)[:4]
+
+    pages, summary = run_in_sqlite(scenario)
+
+    assert pages == [["order-4", "order-3"], ["order-2", "order-1"], ["order-0"]]
+    assert summary == (5, 15, 4, 2.5)
@@ -0,0 +1,70 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from src.repository.crud.account import AccountCRUDRepository
+from src.repository.workers import account_activity
+from src.repository.workers.account_activity import AccountActivityUpdater
+
+
+@pytest.fixture(name="updates")
+def recorded_updates(monkeypatch: pytest.MonkeyPatch) -> list:
+    """
+    Records the activity writes instead of touching the database; a write of `fail@...` raises.
+    """
+    updates: list = list()
+
+    @contextlib.asynccontextmanager
+    async def new_session():
+        yield None
+
+    async def update_account_activity(self, id: int, ip: str, user_agent: str | None) -> None:
+        await asyncio.sleep(0.01)
+        updates.append((id, ip))
+        if ip.startswith("fail"):
+            raise RuntimeError("database is down")
+
+    monkeypatch.setattr(account_activity.async_db, "new_session", new_session)
+    monkeypatch.setattr(AccountCRUDRepository, "update_account_activity", update_account_activity)
+    return updates
+
+
+def test_touches_inside_the_debounce_window_are_dropped(updates: list) -> None:
+    updater = AccountActivityUpdater(debounce_seconds=60)
+
+    async def scenario() -> None:
+        updater.touch(account_id=1, ip="1.1.1.1", user_agent=None)
+        updater.touch(account_id=1, ip="2.2.2.2", user_agent=None)
+        updater.touch(account_id=2, ip="3.3.3.3", user_agent=None)
+        await updater.drain()
+
+    asyncio.run(scenario())
+
+    assert sorted(updates) == [(1, "1.1.1.1"), (2, "3.3.3.3")]
+
+
+def test_failed_update_is_retried_on_next_touch(updates: list) -> None:
+    updater = AccountActivityUpdater(debounce_seconds=60)
+
+    async def scenario() -> None:
+        updater.touch(account_id=1, ip="fail.example", user_agent=None)
+        await updater.drain()
+        updater.touch(account_id=1, ip="1.1.1.1", user_agent=None)
+        await updater.drain()
+
+    asyncio.run(scenario())
+
+    assert updates == [(1, "fail.example"), (1, "1.1.1.1")]
+
+
+def test_drain_waits_for_pending_updates(updates: list) -> None:
+    updater = AccountActivityUpdater(debounce_seconds=60)
+
+    async def scenario() -> list:
+        for account_id in range(5):
+            updater.touch(account_id=account_id, ip="1.1.1.1", user_agent=None)
+        await updater.drain()
+        return list(updates)
+
+    assert len(asyncio.run(scenario())) == 5
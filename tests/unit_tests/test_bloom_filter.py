@@ -0,0 +1,14 @@
+from src.utilities.caches.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives() -> None:
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [f"revoked-{index}" for index in range(1000)]
+    for item in added:
+        bloom_filter.add(item)
+
+    false_positives = sum(f"valid-{index}" in bloom_filter for index in range(10_000))
+
+    assert len(bloom_filter) == 1000
+    assert all(item in bloom_filter for item in added)
+    assert false_positives < 300
@@ -0,0 +1,58 @@
+import asyncio
+
+from src.models.schemas.geoip import GeoIPDetails
+from src.repository.crud.account import AccountCRUDRepository
+from src.utilities.geoip.backends import LocalGeoIPBackend
+from src.utilities.geoip.resolver import GeoIPResolver
+
+
+class CountingGeoIPBackend(LocalGeoIPBackend):
+    def __init__(self) -> None:
+        self.lookups: list[str] = list()
+
+    async def lookup(self, ip: str) -> GeoIPDetails:
+        self.lookups.append(ip)
+        await asyncio.sleep(0.01)
+        return GeoIPDetails(ip=ip, country_name="Canada", country_code="CA")
+
+
+def test_concurrent_lookups_of_one_ip_are_coalesced() -> None:
+    backend = CountingGeoIPBackend()
+    resolver = GeoIPResolver(backend=backend)
+
+    async def resolve_concurrently() -> list[GeoIPDetails]:
+        return await asyncio.gather(*(resolver.resolve(ip="8.8.8.8") for _ in range(20)))
+
+    results = asyncio.run(resolve_concurrently())
+
+    assert backend.lookups == ["8.8.8.8"]
+    assert {details.country_code for details in results} == {"CA"}
+
+
+def test_repeat_lookups_are_served_from_cache() -> None:
+    backend = CountingGeoIPBackend()
+    resolver = GeoIPResolver(backend=backend)
+
+    async def resolve_twice() -> None:
+        await resolver.resolve(ip="1.1.1.1")
+        await resolver.resolve(ip="1.1.1.1")
+
+    asyncio.run(resolve_twice())
+
+    assert backend.lookups == ["1.1.1.1"]
+
+
+def test_local_addresses_never_reach_the_backend() -> None:
+    backend = CountingGeoIPBackend()
+    resolver = GeoIPResolver(backend=backend)
+
+    details = asyncio.run(resolver.resolve(ip="127.0.0.1"))
+
+    assert backend.lookups == []
+    assert details.country_name == "Local"
+
+
+def test_loopback_is_reported_as_localhost() -> None:
+    result = asyncio.run(AccountCRUDRepository(async_session=None).is_ip_proxy(ip="127.0.0.1"))
+
+    assert (result.is_proxy, result.ip_location) == (False, "Localhost")
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from src.securities.hashing.executor import HashingExecutor
+from src.securities.hashing.hash import hash_generator
+from src.utilities.exceptions.password import PasswordHashingBusy
+
+
+def test_password_hashes_round_trip_through_the_pool(monkeypatch) -> None:
+    executor = HashingExecutor(max_workers=1)
+    monkeypatch.setattr("src.securities.hashing.hash.hashing_executor", executor)
+
+    async def scenario() -> tuple:
+        hashed = await hash_generator.generate_password_hash(hash_salt="salt", password="secret")
+        return (
+            await hash_generator.is_password_verified(password="saltsecret", hashed_password=hashed),
+            await hash_generator.is_password_verified(password="saltwrong", hashed_password=hashed),
+        )
+
+    try:
+        verified, rejected = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert verified is True
+    assert rejected is False
+    assert executor.metrics.completed == 3
+
+
+def test_saturated_pool_rejects_instead_of_queueing() -> None:
+    executor = HashingExecutor(max_workers=1, max_pending=1, queue_timeout=0.05)
+
+    async def scenario() -> list:
+        return await asyncio.gather(
+            executor.run(time.sleep, 0.5), executor.run(time.sleep, 0.5), return_exceptions=True
+        )
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert results[0] is None
+    assert isinstance(results[1], PasswordHashingBusy)
+    assert executor.metrics.as_dict()["rejected"] == 1
+    assert executor.metrics.in_flight == 0
@@ -0,0 +1,46 @@
+import asyncio
+
+from passlib.context import CryptContext
+
+from src.securities.hashing.executor import HashingExecutor
+from src.securities.hashing.hash import HashGenerator
+from src.securities.hashing.policy import HashingPolicy, calibrate_argon2_time_cost, split_policy_version
+
+OLD_POLICY = HashingPolicy(version=1, time_cost=1, memory_cost=1024, parallelism=1)
+NEW_POLICY = HashingPolicy(version=2, time_cost=2, memory_cost=2048, parallelism=1)
+
+
+def test_hashes_are_tagged_and_older_policies_need_rehash(monkeypatch) -> None:
+    executor = HashingExecutor(max_workers=1)
+    monkeypatch.setattr("src.securities.hashing.hash.hashing_executor", executor)
+    legacy_hash = CryptContext(schemes=["argon2"]).hash("saltsecret")
+
+    async def scenario() -> tuple:
+        old_hash = await HashGenerator(policy=OLD_POLICY).generate_password_hash(hash_salt="salt", password="secret")
+        generator = HashGenerator(policy=NEW_POLICY)
+        new_hash = await generator.generate_password_hash(hash_salt="salt", password="secret")
+        verified = [
+            await generator.is_password_verified(password="saltsecret", hashed_password=hashed)
+            for hashed in (legacy_hash, old_hash, new_hash)
+        ]
+        wrong = await generator.is_password_verified(password="saltwrong", hashed_password=old_hash)
+        rehash = [generator.needs_rehash(hashed_password=hashed) for hashed in (legacy_hash, old_hash, new_hash)]
+        return new_hash, verified, wrong, rehash
+
+    try:
+        new_hash, verified, wrong, rehash = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    version, raw_hash = split_policy_version(new_hash)
+    assert version == 2
+    assert raw_hash.startswith("$argon2id$") and "m=2048,t=2,p=1" in raw_hash
+    assert split_policy_version(legacy_hash) == (0, legacy_hash)
+    assert verified == [True, True, True]
+    assert wrong is False
+    assert rehash == [True, True, False]
+
+
+def test_calibration_stays_within_bounds() -> None:
+    assert calibrate_argon2_time_cost(memory_cost=1024, parallelism=1, target_ms=0, max_time_cost=5) == 1
+    assert calibrate_argon2_time_cost(memory_cost=1024, parallelism=1, target_ms=60_000, max_time_cost=5) == 5
@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.utilities.exceptions.http_client import UpstreamUnavailable
+from src.utilities.http.client import UpstreamClient, UpstreamSettings
+
+
+class FakeUpstream:
+    """
+    A local stand-in for an upstream service: answers with the queued status codes, then 200.
+    """
+
+    def __init__(self, statuses: list[int]) -> None:
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        status_code = self.statuses.pop(0) if self.statuses else 200
+        return httpx.Response(status_code=status_code, json={"path": request.url.path})
+
+    def client(self, **overrides) -> UpstreamClient:
+        upstream_settings = UpstreamSettings(
+            base_url="http://upstream.test", backoff_base=0, transport=httpx.MockTransport(self), **overrides
+        )
+        return UpstreamClient(name="fake", upstream_settings=upstream_settings)
+
+
+def test_idempotent_requests_are_retried_on_retryable_status() -> None:
+    upstream = FakeUpstream(statuses=[503, 502])
+
+    response = asyncio.run(upstream.client(max_retries=2).get("/ping"))
+
+    assert response.status_code == 200
+    assert upstream.calls == 3
+
+
+def test_non_idempotent_requests_are_not_retried() -> None:
+    upstream = FakeUpstream(statuses=[503])
+
+    response = asyncio.run(upstream.client(max_retries=2).post("/v1/payment"))
+
+    assert response.status_code == 503
+    assert upstream.calls == 1
+
+
+def test_circuit_opens_after_consecutive_failures() -> None:
+    upstream = FakeUpstream(statuses=[500, 500, 500])
+    upstream_client = upstream.client(max_retries=0, failure_threshold=2, reset_timeout=60)
+
+    async def call_until_open() -> None:
+        await upstream_client.get("/a")
+        await upstream_client.get("/b")
+        await upstream_client.get("/c")
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(call_until_open())
+
+    assert upstream.calls == 2
+
+
+def test_cancelled_half_open_trial_does_not_wedge_the_circuit() -> None:
+    upstream = FakeUpstream(statuses=[500])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/trial":
+            await asyncio.sleep(60)
+        return upstream(request)
+
+    upstream_client = UpstreamClient(
+        name="fake",
+        upstream_settings=UpstreamSettings(
+            base_url="http://upstream.test",
+            max_retries=0,
+            failure_threshold=1,
+            reset_timeout=0,
+            transport=httpx.MockTransport(handler),
+        ),
+    )
+
+    async def scenario() -> int:
+        await upstream_client.get("/open")
+
+        trial = asyncio.create_task(upstream_client.get("/trial"))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        response = await upstream_client.get("/recovered")
+        return response.status_code
+
+    assert asyncio.run(scenario()) == 200
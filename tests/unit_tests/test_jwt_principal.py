@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+
+import pytest
+
+from src.config.manager import settings
+from src.models.db.account import Account
+from src.models.schemas.jwt import AccountPrincipal, JWTAccount
+from src.securities.authorizations.jwt import JWTGenerator
+
+
+@pytest.fixture(autouse=True)
+def hs256(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "HS256")
+
+
+def _account() -> Account:
+    return Account(id=7, username="alice", email="alice@example.com", level=3)
+
+
+def test_principal_comes_from_claims_and_is_cached(monkeypatch) -> None:
+    generator = JWTGenerator(cache_size=10)
+    token = generator.generate_access_token(account=_account(), wallet_id=11)
+    decoded: list[str] = []
+    decode = generator._decode_token
+    monkeypatch.setattr(generator, "_decode_token", lambda **kwargs: decoded.append(kwargs["token"]) or decode(**kwargs))
+
+    async def read_principal_by_username(username: str) -> AccountPrincipal | None:
+        raise AssertionError("tokens with account claims must not hit the database")
+
+    async def scenario() -> list:
+        return [
+            await generator.retrieve_principal_from_token(token=token, read_principal_by_username=read_principal_by_username)
+            for _ in range(3)
+        ]
+
+    principals = asyncio.run(scenario())
+
+    assert len(set(principals)) == 1
+    assert principals[0][:4] == (7, "alice", 3, 11)
+    assert principals[0].jti is not None and principals[0].expires_at is not None
+    assert decoded == [token]
+
+
+def test_tokens_without_account_claims_are_resolved_once() -> None:
+    generator = JWTGenerator(cache_size=10)
+    legacy_token = generator._generate_jwt_token(
+        jwt_data=JWTAccount(username="alice", email="alice@example.com").dict(exclude_none=True),
+        expires_delta=datetime.timedelta(minutes=5),
+    )
+    lookups: list[str] = []
+
+    async def read_principal_by_username(username: str) -> AccountPrincipal | None:
+        lookups.append(username)
+        return AccountPrincipal(id=7, username=username, level=1, wallet_id=11)
+
+    async def scenario() -> list:
+        return [
+            await generator.retrieve_principal_from_token(token=legacy_token, read_principal_by_username=read_principal_by_username)
+            for _ in range(2)
+        ]
+
+    principals = asyncio.run(scenario())
+
+    assert principals[0] == principals[1] == AccountPrincipal(id=7, username="alice", level=1, wallet_id=11)
+    assert lookups == ["alice"]
+
+
+def test_expired_and_forged_tokens_are_rejected() -> None:
+    generator = JWTGenerator(cache_size=10)
+    expired = generator._generate_jwt_token(
+        jwt_data=JWTAccount(username="alice", email="alice@example.com", account_id=7, wallet_id=11, level=1).dict(),
+        expires_delta=datetime.timedelta(minutes=-1),
+    )
+    forged = generator.generate_access_token(account=_account(), wallet_id=11)[:-2] + "xx"
+
+    async def read_principal_by_username(username: str) -> AccountPrincipal | None:
+        return None
+
+    for token in (expired, forged):
+        with pytest.raises(ValueError):
+            asyncio.run(generator.retrieve_principal_from_token(token=token, read_principal_by_username=read_principal_by_username))
@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.models.schemas.wallet import PaymentInCreate
+from src.utilities.exceptions.payment import PaymentGatewayError
+from src.utilities.http.client import UpstreamSettings
+from src.utilities.http.clients import http_clients
+from src.utilities.payments.fake_server import FakeNOWPaymentsServer
+from src.utilities.payments.gateway import PaymentGateway
+from src.utilities.payments.providers import NOWPaymentsProvider
+
+
+def _gateway(name: str, transport: httpx.AsyncBaseTransport) -> PaymentGateway:
+    http_clients.register(
+        name=name,
+        upstream_settings=UpstreamSettings(base_url="http://nowpayments.test", backoff_base=0, transport=transport),
+    )
+    return PaymentGateway(provider=NOWPaymentsProvider(ipn_callback_url="http://app.test/ipn", client_name=name))
+
+
+def _payment(order_id: str) -> PaymentInCreate:
+    return PaymentInCreate(price_amount=10.0, pay_currency="btc", order_id=order_id)
+
+
+def test_payments_are_created_once_per_order_id() -> None:
+    server = FakeNOWPaymentsServer()
+    gateway = _gateway("nowpayments-fake", server.transport)
+
+    async def scenario() -> list:
+        concurrent = await asyncio.gather(*(gateway.create_payment(_payment("order-1")) for _ in range(10)))
+        retried = await gateway.create_payment(_payment("order-1"))
+        other = await gateway.create_payment(_payment("order-2"))
+        return [*concurrent, retried, other]
+
+    payments = asyncio.run(scenario())
+
+    assert len(server.requests) == 2
+    assert {payment.payment_id for payment in payments[:-1]} == {payments[0].payment_id}
+    assert payments[-1].payment_id != payments[0].payment_id
+    assert payments[0].payment_status == "waiting"
+
+
+def test_unreachable_gateway_is_retried_then_reported_as_unavailable() -> None:
+    attempts = []
+
+    def refuse(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    gateway = _gateway("nowpayments-down", httpx.MockTransport(refuse))
+
+    with pytest.raises(PaymentGatewayError) as error:
+        asyncio.run(gateway.create_payment(_payment("order-1")))
+
+    assert error.value.status_code == 503
+    assert len(attempts) == 3
+
+
+def test_failed_payments_are_not_cached() -> None:
+    statuses = [500, 201]
+    server = FakeNOWPaymentsServer()
+
+    def flaky(request: httpx.Request) -> httpx.Response:
+        status_code = statuses.pop(0)
+        return httpx.Response(500) if status_code == 500 else server.handle(request)
+
+    gateway = _gateway("nowpayments-flaky", httpx.MockTransport(flaky))
+
+    async def scenario() -> int:
+        with pytest.raises(PaymentGatewayError):
+            await gateway.create_payment(_payment("order-1"))
+        return (await gateway.create_payment(_payment("order-1"))).payment_id
+
+    assert asyncio.run(scenario()) == server.payments["order-1"]["payment_id"]
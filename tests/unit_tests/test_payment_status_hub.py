@@ -0,0 +1,51 @@
+import asyncio
+
+import fastapi
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from src.api.routes.socketio import router as socketio_router
+from src.repository.crud.wallet import PaymentTransition
+from src.repository.workers.payment_status import PaymentStatusHub
+
+
+def _transition(transaction_id: int, wallet_id: int, payment_status: str) -> PaymentTransition:
+    return PaymentTransition(
+        transaction_id=transaction_id, wallet_id=wallet_id, payment_id=str(transaction_id), payment_status=payment_status
+    )
+
+
+def test_hub_fans_out_each_change_once_per_wallet() -> None:
+    async def scenario() -> tuple:
+        hub = PaymentStatusHub(queue_size=2)
+        first, second, other = hub.subscribe(wallet_id=1), hub.subscribe(wallet_id=1), hub.subscribe(wallet_id=2)
+        hub.publish(_transition(10, wallet_id=1, payment_status="waiting"))
+        hub.publish(_transition(10, wallet_id=1, payment_status="waiting"))
+        hub.publish(_transition(10, wallet_id=1, payment_status="confirming"))
+        hub.publish(_transition(10, wallet_id=1, payment_status="finished"))
+        hub.unsubscribe(wallet_id=1, queue=second)
+        hub.unsubscribe(wallet_id=1, queue=first)
+        hub.publish(_transition(11, wallet_id=1, payment_status="waiting"))
+
+        statuses = [first.get_nowait().payment_status for _ in range(first.qsize())]
+        return statuses, second.qsize(), other.qsize(), hub._subscribers
+
+    statuses, second_size, other_size, subscribers = asyncio.run(scenario())
+
+    # 队列满时丢弃最旧的状态
+    assert statuses == ["confirming", "finished"]
+    assert second_size == 2
+    assert other_size == 0
+    assert list(subscribers) == [2]
+
+
+def test_payment_status_socket_rejects_missing_tokens() -> None:
+    app = fastapi.FastAPI()
+    app.include_router(socketio_router)
+
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        with TestClient(app).websocket_connect("/ws/payment-status"):
+            pass
+
+    assert disconnect.value.code == fastapi.status.WS_1008_POLICY_VIOLATION
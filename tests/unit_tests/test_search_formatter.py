@@ -0,0 +1,13 @@
+from src.utilities.formatters.search import format_boolean_prefix_query, tokenize_search_query
+
+
+def test_search_query_operators_are_stripped() -> None:
+    assert tokenize_search_query(search='+Inception -"Nolan" (2010)*') == ["inception", "nolan", "2010"]
+
+
+def test_boolean_prefix_query_requires_every_term() -> None:
+    assert format_boolean_prefix_query(terms=["inception", "nolan"]) == "+inception* +nolan*"
+
+
+def test_boolean_prefix_query_truncates_for_typos_and_skips_short_terms() -> None:
+    assert format_boolean_prefix_query(terms=["incepton", "of", "dark"], truncate_by=2) == "+incept* +dar*"
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from src.api.dependencies.session import get_async_session
+from src.repository.database import async_db
+
+
+async def _open_request_session() -> tuple:
+    session_generator = get_async_session()
+    async_session = await session_generator.__anext__()
+    return session_generator, async_session
+
+
+def test_every_request_gets_its_own_session() -> None:
+    async def open_concurrent_sessions() -> list:
+        opened = await asyncio.gather(*(_open_request_session() for _ in range(5)))
+        sessions = [async_session for _, async_session in opened]
+        for session_generator, _ in opened:
+            await session_generator.aclose()
+        return sessions
+
+    sessions = asyncio.run(open_concurrent_sessions())
+
+    assert len({id(async_session) for async_session in sessions}) == 5
+
+
+class RecordingSession:
+    """
+    Stands in for an `AsyncSession` and records how the request dependency finished it.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[str] = list()
+
+    def in_transaction(self) -> bool:
+        return True
+
+    async def commit(self) -> None:
+        self.calls.append("commit")
+
+    async def rollback(self) -> None:
+        self.calls.append("rollback")
+
+    async def __aenter__(self) -> "RecordingSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.calls.append("close")
+
+
+def test_request_session_commits_on_success(monkeypatch: pytest.MonkeyPatch) -> None:
+    recording_session = RecordingSession()
+    monkeypatch.setattr(async_db, "new_session", lambda: recording_session)
+
+    async def finish_request() -> None:
+        session_generator = get_async_session()
+        await session_generator.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await session_generator.__anext__()
+
+    asyncio.run(finish_request())
+
+    assert recording_session.calls == ["commit", "close"]
+
+
+def test_request_session_rolls_back_on_exception(monkeypatch: pytest.MonkeyPatch) -> None:
+    recording_session = RecordingSession()
+    monkeypatch.setattr(async_db, "new_session", lambda: recording_session)
+
+    async def fail_request() -> None:
+        session_generator = get_async_session()
+        await session_generator.__anext__()
+        with pytest.raises(RuntimeError):
+            await session_generator.athrow(RuntimeError("handler failed"))
+
+    asyncio.run(fail_request())
+
+    assert recording_session.calls == ["rollback", "close"]
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from src.utilities.caches.task_categories import TaskCategoryCatalog, TaskCategoryEntry
+
+
+class VersionOnlyCatalog(TaskCategoryCatalog):
+    def __init__(self, check_interval: float):
+        super().__init__(check_interval=check_interval)
+        self.db_version = 1
+        self.version_reads = 0
+        self.loads = 0
+
+    async def _read_version(self, async_session) -> int:
+        self.version_reads += 1
+        return self.db_version
+
+    async def load(self, async_session) -> None:
+        self.loads += 1
+        self._by_id = {1: TaskCategoryEntry(1, "starter", "", 1, 1, 1, 1, 1, False, 1.0)}
+        self._by_access_level = {1: (self._by_id[1],)}
+        self._version = self.db_version
+        self._checked_at = time.monotonic()
+
+
+def test_catalog_reloads_only_when_the_version_changes() -> None:
+    async def scenario() -> tuple:
+        catalog = VersionOnlyCatalog(check_interval=0)
+        await catalog.ensure_fresh(async_session=None)
+        await catalog.ensure_fresh(async_session=None)
+        catalog.db_version = 2
+        await catalog.ensure_fresh(async_session=None)
+        return catalog.loads, catalog.version_reads, catalog.by_access_level(1), catalog.by_access_level(2)
+
+    loads, version_reads, level_one, level_two = asyncio.run(scenario())
+
+    assert loads == 2
+    assert version_reads == 2
+    assert [entry.name for entry in level_one] == ["starter"]
+    assert level_two == ()
+
+
+def test_catalog_skips_version_checks_within_the_interval() -> None:
+    async def scenario() -> tuple:
+        catalog = VersionOnlyCatalog(check_interval=60)
+        for _ in range(3):
+            await catalog.ensure_fresh(async_session=None)
+        catalog.invalidate()
+        await catalog.ensure_fresh(async_session=None)
+        return catalog.loads, catalog.version_reads
+
+    assert asyncio.run(scenario()) == (2, 0)
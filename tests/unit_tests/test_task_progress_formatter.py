@@ -0,0 +1,26 @@
+import itertools
+
+import numpy
+
+from src.repository.crud.task import TaskCrudRepository
+from src.utilities.formatters.tasks import calculate_weighted_progress_batch, summarize_progress
+
+
+def test_batch_progress_matches_the_per_task_calculation() -> None:
+    cases = list(itertools.product(range(0, 4), range(0, 4), range(0, 3), range(0, 3)))
+    movies_uploaded, reviews_posted, movies_required, reviews_required = zip(*cases)
+
+    progress = calculate_weighted_progress_batch(movies_uploaded, reviews_posted, movies_required, reviews_required)
+
+    task_repo = TaskCrudRepository(async_session=None)
+    expected = [task_repo.calculate_weighted_progress(*case) for case in cases]
+    numpy.testing.assert_allclose(progress, expected)
+
+
+def test_summarize_progress_buckets_over_zero_to_hundred() -> None:
+    summary = summarize_progress(numpy.array([0.0, 25.0, 50.0, 100.0]), buckets=4)
+
+    assert summary["task_count"] == 4
+    assert summary["mean"] == 43.75
+    assert summary["bucket_counts"] == [1, 1, 1, 1]
+    assert summarize_progress(numpy.array([]), buckets=2)["bucket_counts"] == [0, 0]